@@ -33,6 +33,9 @@ elif _legacy_excel_dir.exists():
 else:
     DATA_RAW_EXCEL_DIR = _default_excel_dir
 
+DATA_RAW_PARQUET_DIR = DATA_DIR / "parquet"  # Salida de convertir_sav_xlsx_a_csv.py --format parquet
+DATA_SAV_DIR = DATA_DIR / "sav"
+DATA_METADATA_DIR = DATA_DIR / "metadata"
 DATA_PROCESSED_DIR = DATA_DIR / "processed"
 DATA_INTERIM_DIR = DATA_DIR / "interim"
 
@@ -48,6 +51,14 @@ OUTPUT_FIGURES_DIR = OUTPUT_DIR / "figures"
 OUTPUT_TABLES_DIR = OUTPUT_DIR / "tables"
 OUTPUT_REPORTS_DIR = OUTPUT_DIR / "reports"
 
+# Pipeline (scripts/pipeline.py)
+PIPELINE_MANIFEST = DATA_DIR / "pipeline_manifest.json"
+PIPELINE_LOG_DIR = OUTPUT_DIR / "logs"
+
+# Benchmark (scripts/benchmark.py): datos sintéticos e historial de corridas
+BENCHMARK_DIR = DATA_DIR / "benchmark"
+BENCHMARK_HISTORY = OUTPUT_DIR / "benchmarks" / "benchmark_history.json"
+
 # Constantes del proyecto
 AÑOS_INICIO = 2009
 AÑOS_FIN = 2023  # Exclusivo (2009-2022 inclusive)
@@ -74,6 +85,7 @@ FIGURE_SIZE = (12, 6)  # Tamaño por defecto (ancho, alto)
 
 # Nombres de archivos de salida
 MASTER_DATASET_FILENAME = "master_dataset.csv"
+MASTER_DATASET_DIRNAME = "master_dataset"  # Particionado tipo=/anio= + manifest.json
 DEFUNCIONES_CLEAN_FILENAME = "defunciones_clean.csv"
 NACIMIENTOS_CLEAN_FILENAME = "nacimientos_clean.csv"
 DIVORCIOS_CLEAN_FILENAME = "divorcios_clean.csv"
@@ -0,0 +1,463 @@
+"""
+Benchmark del flujo de datos sobre datos sintéticos a varias escalas.
+
+Por cada escala (1×, 10×, 100× las filas por año del perfil) se generan
+nacimientos, defunciones y divorcios con ``scripts/synthetic_ine.py`` en
+``data/benchmark/escala_<n>x/`` (se reutilizan mientras no cambien perfil
+ni semilla) y se miden estas etapas:
+
+- convertir: ``.sav`` → CSV con ``convert_source``
+- limpiar: ``_clean_tipo`` de nacimientos y defunciones (como ``build_q1_q2_clean.py``)
+- cargar: ``cargar_tipo_normalizado`` de cada tipo
+- consolidar: ``consolidar_todos_tipos`` sobre los tres tipos
+- paneles: cubo de conteos desde cero + paneles por departamento, municipio y mes
+
+La generación y cada etapa corren en su propio proceso (``--prepare``,
+``--run-stage``). El proceso de la etapa reporta su memoria máxima (RSS,
+``VmHWM`` en Linux, que no arrastra la del padre) y su tiempo sin contar el
+arranque del intérprete, y el detalle por tipo y año
+queda en ``logs/informe_ejecucion_<etapa>.json`` de cada escala (ver
+``scripts/instrumentation.py``). Cada corrida se agrega a
+``output/benchmarks/benchmark_history.json`` (fecha, commit, plataforma y,
+por escala y etapa, segundos, filas, filas por segundo y RSS máxima) y se
+compara con la corrida anterior de la misma escala: una caída del
+rendimiento mayor que ``--tolerance`` se reporta como regresión.
+
+Uso:
+    python scripts/benchmark.py                      # escalas 1, 10 y 100
+    python scripts/benchmark.py --scales 1 10 --stages limpiar paneles
+    python scripts/benchmark.py --fail-on-regression  # código 1 si hay regresiones
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import (  # noqa: E402
+    BENCHMARK_DIR,
+    BENCHMARK_HISTORY,
+    DATA_METADATA_DIR,
+    DATA_RAW_CSV_DIR,
+    RANDOM_STATE,
+)
+from scripts.instrumentation import peak_rss_mb, report_path, span, start, write_report  # noqa: E402
+from scripts.io_utils import read_json, write_json_atomic  # noqa: E402
+
+
+HISTORY_VERSION = 1
+GENERATION_MANIFEST = "generacion.json"
+STAGES = ("convertir", "limpiar", "cargar", "consolidar", "paneles")
+BENCHMARK_TIPOS = ("nacimientos", "defunciones", "divorcios")
+# Claves numéricas de la limpieza Q1-Q2 (como build_q1_q2_clean.py)
+CLEAN_KEYS = {
+    "nacimientos": ("año", "depreg"),
+    "defunciones": ("año", "depreg", "edadif"),
+}
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_TOLERANCE = 0.2
+# Solo se comparan corridas con el mismo motor de limpieza y los mismos datos
+COMPARABLE_KEYS = ("motor_limpieza", "semilla")
+_RESULT_PREFIX = "BENCHMARK "
+
+
+def scale_dir(scale: float) -> Path:
+    return BENCHMARK_DIR / f"escala_{scale:g}x"
+
+
+def prepare_data(
+    scale: float, seed: int, with_sav: bool, regenerate: bool = False, verbose: bool = True
+) -> Dict:
+    """
+    Genera (o reutiliza) los datos sintéticos de una escala.
+
+    Los datos se regeneran si cambian la semilla o el perfil de algún tipo
+    (p. ej. aparecen CSV reales de nacimientos), o si se piden los ``.sav``
+    y la generación anterior no los escribió.
+
+    Retorna:
+    --------
+    dict
+        Manifiesto de la generación: semilla, escala, ``sav`` y, por tipo,
+        origen del perfil, huella, filas y tasa de duplicados
+    """
+    from scripts.synthetic_ine import build_profile, profile_digest
+
+    root = scale_dir(scale)
+    digests = {
+        tipo: profile_digest(build_profile(tipo, DATA_RAW_CSV_DIR, DATA_METADATA_DIR))
+        for tipo in BENCHMARK_TIPOS
+    }
+    manifest = read_json(root / GENERATION_MANIFEST, default=None)
+    fresh = (
+        isinstance(manifest, dict)
+        and manifest.get("semilla") == seed
+        and {t: info.get("perfil") for t, info in manifest.get("tipos", {}).items()} == digests
+        and (manifest.get("sav") or not with_sav)
+    )
+    if fresh and not regenerate:
+        return manifest
+
+    from scripts.synthetic_ine import generate
+
+    if root.exists():
+        shutil.rmtree(root)
+    began = time.perf_counter()
+    summary = generate(
+        BENCHMARK_TIPOS,
+        DATA_RAW_CSV_DIR,
+        root / "csv",
+        scale=scale,
+        seed=seed,
+        sav_dir=root / "sav" if with_sav else None,
+        metadata_dir=DATA_METADATA_DIR,
+    )
+    manifest = {"semilla": seed, "escala": scale, "sav": with_sav, "tipos": summary}
+    write_json_atomic(manifest, root / GENERATION_MANIFEST)
+    if verbose:
+        rows = sum(info["filas"] for info in summary.values())
+        print(f"[GEN] escala {scale:g}x: {rows:,} filas en {time.perf_counter() - began:.1f}s")
+    return manifest
+
+
+def prepare_data_child(
+    scale: float, seed: int, with_sav: bool, regenerate: bool = False, verbose: bool = True
+) -> Dict:
+    """
+    ``prepare_data`` en un proceso aparte: la memoria de la generación no
+    queda en el proceso que lanza y mide las etapas.
+    """
+    command = [
+        sys.executable, "-m", "scripts.benchmark",
+        "--prepare", f"{scale:g}", "--seed", str(seed),
+    ]
+    if with_sav:
+        command.append("--with-sav")
+    if regenerate:
+        command.append("--regenerate")
+    if not verbose:
+        command.append("--quiet")
+    subprocess.run(command, cwd=PROJECT_ROOT, check=True)
+    return read_json(scale_dir(scale) / GENERATION_MANIFEST)
+
+
+# ----------------------------------------------------------------------
+# Etapas (se ejecutan en el proceso hijo; retornan las filas procesadas)
+# ----------------------------------------------------------------------
+def _stage_convertir(root: Path) -> int:
+    from scripts.convertir_sav_xlsx_a_csv import convert_source
+
+    sources = sorted((root / "sav").rglob("*.sav"))
+    if not sources:
+        raise FileNotFoundError(f"No hay .sav generados en {root / 'sav'}")
+    out_dir = root / "trabajo" / "convertidos"
+    for source in sources:
+        with span("archivo", archivo=source.name):
+            if not convert_source(source, out_dir / f"{source.stem}.csv", "csv"):
+                raise RuntimeError(f"Falló la conversión de {source.name}")
+    return _generated_rows(root, BENCHMARK_TIPOS)
+
+
+def _stage_limpiar(root: Path, engine: str = "rows") -> int:
+    from scripts.build_q1_q2_clean import _clean_tipo
+
+    processed_dir = root / "trabajo" / "processed"
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    for tipo, keys in CLEAN_KEYS.items():
+        stats = _clean_tipo(
+            tipo=tipo,
+            raw_dir=root / "csv",
+            processed_dir=processed_dir,
+            numeric_keys=keys,
+            verbose=False,
+            engine=engine,
+        )
+        rows += stats.rows_input
+    return rows
+
+
+def _stage_cargar(root: Path) -> int:
+    from scripts.data_cleaning import cargar_tipo_normalizado
+
+    rows = 0
+    for tipo in BENCHMARK_TIPOS:
+        df, _ = cargar_tipo_normalizado(tipo, csv_dir=root / "csv", verbose=False)
+        rows += len(df)
+    return rows
+
+
+def _stage_consolidar(root: Path) -> int:
+    from scripts.data_cleaning import consolidar_todos_tipos
+
+    # consolidar_todos_tipos siempre imprime su resumen; se mide la carga completa
+    with contextlib.redirect_stdout(io.StringIO()):
+        dfs_por_tipo, _ = consolidar_todos_tipos(
+            list(BENCHMARK_TIPOS), csv_dir=root / "csv", verbose=False, materializar=True
+        )
+    missing = set(BENCHMARK_TIPOS) - set(dfs_por_tipo)
+    if missing:
+        raise RuntimeError(f"consolidar_todos_tipos no cargó: {sorted(missing)}")
+    return sum(len(info["df"]) for info in dfs_por_tipo.values())
+
+
+def _stage_paneles(root: Path) -> int:
+    from scripts.mortality_cube import CUBE_DIRNAME, TIPOS, clean_path, update_cube
+
+    processed_dir = root / "trabajo" / "processed"
+    missing = [tipo for tipo in TIPOS if not clean_path(processed_dir, tipo).exists()]
+    if missing:
+        raise FileNotFoundError(f"Faltan los datasets clean de {missing}: ejecutar antes la etapa limpiar")
+    # El cubo es incremental: se borra para medir la construcción completa
+    shutil.rmtree(processed_dir / CUBE_DIRNAME, ignore_errors=True)
+    cube = update_cube(processed_dir, verbose=False)
+    cube.department_panel()
+    cube.municipal_panel()
+    cube.monthly_panel()
+    return _generated_rows(root, TIPOS)
+
+
+_STAGE_FUNCTIONS: Dict[str, Callable[..., int]] = {
+    "convertir": _stage_convertir,
+    "limpiar": _stage_limpiar,
+    "cargar": _stage_cargar,
+    "consolidar": _stage_consolidar,
+    "paneles": _stage_paneles,
+}
+
+
+def _generated_rows(root: Path, tipos: Sequence[str]) -> int:
+    manifest = read_json(root / GENERATION_MANIFEST, default={})
+    return sum(manifest.get("tipos", {}).get(tipo, {}).get("filas", 0) for tipo in tipos)
+
+
+def run_stage_child(name: str, root: Path, engine: str) -> None:
+    """
+    Ejecuta una etapa, escribe su informe de ejecución (detalle por tipo y
+    año) en ``logs/`` e imprime su resultado como última línea (JSON con
+    segundos, filas y la RSS máxima de este proceso).
+    """
+    kwargs = {"engine": engine} if name == "limpiar" else {}
+    start()
+    began = time.perf_counter()
+    rows = _STAGE_FUNCTIONS[name](root, **kwargs)
+    seconds = time.perf_counter() - began
+    write_report(report_path(root / "logs", name), "benchmark", etapa=name, engine=engine)
+    result = {"segundos": seconds, "filas": rows, "rss_max_mb": peak_rss_mb()}
+    print(_RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ----------------------------------------------------------------------
+# Proceso padre
+# ----------------------------------------------------------------------
+def measure_stage(name: str, root: Path, engine: str = "rows") -> Dict:
+    """
+    Ejecuta una etapa en un proceso aparte y devuelve sus métricas
+    (``segundos``, ``filas``, ``filas_por_segundo``, ``rss_max_mb``).
+    """
+    from scripts.pipeline import run_process
+
+    log_path = root / "logs" / f"{name}.log"
+    command = [
+        sys.executable, "-m", "scripts.benchmark",
+        "--run-stage", name, "--data-dir", str(root), "--engine", engine,
+    ]
+    returncode = run_process(command, log_path)
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    results = [line for line in lines if line.startswith(_RESULT_PREFIX)]
+    if returncode != 0 or not results:
+        raise RuntimeError(f"La etapa {name} falló (código {returncode}); ver {log_path}")
+    result = json.loads(results[-1][len(_RESULT_PREFIX):])
+    seconds = result["segundos"]
+    return {
+        "segundos": round(seconds, 3),
+        "filas": result["filas"],
+        "filas_por_segundo": round(result["filas"] / seconds, 1) if seconds > 0 else None,
+        "rss_max_mb": result["rss_max_mb"],
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def platform_info() -> Dict:
+    import os
+
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sistema": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_history(path: Path = BENCHMARK_HISTORY) -> Dict:
+    history = read_json(path, default=None)
+    if not isinstance(history, dict) or history.get("version") != HISTORY_VERSION:
+        history = {"version": HISTORY_VERSION, "corridas": []}
+    return history
+
+
+def find_regressions(
+    history: Dict, run: Dict, tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    Compara ``run`` con la corrida anterior del historial que midió la
+    misma escala y etapa con el mismo motor de limpieza y semilla; retorna
+    una línea por etapa cuyo rendimiento (filas por segundo) cayó más que
+    ``tolerance``.
+    """
+    comparable = [
+        old for old in history["corridas"]
+        if all(old.get(key) == run.get(key) for key in COMPARABLE_KEYS)
+    ]
+    regressions = []
+    for scale, stages in run["escalas"].items():
+        for name, metrics in stages.items():
+            previous = next(
+                (
+                    old["escalas"][scale][name]
+                    for old in reversed(comparable)
+                    if name in old.get("escalas", {}).get(scale, {})
+                ),
+                None,
+            )
+            if not previous or not previous.get("filas_por_segundo") or not metrics.get("filas_por_segundo"):
+                continue
+            change = metrics["filas_por_segundo"] / previous["filas_por_segundo"] - 1
+            if change < -tolerance:
+                regressions.append(
+                    f"{scale} {name}: {previous['filas_por_segundo']:,.0f} → "
+                    f"{metrics['filas_por_segundo']:,.0f} filas/s ({change:+.0%})"
+                )
+    return regressions
+
+
+def run_benchmark(
+    scales: Sequence[float] = DEFAULT_SCALES,
+    stages: Sequence[str] = STAGES,
+    seed: int = RANDOM_STATE,
+    engine: str = "rows",
+    regenerate: bool = False,
+    verbose: bool = True,
+) -> Dict:
+    """Genera los datos de cada escala y mide las etapas; retorna la corrida."""
+    run: Dict = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "plataforma": platform_info(),
+        "semilla": seed,
+        "motor_limpieza": engine,
+        "escalas": {},
+    }
+    for scale in scales:
+        manifest = prepare_data_child(scale, seed, "convertir" in stages, regenerate, verbose)
+        root = scale_dir(scale)
+        results: Dict[str, Dict] = {}
+        for name in [s for s in STAGES if s in stages]:
+            results[name] = measure_stage(name, root, engine)
+            if verbose:
+                _print_metrics(f"{scale:g}x", name, results[name])
+        run["escalas"][f"{scale:g}x"] = results
+        run.setdefault("datos", {})[f"{scale:g}x"] = {
+            tipo: {"origen": info["origen"], "filas": info["filas"]}
+            for tipo, info in manifest["tipos"].items()
+        }
+    return run
+
+
+def _print_metrics(scale: str, name: str, metrics: Dict) -> None:
+    rss = f"{metrics['rss_max_mb']:,.0f} MB" if metrics["rss_max_mb"] is not None else "n/d"
+    rate = f"{metrics['filas_por_segundo']:,.0f}" if metrics["filas_por_segundo"] else "n/d"
+    print(
+        f"  {scale:>5} {name:<11} {metrics['segundos']:>8.2f}s  "
+        f"{metrics['filas']:>12,} filas  {rate:>12} filas/s  RSS máx {rss}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de conversión, limpieza, carga y paneles sobre datos sintéticos."
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=float,
+        default=list(DEFAULT_SCALES),
+        help="Multiplicadores de filas por año respecto del perfil (por defecto: 1 10 100)",
+    )
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Etapas a medir")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE, help="Semilla de la generación")
+    parser.add_argument(
+        "--engine",
+        choices=("rows", "vectorized"),
+        default="rows",
+        help="Motor de la etapa limpiar (como build_q1_q2_clean.py --engine)",
+    )
+    parser.add_argument("--regenerate", action="store_true", help="Regenerar los datos aunque estén al día")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Caída relativa de filas/s respecto de la corrida anterior que cuenta como regresión",
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Salir con código 1 si hay regresiones"
+    )
+    parser.add_argument("--history", type=Path, default=BENCHMARK_HISTORY, help="Historial JSON de corridas")
+    parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
+    # Uso interno: generación y etapas en procesos hijos
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--with-sav", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare is not None:
+        prepare_data(args.prepare, args.seed, args.with_sav, args.regenerate, not args.quiet)
+        return
+    if args.run_stage:
+        run_stage_child(args.run_stage, args.data_dir, args.engine)
+        return
+
+    history = load_history(args.history)
+    run = run_benchmark(args.scales, args.stages, args.seed, args.engine, args.regenerate, not args.quiet)
+    regressions = find_regressions(history, run, args.tolerance)
+    history["corridas"].append(run)
+    write_json_atomic(history, args.history)
+    if not args.quiet:
+        print(f"[OK] Historial: {args.history}")
+    for line in regressions:
+        print(f"[REGRESION] {line}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
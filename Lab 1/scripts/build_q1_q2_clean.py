@@ -1,30 +1,81 @@
 """
 Prefase Q1-Q2: limpieza reproducible de nacimientos y defunciones (2009-2022).
 
-Entradas:
-    - data/raw/csv/*_nacimientos.csv
-    - data/raw/csv/*_defunciones.csv
+Entradas (``config.DATA_RAW_CSV_DIR``: data/raw/csv, o data/csv en la
+estructura anterior; es la misma carpeta en la que escribe
+convertir_sav_xlsx_a_csv.py):
+    - <raw-dir>/*_nacimientos.csv
+    - <raw-dir>/*_defunciones.csv
 
 Salidas:
     - data/processed/nacimientos_clean_2009_2022.csv
     - data/processed/defunciones_clean_2009_2022.csv
     - data/processed/q1q2_control_calidad_2009_2022.csv
+    - data/processed/*_clean_2009_2022.parquet (opcional, --emit-parquet)
+    - data/processed/_shards/<tipo>/ (shards por año y manifiesto, modo incremental)
+
+Con --input-format parquet se leen las particiones generadas por
+convertir_sav_xlsx_a_csv.py --format parquet; la salida es idéntica a la
+obtenida desde CSV.
+
+Modo incremental (por defecto): cada año se limpia a un shard persistente
+en data/processed/_shards/<tipo>/ con un manifiesto de hashes de entrada y
+versión de reglas. Una nueva corrida solo reprocesa los años nuevos o
+modificados y vuelve a ensamblar las salidas (--no-incremental lo desactiva).
+
+Motores de limpieza (--engine):
+    - rows: recorre cada fila con csv.DictReader (implementación original).
+    - vectorized: procesa bloques columnares; alinea encabezados una vez por
+      archivo y aplica coerción numérica, conteo de nulos y la regla de
+      exclusión sobre columnas completas. Produce los mismos archivos.
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
-import hashlib
-import sqlite3
+import io
+import os
+import shutil
+import sys
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import DATA_PROCESSED_DIR, DATA_RAW_CSV_DIR  # noqa: E402
+from scripts.columnar import (  # noqa: E402
+    iter_text_batches,
+    iter_text_rows,
+    partition_path,
+    read_schema_names,
+)
+from scripts.dedup_engine import FingerprintSet, fingerprint, fingerprint_columns  # noqa: E402
+from scripts.instrumentation import record, report_path, span, start, write_report  # noqa: E402
+from scripts.io_utils import file_sha256, read_json, write_json_atomic  # noqa: E402
 
 
 YEAR_START = 2009
 YEAR_END = 2022
+DEDUP_BITS = 128
+ENGINES = ("rows", "vectorized")
+DEFAULT_CHUNK_SIZE = 100_000  # filas por bloque del motor vectorizado
+INTEGER_KEYS = ("año", "depreg")
+# Incrementar al cambiar cualquier regla de limpieza: invalida los shards
+RULES_VERSION = 1
+SHARDS_DIRNAME = "_shards"
+SHARD_MANIFEST = "manifest.json"
 
 
 @dataclass
@@ -41,16 +92,25 @@ class CleanStats:
     year_rows: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
 
 
-def _iter_files(raw_dir: Path, tipo: str) -> List[Tuple[int, Path]]:
+def _iter_files(raw_dir: Path, tipo: str, input_format: str = "csv") -> List[Tuple[int, Path]]:
     files: List[Tuple[int, Path]] = []
     for year in range(YEAR_START, YEAR_END + 1):
-        path = raw_dir / f"{year}_{tipo}.csv"
+        if input_format == "parquet":
+            path = partition_path(raw_dir, tipo, year)
+        else:
+            path = raw_dir / f"{year}_{tipo}.csv"
         if path.exists():
             files.append((year, path))
     return files
 
 
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() == ".parquet"
+
+
 def _read_header(path: Path) -> List[str]:
+    if _is_parquet(path):
+        return [h.strip().lower() for h in read_schema_names(path)]
     with path.open("r", encoding="utf-8", newline="") as f:
         reader = csv.reader(f)
         try:
@@ -60,6 +120,69 @@ def _read_header(path: Path) -> List[str]:
     return [h.strip().lower() for h in header]
 
 
+@contextmanager
+def _open_records(path: Path) -> Iterator[Tuple[Optional[List[str]], Iterator[Dict[str, str]]]]:
+    """Abre un CSV o Parquet y entrega (fieldnames, filas como dict de texto)."""
+    if _is_parquet(path):
+        yield iter_text_rows(path)
+        return
+    with path.open("r", encoding="utf-8", newline="") as in_f:
+        reader = csv.DictReader(in_f)
+        yield (list(reader.fieldnames) if reader.fieldnames is not None else None), reader
+
+
+@contextmanager
+def _open_column_chunks(
+    path: Path,
+    chunk_size: int,
+) -> Iterator[Tuple[Optional[List[str]], Iterator[Tuple[int, List[Sequence[str]]]]]]:
+    """
+    Abre un CSV o Parquet y entrega (fieldnames, bloques de columnas).
+
+    Cada bloque es ``(n_filas, columnas)`` con una columna de texto por
+    posición del encabezado. Para CSV se usa el mismo ``csv.reader`` que
+    ``DictReader``: se saltan las líneas vacías, las filas cortas se
+    completan con "" y los valores sobrantes se descartan.
+    """
+    if _is_parquet(path):
+        names, batches = iter_text_batches(path, chunk_size)
+        yield names, ((len(cols[0]) if cols else 0, cols) for cols in batches)
+        return
+    with path.open("r", encoding="utf-8", newline="") as in_f:
+        reader = csv.reader(in_f)
+        header = next(reader, None)
+        width = len(header) if header is not None else 0
+
+        def _chunks() -> Iterator[Tuple[int, List[Sequence[str]]]]:
+            while True:
+                raw = list(islice(reader, chunk_size))
+                if not raw:
+                    return
+                rows = [r for r in raw if r]
+                if any(len(r) != width for r in rows):
+                    rows = [(r + [""] * (width - len(r)))[:width] for r in rows]
+                columns: List[Sequence[str]] = list(zip(*rows)) if rows else []
+                if not columns:
+                    columns = [() for _ in range(width)]
+                yield len(rows), columns
+
+        yield header, _chunks()
+
+
+def _coerce_num(raw_value: str | None, *, integer: bool) -> Tuple[str, bool, bool]:
+    """Regla de coerción numérica: (valor, es_nulo, es_error_de_parseo)."""
+    value = (raw_value or "").strip()
+    if value == "":
+        return "", True, False
+    try:
+        n = float(value)
+    except ValueError:
+        return "", True, True
+    if integer:
+        return str(int(n)), False, False
+    return str(n), False, False
+
+
 def _safe_num(
     raw_value: str | None,
     *,
@@ -68,24 +191,62 @@ def _safe_num(
     parse_error_key: str,
     null_key: str,
 ) -> str:
-    value = (raw_value or "").strip()
-    if value == "":
+    value, is_null, is_parse_error = _coerce_num(raw_value, integer=integer)
+    if is_null:
         stats.nulls[null_key] += 1
-        return ""
-    try:
-        n = float(value)
-    except ValueError:
+    if is_parse_error:
         stats.parse_errors[parse_error_key] += 1
-        stats.nulls[null_key] += 1
-        return ""
-    if integer:
-        return str(int(n))
-    return str(n)
+    return value
+
+
+def _column_union(files: Sequence[Tuple[int, Path]], verbose: bool) -> List[str]:
+    """Union de columnas (solo headers) + columna año forzada."""
+    columns_set = {"año"}
+    for year, path in files:
+        header = _read_header(path)
+        if not header:
+            if verbose:
+                print(f"[WARN] Archivo sin encabezado (saltado): {path.name}")
+            continue
+        columns_set.update(header)
+        if verbose:
+            print(f"[HEADER] {path.name}: {len(header)} columnas")
+    return sorted(columns_set)
+
 
+@dataclass(frozen=True)
+class CleanConfig:
+    """Parámetros de limpieza de un tipo (compartidos con los workers)."""
 
-def _canonical_hash(parts: Sequence[str]) -> str:
-    payload = "\x1f".join(parts).encode("utf-8", errors="ignore")
-    return hashlib.sha1(payload).hexdigest()
+    tipo: str
+    columns: Tuple[str, ...]
+    numeric_keys: Tuple[str, ...]
+    engine: str = "rows"
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    dedup_bits: int = DEDUP_BITS
+    spill_dir: Optional[Path] = None
+    max_memory_keys: Optional[int] = None
+
+    def fingerprint_set(self) -> FingerprintSet:
+        # Huellas de ancho fijo para duplicados exactos y operacionales; con
+        # spill_dir, las tablas se derraman a disco al superar max_memory_keys.
+        return FingerprintSet(
+            self.dedup_bits, spill_dir=self.spill_dir, max_memory_keys=self.max_memory_keys
+        )
+
+
+@dataclass
+class YearShard:
+    """Resultado de limpiar un año en un worker."""
+
+    year: int
+    path: Path  # filas limpias del año, sin encabezado
+    stats: CleanStats
+    exact_total: int
+    exact_keys: Path  # huellas distintas del año (.npy)
+    op_total: int
+    op_keys: Path
+    span: Optional[Dict] = None  # medición del año (ver scripts/instrumentation.py)
 
 
 def _clean_tipo(
@@ -95,105 +256,548 @@ def _clean_tipo(
     processed_dir: Path,
     numeric_keys: Sequence[str],
     verbose: bool,
+    input_format: str = "csv",
+    dedup_bits: int = DEDUP_BITS,
+    spill_dir: Optional[Path] = None,
+    max_memory_keys: Optional[int] = None,
+    engine: str = "rows",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    jobs: int = 1,
+    incremental: bool = False,
 ) -> CleanStats:
-    files = _iter_files(raw_dir, tipo)
+    files = _iter_files(raw_dir, tipo, input_format)
     if not files:
         raise FileNotFoundError(f"No se encontraron archivos para tipo={tipo} en {raw_dir}")
+    if engine not in ENGINES:
+        raise ValueError(f"engine debe ser uno de {ENGINES} (recibido: {engine})")
+
+    with span("limpiar", tipo=tipo) as etapa:
+        stats = CleanStats(tipo=tipo, files_considered=len(files))
+        config = CleanConfig(
+            tipo=tipo,
+            columns=tuple(_column_union(files, verbose)),
+            numeric_keys=tuple(numeric_keys),
+            engine=engine,
+            chunk_size=chunk_size,
+            dedup_bits=dedup_bits,
+            spill_dir=spill_dir,
+            max_memory_keys=max_memory_keys,
+        )
+        output_path = processed_dir / f"{tipo}_clean_2009_2022.csv"
+
+        if incremental:
+            shard_dir = processed_dir / SHARDS_DIRNAME / tipo
+            _clean_incremental(files, config, output_path, stats, shard_dir, jobs, verbose)
+        elif jobs > 1 and len(files) > 1:
+            _clean_parallel(files, config, output_path, stats, jobs, verbose)
+        else:
+            _clean_serial(files, config, output_path, stats, verbose)
+        etapa.add_rows(stats.rows_input)
+    return stats
 
-    stats = CleanStats(tipo=tipo, files_considered=len(files))
 
-    # Union de columnas (solo headers) + columna año forzada
-    columns_set = {"año"}
-    for year, path in files:
-        header = _read_header(path)
-        if not header:
-            if verbose:
-                print(f"[WARN] Archivo sin encabezado (saltado): {path.name}")
-            continue
-        columns_set.update(header)
-        if verbose:
-            print(f"[HEADER] {path.name}: {len(header)} columnas")
+def _log_year(tipo: str, year: int, stats: CleanStats) -> None:
+    print(
+        f"[OK] {year}_{tipo}: input acumulado={stats.rows_input:,}, "
+        f"output acumulado={stats.rows_output:,}"
+    )
 
-    columns = sorted(columns_set)
-    output_path = processed_dir / f"{tipo}_clean_2009_2022.csv"
 
-    conn = sqlite3.connect(":memory:")
-    cur = conn.cursor()
-    cur.execute("CREATE TABLE exact_seen (sig TEXT PRIMARY KEY)")
-    cur.execute("CREATE TABLE op_seen (sig TEXT PRIMARY KEY)")
+def _header_line(columns: Sequence[str]) -> str:
+    """Encabezado con el mismo formato que ``DictWriter.writeheader``."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
 
-    with output_path.open("w", encoding="utf-8", newline="") as out_f:
-        writer = csv.DictWriter(out_f, fieldnames=columns)
-        writer.writeheader()
 
-        for year, path in files:
-            with path.open("r", encoding="utf-8", newline="") as in_f:
-                reader = csv.DictReader(in_f)
-                if reader.fieldnames is None:
-                    if verbose:
-                        print(f"[WARN] Sin fieldnames (saltado): {path.name}")
-                    continue
-
-                lowered = [h.strip().lower() for h in reader.fieldnames]
-                mapping = dict(zip(reader.fieldnames, lowered))
-
-                for row in reader:
-                    stats.rows_input += 1
-
-                    normalized: Dict[str, str] = {col: "" for col in columns}
-                    for k, v in row.items():
-                        lk = mapping.get(k, "").strip().lower()
-                        if lk:
-                            normalized[lk] = (v or "").strip()
-
-                    # Año forzado desde nombre de archivo
-                    normalized["año"] = str(year)
-
-                    # Coercion numerica en claves
-                    for key in numeric_keys:
-                        if key not in normalized:
-                            normalized[key] = ""
-                        normalized[key] = _safe_num(
-                            normalized[key],
-                            integer=True if key in ("año", "depreg") else False,
-                            stats=stats,
-                            parse_error_key=key,
-                            null_key=key,
-                        )
-
-                    # Regla de exclusion minima: sin año o sin depreg
-                    if normalized.get("año", "") == "" or normalized.get("depreg", "") == "":
-                        stats.rows_excluded_missing_depreg += 1
-                        continue
-
-                    # Duplicado exacto
-                    exact_sig = _canonical_hash([normalized.get(c, "") for c in columns])
-                    cur.execute("INSERT OR IGNORE INTO exact_seen(sig) VALUES (?)", (exact_sig,))
-                    if cur.rowcount == 0:
-                        stats.duplicates_exact += 1
-
-                    # Duplicado operacional (si aplica: año+depreg+mupreg)
-                    mupreg = normalized.get("mupreg", "").strip()
-                    if mupreg != "":
-                        op_sig = _canonical_hash(
-                            [normalized.get("año", ""), normalized.get("depreg", ""), mupreg]
-                        )
-                        cur.execute("INSERT OR IGNORE INTO op_seen(sig) VALUES (?)", (op_sig,))
-                        if cur.rowcount == 0:
-                            stats.duplicates_operational += 1
-
-                    writer.writerow(normalized)
-                    stats.rows_output += 1
-                    stats.year_rows[year] += 1
+def _clean_file(
+    year: int,
+    path: Path,
+    config: CleanConfig,
+    out_f,
+    stats: CleanStats,
+    exact_seen: FingerprintSet,
+    op_seen: FingerprintSet,
+    verbose: bool,
+) -> None:
+    if config.engine == "vectorized":
+        _clean_file_vectorized(year, path, config, out_f, stats, exact_seen, op_seen, verbose)
+    else:
+        _clean_file_rows(year, path, config, out_f, stats, exact_seen, op_seen, verbose)
+
+
+def _clean_serial(
+    files: Sequence[Tuple[int, Path]],
+    config: CleanConfig,
+    output_path: Path,
+    stats: CleanStats,
+    verbose: bool,
+) -> None:
+    exact_seen = config.fingerprint_set()
+    op_seen = config.fingerprint_set()
+    try:
+        with output_path.open("w", encoding="utf-8", newline="") as out_f:
+            out_f.write(_header_line(config.columns))
+            for year, path in files:
+                with span("año", año=year) as medida:
+                    before = stats.rows_input
+                    _clean_file(year, path, config, out_f, stats, exact_seen, op_seen, verbose)
+                    medida.add_rows(stats.rows_input - before)
+                if verbose:
+                    _log_year(config.tipo, year, stats)
+        # El conteo de duplicados no depende del orden: insertadas - distintas
+        stats.duplicates_exact = exact_seen.duplicates
+        stats.duplicates_operational = op_seen.duplicates
+    finally:
+        exact_seen.close()
+        op_seen.close()
+
+
+def _clean_year_shard(
+    year: int,
+    path: Path,
+    config: CleanConfig,
+    shard_dir: Path,
+    verbose: bool,
+) -> YearShard:
+    """Limpia un año (en un proceso del pool) y guarda su shard y sus huellas."""
+    stats = CleanStats(tipo=config.tipo, files_considered=1)
+    shard_path = shard_dir / f"{year}.csv"
+    exact_seen = config.fingerprint_set()
+    op_seen = config.fingerprint_set()
+    try:
+        with span("año", detached=True, año=year) as medida:
+            with shard_path.open("w", encoding="utf-8", newline="") as out_f:
+                _clean_file(year, path, config, out_f, stats, exact_seen, op_seen, verbose)
+            exact_keys = shard_dir / f"{year}.exact.npy"
+            op_keys = shard_dir / f"{year}.op.npy"
+            np.save(exact_keys, exact_seen.distinct_keys())
+            np.save(op_keys, op_seen.distinct_keys())
+            medida.add_rows(stats.rows_input)
+        return YearShard(
+            year=year,
+            path=shard_path,
+            stats=stats,
+            exact_total=exact_seen.total,
+            exact_keys=exact_keys,
+            op_total=op_seen.total,
+            op_keys=op_keys,
+            span=medida.to_dict(),
+        )
+    finally:
+        exact_seen.close()
+        op_seen.close()
+
+
+def _merge_stats(target: CleanStats, partial: CleanStats) -> None:
+    """Acumula en ``target`` los contadores de un año (sin duplicados)."""
+    target.rows_input += partial.rows_input
+    target.rows_output += partial.rows_output
+    target.rows_excluded_missing_depreg += partial.rows_excluded_missing_depreg
+    for key, value in partial.nulls.items():
+        target.nulls[key] += value
+    for key, value in partial.parse_errors.items():
+        target.parse_errors[key] += value
+    for year, value in partial.year_rows.items():
+        target.year_rows[year] += value
+
+
+def _merge_shards(
+    shards: Sequence[YearShard],
+    config: CleanConfig,
+    output_path: Path,
+    stats: CleanStats,
+    verbose: bool,
+) -> None:
+    """
+    Une los shards en orden de año y resuelve duplicados entre años.
+
+    Cada shard trae sus huellas distintas; la unión de todas da las claves
+    distintas globales, y ``insertadas - distintas`` reproduce el conteo de
+    la corrida serial.
+    """
+    exact_seen = config.fingerprint_set()
+    op_seen = config.fingerprint_set()
+    exact_total = 0
+    op_total = 0
+    try:
+        with span("unir", shards=len(shards)), output_path.open("wb") as out_f:
+            out_f.write(_header_line(config.columns).encode("utf-8"))
+            for shard in sorted(shards, key=lambda sh: sh.year):
+                with shard.path.open("rb") as shard_f:
+                    shutil.copyfileobj(shard_f, out_f)
+                _merge_stats(stats, shard.stats)
+                exact_seen.add_array(np.load(shard.exact_keys))
+                op_seen.add_array(np.load(shard.op_keys))
+                exact_total += shard.exact_total
+                op_total += shard.op_total
+                if verbose:
+                    _log_year(config.tipo, shard.year, stats)
+        stats.duplicates_exact = exact_total - exact_seen.distinct
+        stats.duplicates_operational = op_total - op_seen.distinct
+    finally:
+        exact_seen.close()
+        op_seen.close()
+
+
+def _build_shards(
+    files: Sequence[Tuple[int, Path]],
+    config: CleanConfig,
+    shard_dir: Path,
+    jobs: int,
+    verbose: bool,
+) -> List[YearShard]:
+    """Limpia cada año a su shard (un worker por año si ``jobs > 1``)."""
+    if jobs <= 1 or len(files) <= 1:
+        shards = [_clean_year_shard(year, path, config, shard_dir, verbose) for year, path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            futures = [
+                pool.submit(_clean_year_shard, year, path, config, shard_dir, verbose)
+                for year, path in files
+            ]
+            shards = [future.result() for future in futures]
+    for shard in shards:
+        record(shard.span)
+    return shards
+
+
+def _clean_parallel(
+    files: Sequence[Tuple[int, Path]],
+    config: CleanConfig,
+    output_path: Path,
+    stats: CleanStats,
+    jobs: int,
+    verbose: bool,
+) -> None:
+    """Un worker por año; la unión final es idéntica a la corrida serial."""
+    shard_dir = Path(tempfile.mkdtemp(prefix=f".{config.tipo}_shards_", dir=output_path.parent))
+    try:
+        shards = _build_shards(files, config, shard_dir, jobs, verbose)
+        _merge_shards(shards, config, output_path, stats, verbose)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def _stats_to_dict(stats: CleanStats) -> Dict:
+    return {
+        "rows_input": stats.rows_input,
+        "rows_output": stats.rows_output,
+        "rows_excluded_missing_depreg": stats.rows_excluded_missing_depreg,
+        "nulls": dict(stats.nulls),
+        "parse_errors": dict(stats.parse_errors),
+        "year_rows": {str(year): value for year, value in stats.year_rows.items()},
+    }
+
+
+def _stats_from_dict(tipo: str, data: Dict) -> CleanStats:
+    stats = CleanStats(
+        tipo=tipo,
+        files_considered=1,
+        rows_input=data["rows_input"],
+        rows_output=data["rows_output"],
+        rows_excluded_missing_depreg=data["rows_excluded_missing_depreg"],
+    )
+    stats.nulls.update(data["nulls"])
+    stats.parse_errors.update(data["parse_errors"])
+    stats.year_rows.update({int(year): value for year, value in data["year_rows"].items()})
+    return stats
+
 
+def _shard_signature(config: CleanConfig) -> Dict:
+    """Todo lo que, además del archivo de entrada, determina un shard."""
+    return {
+        "rules_version": RULES_VERSION,
+        "columns": list(config.columns),
+        "numeric_keys": list(config.numeric_keys),
+        "dedup_bits": config.dedup_bits,
+        # Cada motor usa un esquema de huellas distinto (no combinables)
+        "engine": config.engine,
+    }
+
+
+def _shard_is_fresh(entry: Optional[Dict], path: Path, shard_dir: Path, year: int) -> bool:
+    """
+    Compara la entrada con el manifiesto: tamaño y mtime primero y, si el
+    mtime cambió, el SHA-256 (p. ej. tras un checkout sin cambios reales).
+    """
+    if entry is None:
+        return False
+    for suffix in (".csv", ".exact.npy", ".op.npy"):
+        if not (shard_dir / f"{year}{suffix}").exists():
+            return False
+    stat = path.stat()
+    if entry.get("size") != stat.st_size:
+        return False
+    if entry.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if file_sha256(path) == entry.get("sha256"):
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def _clean_incremental(
+    files: Sequence[Tuple[int, Path]],
+    config: CleanConfig,
+    output_path: Path,
+    stats: CleanStats,
+    shard_dir: Path,
+    jobs: int,
+    verbose: bool,
+) -> None:
+    """
+    Reprocesa solo los años nuevos o modificados y reensambla las salidas.
+
+    Los shards se invalidan todos si cambia la versión de reglas, las claves
+    numéricas, el ancho o esquema de huellas (motor) o la unión de columnas
+    (que define el formato de cada fila).
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = shard_dir / SHARD_MANIFEST
+    signature = _shard_signature(config)
+    manifest = read_json(manifest_path, default=None)
+    if not isinstance(manifest, dict) or manifest.get("signature") != signature:
+        manifest = {"signature": signature, "years": {}}
+
+    current_years = {str(year) for year, _ in files}
+    for year_key in [y for y in manifest["years"] if y not in current_years]:
+        del manifest["years"][year_key]
+        for suffix in (".csv", ".exact.npy", ".op.npy"):
+            (shard_dir / f"{year_key}{suffix}").unlink(missing_ok=True)
+
+    stale = [
+        (year, path)
+        for year, path in files
+        if not _shard_is_fresh(manifest["years"].get(str(year)), path, shard_dir, year)
+    ]
+    # Se quitan del manifiesto antes de reconstruir: si la corrida se
+    # interrumpe, esos años seguirán marcados como pendientes.
+    for year, _ in stale:
+        manifest["years"].pop(str(year), None)
+    write_json_atomic(manifest, manifest_path)
+
+    if verbose:
+        print(
+            f"[INCREMENTAL] {config.tipo}: reutilizados={len(files) - len(stale)}, "
+            f"reconstruidos={[year for year, _ in stale]}"
+        )
+
+    for shard, (year, path) in zip(_build_shards(stale, config, shard_dir, jobs, verbose), stale):
+        stat = path.stat()
+        manifest["years"][str(year)] = {
+            "input": path.name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+            "exact_total": shard.exact_total,
+            "op_total": shard.op_total,
+            "stats": _stats_to_dict(shard.stats),
+        }
+        write_json_atomic(manifest, manifest_path)
+
+    shards = []
+    for year, _ in files:
+        entry = manifest["years"][str(year)]
+        shards.append(
+            YearShard(
+                year=year,
+                path=shard_dir / f"{year}.csv",
+                stats=_stats_from_dict(config.tipo, entry["stats"]),
+                exact_total=entry["exact_total"],
+                exact_keys=shard_dir / f"{year}.exact.npy",
+                op_total=entry["op_total"],
+                op_keys=shard_dir / f"{year}.op.npy",
+            )
+        )
+    _merge_shards(shards, config, output_path, stats, verbose)
+
+
+def _clean_file_rows(
+    year: int,
+    path: Path,
+    config: CleanConfig,
+    out_f,
+    stats: CleanStats,
+    exact_seen: FingerprintSet,
+    op_seen: FingerprintSet,
+    verbose: bool,
+) -> None:
+    """Motor por filas: un dict normalizado por registro (csv.DictReader)."""
+    columns = config.columns
+    numeric_keys = config.numeric_keys
+    dedup_bits = config.dedup_bits
+    writer = csv.DictWriter(out_f, fieldnames=columns)
+
+    with _open_records(path) as (fieldnames, reader):
+        if fieldnames is None:
             if verbose:
-                print(
-                    f"[OK] {path.name}: input acumulado={stats.rows_input:,}, "
-                    f"output acumulado={stats.rows_output:,}"
+                print(f"[WARN] Sin fieldnames (saltado): {path.name}")
+            return
+
+        lowered = [h.strip().lower() for h in fieldnames]
+        mapping = dict(zip(fieldnames, lowered))
+
+        for row in reader:
+            stats.rows_input += 1
+
+            normalized: Dict[str, str] = {col: "" for col in columns}
+            for k, v in row.items():
+                lk = mapping.get(k, "").strip().lower()
+                if lk:
+                    normalized[lk] = (v or "").strip()
+
+            # Año forzado desde nombre de archivo
+            normalized["año"] = str(year)
+
+            # Coercion numerica en claves
+            for key in numeric_keys:
+                if key not in normalized:
+                    normalized[key] = ""
+                normalized[key] = _safe_num(
+                    normalized[key],
+                    integer=True if key in INTEGER_KEYS else False,
+                    stats=stats,
+                    parse_error_key=key,
+                    null_key=key,
                 )
 
-    conn.close()
-    return stats
+            # Regla de exclusion minima: sin año o sin depreg
+            if normalized.get("año", "") == "" or normalized.get("depreg", "") == "":
+                stats.rows_excluded_missing_depreg += 1
+                continue
+
+            # Duplicado exacto
+            exact_seen.add(fingerprint([normalized.get(c, "") for c in columns], dedup_bits))
+
+            # Duplicado operacional (si aplica: año+depreg+mupreg)
+            mupreg = normalized.get("mupreg", "").strip()
+            if mupreg != "":
+                op_seen.add(
+                    fingerprint(
+                        [normalized.get("año", ""), normalized.get("depreg", ""), mupreg],
+                        dedup_bits,
+                    )
+                )
+
+            writer.writerow(normalized)
+            stats.rows_output += 1
+            stats.year_rows[year] += 1
+
+
+def _header_layout(fieldnames: Sequence[str]) -> Dict[str, int]:
+    """
+    Posición de origen de cada columna normalizada de un archivo.
+
+    Reproduce la resolución de ``DictReader`` + normalización por fila: si
+    varios encabezados se normalizan al mismo nombre, gana el último (en
+    orden de primera aparición) con el valor de su última posición.
+    """
+    last_position: Dict[str, int] = {}
+    for position, name in enumerate(fieldnames):
+        last_position[name] = position
+    layout: Dict[str, int] = {}
+    for name, position in last_position.items():
+        lowered = name.strip().lower()
+        if lowered:
+            layout[lowered] = position
+    return layout
+
+
+def _strip_column(values: Sequence[str]) -> np.ndarray:
+    """``str.strip`` sobre los valores únicos de una columna."""
+    array = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(array)
+    stripped = [u.strip() for u in uniques]
+    if all(a is b or a == b for a, b in zip(stripped, uniques)):
+        return array
+    return np.asarray(stripped, dtype=object)[codes]
+
+
+def _coerce_column(values: np.ndarray, key: str, stats: CleanStats) -> np.ndarray:
+    """``_safe_num`` por columna: se evalúa una vez por valor único."""
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return values
+    integer = key in INTEGER_KEYS
+    results = [_coerce_num(u, integer=integer) for u in uniques]
+    counts = np.bincount(codes, minlength=len(uniques))
+    for (_, is_null, is_parse_error), count in zip(results, counts):
+        if is_null:
+            stats.nulls[key] += int(count)
+        if is_parse_error:
+            stats.parse_errors[key] += int(count)
+    return np.asarray([r[0] for r in results], dtype=object)[codes]
+
+
+def _clean_file_vectorized(
+    year: int,
+    path: Path,
+    config: CleanConfig,
+    out_f,
+    stats: CleanStats,
+    exact_seen: FingerprintSet,
+    op_seen: FingerprintSet,
+    verbose: bool,
+) -> None:
+    """Motor columnar: mismas reglas que ``_clean_file_rows`` por bloques."""
+    columns = config.columns
+    numeric_keys = config.numeric_keys
+    dedup_bits = config.dedup_bits
+    missing_keys = [k for k in numeric_keys if k not in columns]
+    writer = csv.writer(out_f)
+
+    with _open_column_chunks(path, config.chunk_size) as (fieldnames, chunks):
+        if fieldnames is None:
+            if verbose:
+                print(f"[WARN] Sin fieldnames (saltado): {path.name}")
+            return
+
+        layout = _header_layout(fieldnames)
+        for n_rows, raw_columns in chunks:
+            if n_rows == 0:
+                continue
+            stats.rows_input += n_rows
+            empty = np.full(n_rows, "", dtype=object)
+
+            normalized: Dict[str, np.ndarray] = {}
+            for col in columns:
+                position = layout.get(col)
+                normalized[col] = empty if position is None else _strip_column(raw_columns[position])
+
+            # Año forzado desde nombre de archivo
+            normalized["año"] = np.full(n_rows, str(year), dtype=object)
+
+            # Coercion numerica en claves
+            for key in numeric_keys:
+                normalized[key] = _coerce_column(normalized.get(key, empty), key, stats)
+
+            # Regla de exclusion minima: sin año o sin depreg
+            keep = (normalized["año"] != "") & (normalized.get("depreg", empty) != "")
+            kept_rows = int(keep.sum())
+            stats.rows_excluded_missing_depreg += n_rows - kept_rows
+            if kept_rows == 0:
+                continue
+            if missing_keys:
+                # Mismo error que DictWriter en el motor por filas
+                raise ValueError(f"dict contains fields not in fieldnames: {missing_keys}")
+
+            kept = {col: normalized[col][keep] for col in columns}
+            exact_seen.add_array(fingerprint_columns([kept[c] for c in columns], dedup_bits))
+
+            mupreg = kept.get("mupreg")
+            if mupreg is not None:
+                has_mupreg = mupreg != ""
+                op_seen.add_array(
+                    fingerprint_columns(
+                        [kept["año"][has_mupreg], kept["depreg"][has_mupreg], mupreg[has_mupreg]],
+                        dedup_bits,
+                    )
+                )
+
+            writer.writerows(zip(*(kept[c] for c in columns)))
+            stats.rows_output += kept_rows
+            stats.year_rows[year] += kept_rows
 
 
 def _write_quality_report(stats_list: Iterable[CleanStats], out_path: Path) -> None:
@@ -254,22 +858,104 @@ def _write_quality_report(stats_list: Iterable[CleanStats], out_path: Path) -> N
                 )
 
 
+def _emit_parquet(csv_path: Path) -> Path:
+    """Escribe una copia Parquet del dataset clean para lecturas con proyección."""
+    import pandas as pd
+
+    from scripts.columnar import write_partition
+
+    parquet_path = csv_path.with_suffix(".parquet")
+    write_partition(pd.read_csv(csv_path, low_memory=False), parquet_path)
+    return parquet_path
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Construye datasets clean para prefase Q1-Q2.")
     parser.add_argument(
         "--raw-dir",
         type=Path,
-        default=Path("Lab 1/data/raw/csv"),
+        default=DATA_RAW_CSV_DIR,
         help="Directorio de CSV crudos",
     )
     parser.add_argument(
         "--processed-dir",
         type=Path,
-        default=Path("Lab 1/data/processed"),
+        default=DATA_PROCESSED_DIR,
         help="Directorio de salida procesado",
     )
+    parser.add_argument(
+        "--input-format",
+        choices=("csv", "parquet"),
+        default="csv",
+        help="Formato de entrada en raw-dir (parquet: particiones tipo=/anio=)",
+    )
+    parser.add_argument(
+        "--emit-parquet",
+        action="store_true",
+        help="Escribir además una copia Parquet de cada dataset clean",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="rows",
+        help="Motor de limpieza: rows (por fila) o vectorized (bloques columnares)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Filas por bloque del motor vectorizado",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Procesos en paralelo (un año por proceso; 0 = todos los núcleos)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Reutilizar los shards por año sin cambios (--no-incremental: reconstruir todo)",
+    )
+    parser.add_argument(
+        "--dedup-bits",
+        type=int,
+        choices=(64, 128),
+        default=DEDUP_BITS,
+        help="Ancho de las huellas para detectar duplicados",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        type=Path,
+        default=None,
+        help="Directorio para derramar a disco las huellas de duplicados (datasets > RAM)",
+    )
+    parser.add_argument(
+        "--max-memory-keys",
+        type=int,
+        default=None,
+        help="Huellas distintas en memoria antes de derramar a --spill-dir",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada etapa con tracemalloc (más lento)",
+    )
     parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
     args = parser.parse_args()
+    if args.max_memory_keys is not None and args.spill_dir is None:
+        parser.error("--max-memory-keys requiere --spill-dir")
+    start(trace_memory=args.trace_memory)
+    clean_options = {
+        "dedup_bits": args.dedup_bits,
+        "spill_dir": args.spill_dir,
+        "max_memory_keys": args.max_memory_keys,
+        "engine": args.engine,
+        "chunk_size": args.chunk_size,
+        "jobs": args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+        "incremental": args.incremental,
+    }
 
     raw_dir = args.raw_dir
     processed_dir = args.processed_dir
@@ -291,6 +977,8 @@ def main() -> None:
         processed_dir=processed_dir,
         numeric_keys=("año", "depreg"),
         verbose=verbose,
+        input_format=args.input_format,
+        **clean_options,
     )
     def_stats = _clean_tipo(
         tipo="defunciones",
@@ -298,16 +986,33 @@ def main() -> None:
         processed_dir=processed_dir,
         numeric_keys=("año", "depreg", "edadif"),
         verbose=verbose,
+        input_format=args.input_format,
+        **clean_options,
     )
 
     quality_path = processed_dir / "q1q2_control_calidad_2009_2022.csv"
     _write_quality_report([nac_stats, def_stats], quality_path)
+    run_report = write_report(
+        report_path(processed_dir, "limpieza"),
+        "build_q1_q2_clean",
+        raw_dir=raw_dir,
+        engine=args.engine,
+        jobs=clean_options["jobs"],
+        incremental=args.incremental,
+    )
+
+    if args.emit_parquet:
+        for tipo in ("nacimientos", "defunciones"):
+            parquet_path = _emit_parquet(processed_dir / f"{tipo}_clean_2009_2022.csv")
+            if verbose:
+                print(f"[OUT] {parquet_path}")
 
     if verbose:
         print("=== PREFase completada ===")
         print("[OUT]", processed_dir / "nacimientos_clean_2009_2022.csv")
         print("[OUT]", processed_dir / "defunciones_clean_2009_2022.csv")
         print(f"[OUT] {quality_path}")
+        print(f"[OUT] {run_report}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,384 @@
+"""
+Tablas Q1-Q5 sin notebook: una sola pasada por los datasets clean.
+
+Entradas:
+    - data/processed/nacimientos_clean_2009_2022.csv
+    - data/processed/defunciones_clean_2009_2022.csv
+
+Salidas (output/tables/, las mismas que escribe 03_hipotesis.ipynb):
+    - q1_mortalidad_infantil_anual_2009_2022.csv
+    - q3_mortalidad_infantil_mensual_2009_2022.csv
+    - q3_resumen_estacional.csv
+    - q4_tasas_demograficas.csv
+    - q4_tasas_cruzadas.csv (cruces de dos variables de Q4, p. ej. areag × sexo)
+    - q5_silhouette_scores.csv
+    - q5_clusters_departamentos.csv
+    - q5_cluster_summary.csv
+    - q5_estabilidad_clusters.csv (solo con --stability-seeds N, N > 1)
+
+Cada CSV clean se lee una vez, por bloques de texto. Cada bloque alimenta
+a la vez el cubo de conteos de Q1-Q3 (``CountCube.from_chunks``) y los
+conteos por categoría y por par de categorías de Q4
+(``scripts/crosstab_engine.CategoryCounter``) y luego se descarta, así
+que la memoria depende del tamaño del bloque y no del dataset. Q5 se
+calcula sobre el panel departamental del cubo, con el ajuste de tendencia
+vectorizado y el barrido de k en paralelo de ``scripts/trend_clustering``.
+Los valores coinciden con los del notebook (las características de Q5,
+hasta el redondeo de punto flotante), que sigue siendo la referencia del
+análisis (y el que genera las figuras exploratorias).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import DATA_PROCESSED_DIR, OUTPUT_TABLES_DIR, RANDOM_STATE  # noqa: E402
+from scripts.crosstab_engine import (  # noqa: E402
+    MAX_CATEGORIES,
+    MIN_CATEGORIES,
+    CategoryCounter,
+    demographic_rate_table,
+    pair_rate_table,
+)
+from scripts.instrumentation import Span, report_path, span, start, write_report  # noqa: E402
+from scripts.io_utils import atomic_output  # noqa: E402
+from scripts.mortality_cube import (  # noqa: E402
+    DIMENSIONS,
+    INFANT_MAX_AGE,
+    MONTH_CANDIDATES,
+    CountCube,
+    clean_path,
+)
+from scripts.rate_bootstrap import bootstrap_rate_ci  # noqa: E402
+from scripts.rate_panel import RATE_COLUMN  # noqa: E402
+from scripts.report_labels import DEP_LABEL_TEMPLATE, decode_report_codes  # noqa: E402
+from scripts.trend_clustering import kmeans_sweep, stability_table, trend_features  # noqa: E402
+
+
+DEFAULT_CHUNK_SIZE = 200_000
+YEARS = (2009, 2022)
+
+Q1_FILENAME = "q1_mortalidad_infantil_anual_2009_2022.csv"
+Q3_PANEL_FILENAME = "q3_mortalidad_infantil_mensual_2009_2022.csv"
+Q3_SUMMARY_FILENAME = "q3_resumen_estacional.csv"
+Q4_FILENAME = "q4_tasas_demograficas.csv"
+Q4_PAIRS_FILENAME = "q4_tasas_cruzadas.csv"
+Q5_SILHOUETTE_FILENAME = "q5_silhouette_scores.csv"
+Q5_CLUSTERS_FILENAME = "q5_clusters_departamentos.csv"
+Q5_SUMMARY_FILENAME = "q5_cluster_summary.csv"
+Q5_STABILITY_FILENAME = "q5_estabilidad_clusters.csv"
+
+# Columnas compartidas que Q4 no trata como variables demográficas
+Q4_EXCLUDED = {
+    "año", "depreg", "mupreg", "edadif", "folio", "folioe", "pagina", "id", "id_registro", "domreg",
+}
+Q4_MIN_CATEGORIES = MIN_CATEGORIES
+Q4_MAX_CATEGORIES = MAX_CATEGORIES
+
+Q5_FEATURES = [
+    "media_tasa",
+    "std_tasa",
+    "max_tasa",
+    "tasa_ultima",
+    "pendiente_tendencia",
+    "nacimientos_promedio",
+    "defunciones_promedio",
+    "r2_tendencia",
+]
+Q5_K_RANGE = range(2, 6)
+Q5_N_INIT = 25
+Q5_CLUSTER_ALIASES = [
+    "Baja tasa estable",
+    "Intermedia con oscilación",
+    "Alta tasa creciente",
+    "Muy alta y volátil",
+    "Extrema mixta",
+]
+
+
+def _read_chunks(path: Path, columns: Sequence[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    wanted = set(columns)
+    return pd.read_csv(path, usecols=lambda c: c in wanted, dtype=str, chunksize=chunk_size)
+
+
+def _counting(
+    chunks: Iterable[pd.DataFrame],
+    counter: CategoryCounter,
+    mask: Optional[Callable[[pd.DataFrame], np.ndarray]] = None,
+    before: Optional[Callable[[], None]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Entrega los bloques tal cual, sumándolos antes en ``counter``."""
+    if before is not None:
+        before()
+    for chunk in chunks:
+        counter.update(chunk, None if mask is None else mask(chunk))
+        yield chunk
+
+
+def _infant_mask(chunk: pd.DataFrame) -> np.ndarray:
+    edadif = pd.to_numeric(chunk["edadif"], errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return edadif < INFANT_MAX_AGE
+
+
+def _write_table(df: pd.DataFrame, path: Path) -> None:
+    with atomic_output(path) as tmp_path:
+        df.to_csv(tmp_path, index=False)
+
+
+# ----------------------------------------------------------------------
+# Tablas
+# ----------------------------------------------------------------------
+def q1_table(cube: CountCube) -> pd.DataFrame:
+    """Q1: serie anual con tendencia lineal, metadatos e intervalo bootstrap de la tasa."""
+    q1 = cube.annual_rates()
+    x = q1["año"].to_numpy(dtype=float)
+    y = q1[RATE_COLUMN].to_numpy(dtype=float)
+    slope, intercept = np.polyfit(x, y, 1)
+    q1["tendencia"] = (x * slope) + intercept
+    q1["estado_analisis"] = "analisis_principal"
+    q1["nota_metodologica"] = "Serie anual 2009-2022 basada en fuente oficial del INE"
+    return bootstrap_rate_ci(q1, seed=RANDOM_STATE)
+
+
+def q3_summary(panel_mensual: pd.DataFrame) -> pd.DataFrame:
+    """Q3: perfil estacional promedio por mes."""
+    resumen = (
+        panel_mensual.groupby(["mes_num", "mes_nombre"]).agg(
+            tasa_promedio=(RATE_COLUMN, "mean"),
+            tasa_std=(RATE_COLUMN, "std"),
+            defunciones_promedio=("defunciones_infantiles", "mean"),
+        )
+        .reset_index()
+        .sort_values("mes_num")
+    )
+    resumen["coef_variacion"] = resumen["tasa_std"] / resumen["tasa_promedio"]
+    return resumen
+
+
+def q4_table(
+    nacimientos: CategoryCounter, defunciones: CategoryCounter, candidates: Sequence[str]
+) -> Optional[pd.DataFrame]:
+    """Q4: tasas por categoría de las variables con 2-15 categorías en nacimientos."""
+    return demographic_rate_table(
+        nacimientos, defunciones, candidates, Q4_MIN_CATEGORIES, Q4_MAX_CATEGORIES
+    )
+
+
+def q5_features(panel_departamental: pd.DataFrame) -> pd.DataFrame:
+    """Q5: nivel, variabilidad y tendencia de la tasa de cada departamento."""
+    features = trend_features(panel_departamental, ["depreg"])
+    features.insert(1, "dep_label", decode_report_codes(
+        features["depreg"], "depreg", template=DEP_LABEL_TEMPLATE
+    ).astype(str))
+    return features.dropna()
+
+
+def q5_tables(
+    panel_departamental: pd.DataFrame,
+    jobs: Optional[int] = None,
+    stability_seeds: int = 0,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Q5: silueta por k, departamentos con su cluster y resumen por cluster.
+
+    Los KMeans de ``Q5_K_RANGE`` se entrenan en paralelo (``jobs`` procesos).
+    Con ``stability_seeds > 1`` cada k se repite con esa cantidad de
+    semillas (la primera es ``RANDOM_STATE``) y se agrega la tabla de
+    estabilidad; la selección de k sigue usando solo ``RANDOM_STATE``.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    dept_features = q5_features(panel_departamental)
+    if dept_features.empty:
+        raise RuntimeError("No fue posible construir características suficientes para el clustering de Q5.")
+
+    X_scaled = StandardScaler().fit_transform(dept_features[Q5_FEATURES])
+    seeds = [RANDOM_STATE + i for i in range(max(1, stability_seeds))]
+    scores, labels = kmeans_sweep(X_scaled, Q5_K_RANGE, seeds, n_init=Q5_N_INIT, jobs=jobs)
+    silhouette_df = (
+        scores[scores["semilla"] == RANDOM_STATE][["k", "silhouette"]].reset_index(drop=True)
+    )
+    labels_por_k = {k: labels[(k, RANDOM_STATE)] for k in Q5_K_RANGE}
+
+    best_k = int(silhouette_df.sort_values("silhouette", ascending=False).iloc[0]["k"])
+    dept_features["cluster"] = labels_por_k[best_k]
+    clusters = dept_features.copy()
+
+    cluster_summary = (
+        dept_features.groupby("cluster").agg(
+            departamentos=("dep_label", "count"),
+            media_tasa=("media_tasa", "mean"),
+            tasa_ultima=("tasa_ultima", "mean"),
+            pendiente_tendencia=("pendiente_tendencia", "mean"),
+            std_tasa=("std_tasa", "mean"),
+        )
+        .reset_index()
+        .sort_values("media_tasa")
+    )
+    cluster_summary["cluster_label"] = [
+        Q5_CLUSTER_ALIASES[i % len(Q5_CLUSTER_ALIASES)] for i in range(len(cluster_summary))
+    ]
+    tables = {
+        Q5_SILHOUETTE_FILENAME: silhouette_df,
+        Q5_CLUSTERS_FILENAME: clusters,
+        Q5_SUMMARY_FILENAME: cluster_summary,
+    }
+    if len(seeds) > 1:
+        tables[Q5_STABILITY_FILENAME] = stability_table(scores, labels)
+    return tables
+
+
+# ----------------------------------------------------------------------
+# Construcción
+# ----------------------------------------------------------------------
+def build_tables(
+    processed_dir: Path = DATA_PROCESSED_DIR,
+    tables_dir: Path = OUTPUT_TABLES_DIR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verbose: bool = True,
+    jobs: Optional[int] = None,
+    stability_seeds: int = 0,
+) -> Dict[str, Path]:
+    """Calcula y escribe las tablas Q1-Q5; devuelve ``{archivo: ruta}``."""
+    paths = {tipo: clean_path(processed_dir, tipo) for tipo in ("nacimientos", "defunciones")}
+    for path in paths.values():
+        if not path.exists():
+            raise FileNotFoundError(f"No existe {path}. Ejecuta primero scripts/build_q1_q2_clean.py")
+    headers = {tipo: list(pd.read_csv(path, nrows=0).columns) for tipo, path in paths.items()}
+    candidates = sorted(
+        (set(headers["nacimientos"]) & set(headers["defunciones"])) - Q4_EXCLUDED
+    )
+    cube_columns = {"año", "edadif", *DIMENSIONS, *MONTH_CANDIDATES}
+    columns = sorted(cube_columns | set(candidates))
+
+    etapas: List[Span] = []
+    with span("pasada única") as etapa:
+        nac_counter = CategoryCounter(candidates, max_categories=Q4_MAX_CATEGORIES, pairs=True)
+        def_counter = CategoryCounter(candidates, pairs=True)
+        cube = CountCube.from_chunks({
+            "nacimientos": _counting(
+                _read_chunks(paths["nacimientos"], columns, chunk_size), nac_counter
+            ),
+            # Nacimientos ya se leyó: solo se cuentan sus columnas que siguen en Q4
+            "defunciones": _counting(
+                _read_chunks(paths["defunciones"], columns, chunk_size),
+                def_counter,
+                mask=_infant_mask,
+                before=lambda: def_counter.restrict(nac_counter.columns),
+            ),
+        })
+        rows = int(cube.cells["filas"].sum())
+        etapa.add_rows(rows)
+    etapas.append(etapa)
+
+    tables: Dict[str, pd.DataFrame] = {}
+    with span("Q1-Q4") as etapa:
+        tables[Q1_FILENAME] = q1_table(cube)
+        panel_mensual = cube.monthly_panel()
+        tables[Q3_PANEL_FILENAME] = panel_mensual
+        tables[Q3_SUMMARY_FILENAME] = q3_summary(panel_mensual)
+        q4 = q4_table(nac_counter, def_counter, candidates)
+        if q4 is not None:
+            tables[Q4_FILENAME] = q4
+            cruzadas = pair_rate_table(nac_counter, def_counter, list(q4["variable"].unique()))
+            if cruzadas is not None:
+                tables[Q4_PAIRS_FILENAME] = cruzadas
+        elif verbose:
+            print("[Q4] No se encontraron columnas categóricas compartidas con cardinalidad manejable.")
+    etapas.append(etapa)
+
+    with span("Q5") as etapa:
+        panel_departamental = (
+            cube.department_panel(years=YEARS).sort_values(["año", "depreg"]).reset_index(drop=True)
+        )
+        tables.update(q5_tables(panel_departamental, jobs=jobs, stability_seeds=stability_seeds))
+    etapas.append(etapa)
+
+    with span("escritura") as etapa:
+        written = {}
+        for name, table in tables.items():
+            written[name] = tables_dir / name
+            _write_table(table, written[name])
+    etapas.append(etapa)
+
+    if verbose:
+        for etapa in etapas:
+            print(f"[TIEMPO] {etapa.nombre}: {etapa.segundos:.2f}s")
+        print(f"[TIEMPO] total: {sum(e.segundos for e in etapas):.2f}s ({rows} filas clean)")
+        for path in written.values():
+            print(f"[OUT] {path}")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Construye las tablas Q1-Q5 sin ejecutar el notebook.")
+    parser.add_argument(
+        "--processed-dir",
+        type=Path,
+        default=DATA_PROCESSED_DIR,
+        help="Directorio con los datasets clean",
+    )
+    parser.add_argument(
+        "--tables-dir",
+        type=Path,
+        default=OUTPUT_TABLES_DIR,
+        help="Directorio de salida de las tablas",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Filas por bloque al leer los CSV clean",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Procesos para el barrido de KMeans de Q5 (default: núcleos disponibles)",
+    )
+    parser.add_argument(
+        "--stability-seeds",
+        type=int,
+        default=0,
+        help=f"Semillas por k para {Q5_STABILITY_FILENAME} (0 = no se calcula)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada etapa con tracemalloc (más lento)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
+    args = parser.parse_args()
+    start(trace_memory=args.trace_memory)
+    build_tables(
+        args.processed_dir,
+        args.tables_dir,
+        args.chunk_size,
+        verbose=not args.quiet,
+        jobs=args.jobs,
+        stability_seeds=args.stability_seeds,
+    )
+    run_report = write_report(
+        report_path(args.tables_dir, "tablas"),
+        "build_q1_q5_tables",
+        chunk_size=args.chunk_size,
+        jobs=args.jobs,
+        stability_seeds=args.stability_seeds,
+    )
+    if not args.quiet:
+        print(f"[OUT] {run_report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Soporte de formato columnar (Parquet) para los datos convertidos.
+
+Los archivos se organizan particionados por tipo y año::
+
+    data/parquet/tipo=<tipo>/anio=<año>/part-0.parquet
+
+Se conservan los tipos nativos que entrega pyreadstat/openpyxl (float64,
+cadenas), por lo que los consumidores no necesitan volver a inferirlos desde
+texto. Requiere ``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+PARQUET_COMPRESSION = "zstd"
+PARTITION_FILENAME = "part-0.parquet"
+
+# Resultados de ``infer_dtype`` que Arrow convierte sin ambigüedad
+_ARROW_HOMOGENEOUS = {
+    "string",
+    "empty",
+    "integer",
+    "floating",
+    "mixed-integer-float",
+    "boolean",
+    "datetime",
+    "date",
+    "bytes",
+}
+
+_STEM_RE = re.compile(r"^(?P<year>\d{4})_(?P<tipo>[a-z_]+)$")
+
+
+def parse_source_stem(stem: str) -> Tuple[int, str]:
+    """Extrae (año, tipo) de un nombre como ``2015_defunciones_fetales``."""
+    match = _STEM_RE.match(stem.lower())
+    if match is None:
+        raise ValueError(f"Nombre de archivo sin patrón <año>_<tipo>: {stem}")
+    return int(match.group("year")), match.group("tipo")
+
+
+def partition_path(root: Path, tipo: str, year: int) -> Path:
+    """Ruta de la partición Parquet para un tipo y año."""
+    return root / f"tipo={tipo}" / f"anio={year}" / PARTITION_FILENAME
+
+
+def to_arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte a texto las columnas object con tipos mezclados.
+
+    Las hojas XLSX suelen mezclar números y texto en la misma columna, algo
+    que Arrow no admite; los valores nulos se mantienen como nulos.
+    """
+    mixed = [
+        col
+        for col in df.columns
+        if df[col].dtype == object
+        and pd.api.types.infer_dtype(df[col], skipna=True) not in _ARROW_HOMOGENEOUS
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].map(lambda v: v if v is None or (isinstance(v, float) and math.isnan(v)) else str(v))
+    return df
+
+
+def write_partition(df: pd.DataFrame, path: Path) -> None:
+    """Escribe un DataFrame como Parquet comprimido (sin índice)."""
+    df = to_arrow_compatible(df).rename(columns=str)
+    df.to_parquet(path, engine="pyarrow", compression=PARQUET_COMPRESSION, index=False)
+
+
+def read_schema_names(path: Path) -> List[str]:
+    """Nombres de columna originales de un archivo Parquet (sin leer datos)."""
+    import pyarrow.parquet as pq
+
+    return list(pq.read_schema(path).names)
+
+
+def resolve_columns(names: Sequence[str], columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """
+    Traduce una proyección en minúsculas a los nombres originales del archivo.
+
+    Las columnas pedidas que no existen en el archivo se omiten.
+    """
+    if columns is None:
+        return None
+    by_lower: Dict[str, str] = {}
+    for name in names:
+        by_lower.setdefault(name.strip().lower(), name)
+    wanted = {c.strip().lower() for c in columns}
+    return [by_lower[c] for c in by_lower if c in wanted]
+
+
+def read_partition(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lee una partición Parquet con proyección de columnas.
+
+    ``columns`` se interpreta sin distinguir mayúsculas; el resultado tiene
+    los nombres de columna normalizados a minúsculas.
+    """
+    selected = resolve_columns(read_schema_names(path), columns)
+    df = pd.read_parquet(path, engine="pyarrow", columns=selected)
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def _as_csv_text(value: object) -> str:
+    """Representa un valor como lo escribiría ``DataFrame.to_csv``."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return "" if math.isnan(value) else repr(value)
+    return str(value)
+
+
+def iter_text_batches(
+    path: Path,
+    batch_size: int = 65_536,
+) -> Tuple[List[str], Iterator[List[List[str]]]]:
+    """
+    Itera una partición Parquet por bloques de columnas de texto.
+
+    Devuelve los nombres de columna originales y un iterador de bloques; cada
+    bloque es una lista de columnas (listas de texto) con el formato que
+    produciría ``to_csv`` (floats con ``repr``, nulos como cadena vacía).
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    names = list(parquet_file.schema_arrow.names)
+
+    def _batches() -> Iterator[List[List[str]]]:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield [
+                [_as_csv_text(v) for v in batch.column(i).to_pylist()]
+                for i in range(batch.num_columns)
+            ]
+
+    return names, _batches()
+
+
+def iter_text_rows(path: Path, batch_size: int = 65_536) -> Tuple[List[str], Iterator[Dict[str, str]]]:
+    """
+    Itera una partición Parquet como filas de texto equivalentes al CSV.
+
+    Devuelve los nombres de columna originales y un iterador de dicts
+    ``{columna: texto}``, con el mismo formato que produciría ``to_csv``
+    (floats con ``repr``, nulos como cadena vacía). Permite que los
+    consumidores basados en ``csv.DictReader`` lean Parquet sin cambios en
+    sus resultados.
+    """
+    names, batches = iter_text_batches(path, batch_size)
+
+    def _rows() -> Iterator[Dict[str, str]]:
+        for columns in batches:
+            for values in zip(*columns):
+                yield dict(zip(names, values))
+
+    return names, _rows()
@@ -1,59 +1,470 @@
-
 from pathlib import Path
 import argparse
+import os
 import sys
-from typing import Dict, List
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import pyreadstat
 
 
-# Configuración de rutas relativas al script
 SCRIPT_DIR = Path(__file__).parent.parent  # Lab 1/
-BASE_DATA_DIR = SCRIPT_DIR / "data"
-SAV_SOURCE_DIR = BASE_DATA_DIR / "sav"
-CSV_OUTPUT_DIR = BASE_DATA_DIR / "csv"
+if str(SCRIPT_DIR.resolve()) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR.resolve()))
 
+from config import (  # noqa: E402
+    DATA_DIR,
+    DATA_RAW_CSV_DIR,
+    DATA_RAW_PARQUET_DIR,
+    DATA_SAV_DIR,
+)
+from scripts.columnar import (  # noqa: E402
+    partition_path,
+    to_arrow_compatible,
+    write_partition,
+)
+from scripts.xlsx_streaming import (  # noqa: E402
+    format_datetimes_for_csv,
+    iter_chunks,
+    profile_sheet,
+)
+from scripts.download_cache import DownloadCache  # noqa: E402
+from scripts.instrumentation import record, report_path, span, start, write_report  # noqa: E402
+from scripts.metadata_catalog import (  # noqa: E402
+    METADATA_DIR,
+    MetadataCatalog,
+    metadata_entry,
+    read_sav_metadata,
+)
+from scripts.io_utils import (  # noqa: E402
+    atomic_output,
+    cleanup_stale_temporaries,
+    file_sha256,
+    read_json,
+    write_json_atomic,
+)
 
-def convert_sav_to_csv(sav_path: Path, csv_path: Path, verbose: bool = False) -> bool:
-    """Convierte un archivo .sav a .csv usando pyreadstat."""
+
+# Rutas desde config.py: la salida CSV es la misma carpeta que lee
+# build_q1_q2_clean.py (data/raw/csv, o data/csv en la estructura anterior)
+BASE_DATA_DIR = DATA_DIR
+SAV_SOURCE_DIR = DATA_SAV_DIR
+CSV_OUTPUT_DIR = DATA_RAW_CSV_DIR
+PARQUET_OUTPUT_DIR = DATA_RAW_PARQUET_DIR
+OUTPUT_DIRS = {"csv": CSV_OUTPUT_DIR, "parquet": PARQUET_OUTPUT_DIR}
+MANIFEST_VERSION = 1
+DEFAULT_CHUNK_SIZE = 100_000  # filas por bloque; 0 = lectura completa
+
+
+@dataclass
+class ConversionTask:
+    source: Path
+    output: Path
+    manifest_key: str
+    # Año y tipo del índice de fuentes: la ruta resuelta puede ser una
+    # descarga de _cache_downloads (file_<hash>.sav) sin el patrón <año>_<tipo>
+    year: int
+    tipo: str
+    output_format: str = "csv"
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    source_sha256: Optional[str] = None
+
+
+@dataclass
+class ConversionResult:
+    task: ConversionTask
+    ok: bool
+    size: int = 0
+    mtime_ns: int = 0
+    sha256: str = ""
+    rows: int = 0
+    seconds: float = 0.0
+    metadata: Optional[Dict] = None
+    span: Optional[Dict] = None  # medición del archivo (ver scripts/instrumentation.py)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class _ChunkWriter:
+    """Escribe DataFrames por bloques en CSV (append) o Parquet (row groups)."""
+
+    def __init__(self, path: Path, output_format: str) -> None:
+        self.path = path
+        self.output_format = output_format
+        self.rows = 0
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            chunk = to_arrow_compatible(df).rename(columns=str)
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._schema = table.schema
+                self._parquet_writer = pq.ParquetWriter(
+                    self.path, self._schema, compression="zstd"
+                )
+            else:
+                # Se fija el esquema del primer bloque: un bloque con una
+                # columna completamente nula no debe cambiar su tipo.
+                table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(
+                self.path,
+                mode="w" if self.rows == 0 else "a",
+                header=self.rows == 0,
+                index=False,
+                encoding="utf-8",
+            )
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _print_progress(name: str, done: int, total: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    pct = (done / total * 100) if total else 100.0
+    print(f"    {name}: {done:,}/{total:,} filas ({pct:5.1f}%) - {rate:,.0f} filas/s")
+
+
+def _write_sav_chunked(
+    source: Path,
+    tmp_path: Path,
+    output_format: str,
+    chunk_size: int,
+    verbose: bool,
+) -> Tuple[int, Optional[Dict]]:
+    """
+    Convierte un .sav leyendo bloques de ``chunk_size`` filas.
+
+    La memoria pico queda acotada por el tamaño del bloque y no por el del
+    archivo. pyreadstat asigna los tipos desde los metadatos del archivo, por
+    lo que cada bloque se serializa igual que en la lectura completa y la
+    salida es idéntica. Devuelve las filas escritas y los metadatos del
+    archivo (etiquetas de variable y de valor).
+    """
+    writer = _ChunkWriter(tmp_path, output_format)
+    started = time.perf_counter()
+    metadata = None
     try:
-        df, meta = pyreadstat.read_sav(str(sav_path), apply_value_formats=False)
-        assert isinstance(df, pd.DataFrame)
-        df.to_csv(csv_path, index=False, encoding="utf-8")
+        chunks = pyreadstat.read_file_in_chunks(
+            pyreadstat.read_sav,
+            str(source),
+            chunksize=chunk_size,
+            apply_value_formats=False,
+        )
+        for df, meta in chunks:
+            if metadata is None:
+                metadata = metadata_entry(meta)
+            writer.write(df)
+            if verbose:
+                _print_progress(source.name, writer.rows, meta.number_rows or writer.rows, started)
+    finally:
+        writer.close()
+    if writer.rows == 0:
+        # Archivo sin filas: se conserva al menos el encabezado.
+        df, meta = pyreadstat.read_sav(str(source), apply_value_formats=False, row_limit=1)
+        metadata = metadata_entry(meta)
+        writer = _ChunkWriter(tmp_path, output_format)
+        writer.write(df.iloc[0:0])
+        writer.close()
+    return writer.rows, metadata
+
+
+def _write_xlsx_streaming(
+    source: Path,
+    tmp_path: Path,
+    output_format: str,
+    chunk_size: int,
+    verbose: bool,
+) -> Tuple[int, Optional[Dict]]:
+    """
+    Convierte un .xlsx recorriendo la hoja en modo read-only.
+
+    Una primera pasada perfila las columnas (memoria O(columnas)) y la
+    segunda escribe bloques con los mismos dtypes y encabezados que
+    ``pd.read_excel``, sin cargar la hoja completa.
+    """
+    profile = profile_sheet(source)
+    writer = _ChunkWriter(tmp_path, output_format)
+    started = time.perf_counter()
+    try:
+        for df in iter_chunks(source, profile, chunk_size):
+            if output_format == "csv":
+                df = format_datetimes_for_csv(df, profile)
+            writer.write(df)
+            if verbose:
+                _print_progress(source.name, writer.rows, profile.n_rows, started)
+    finally:
+        writer.close()
+    return writer.rows, None
+
+
+def _read_source(source: Path) -> Tuple[pd.DataFrame, Optional[Dict]]:
+    metadata = None
+    if source.suffix.lower() == ".sav":
+        df, meta = pyreadstat.read_sav(str(source), apply_value_formats=False)
+        metadata = metadata_entry(meta)
+    else:
+        df = pd.read_excel(source, engine="openpyxl")
+    assert isinstance(df, pd.DataFrame)
+    return df, metadata
+
+
+def _convert(
+    source: Path,
+    output_path: Path,
+    output_format: str,
+    chunk_size: int,
+    verbose: bool,
+) -> Tuple[int, Optional[Dict]]:
+    """
+    Convierte ``source`` con escritura atómica.
+
+    Devuelve las filas escritas y, para .sav, los metadatos de ``meta``.
+    """
+    with atomic_output(output_path) as tmp_path:
+        if chunk_size > 0:
+            if source.suffix.lower() == ".sav":
+                return _write_sav_chunked(source, tmp_path, output_format, chunk_size, verbose)
+            return _write_xlsx_streaming(source, tmp_path, output_format, chunk_size, verbose)
+        df, metadata = _read_source(source)
+        if output_format == "parquet":
+            write_partition(df, tmp_path)
+        else:
+            df.to_csv(tmp_path, index=False, encoding="utf-8")
+        return len(df), metadata
+
+
+def convert_source(
+    source: Path,
+    output_path: Path,
+    output_format: str = "csv",
+    verbose: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> bool:
+    """
+    Convierte un archivo .sav o .xlsx al formato indicado (escritura atómica).
+
+    ``output_format="csv"`` reproduce la salida histórica en texto;
+    ``"parquet"`` conserva los tipos nativos del DataFrame leído. Los .sav y
+    .xlsx se leen en bloques de ``chunk_size`` filas (0 = archivo completo en
+    memoria con ``read_sav``/``read_excel``).
+    """
+    try:
+        _convert(source, output_path, output_format, chunk_size, verbose)
         if verbose:
-            print(f"  Convertido: {sav_path.name} → {csv_path.name}")
+            print(f"  Convertido: {source.name} → {output_path.name}")
         return True
     except Exception as e:
-        print(f"  Error al convertir {sav_path.name}: {e}")
+        print(f"  Error al convertir {source.name}: {e}")
         return False
 
 
+def convert_sav_to_csv(sav_path: Path, csv_path: Path, verbose: bool = False) -> bool:
+    """
+    Convierte un archivo .sav a .csv leyéndolo en bloques de
+    ``DEFAULT_CHUNK_SIZE`` filas con ``pyreadstat.read_file_in_chunks``.
+    """
+    return convert_source(sav_path, csv_path, "csv", verbose=verbose)
+
+
 def convert_xlsx_to_csv(xlsx_path: Path, csv_path: Path, verbose: bool = False) -> bool:
-    """Convierte un archivo .xlsx a .csv usando pandas."""
+    """
+    Convierte un archivo .xlsx a .csv recorriendo la hoja en modo de solo
+    lectura de openpyxl (``xlsx_streaming``), en bloques de
+    ``DEFAULT_CHUNK_SIZE`` filas.
+    """
+    return convert_source(xlsx_path, csv_path, "csv", verbose=verbose)
+
+
+def output_path_for(year: int, tipo: str, output_format: str) -> Path:
+    """Ruta de salida del archivo de un año y tipo según el formato."""
+    if output_format == "parquet":
+        return partition_path(PARQUET_OUTPUT_DIR, tipo, year)
+    return CSV_OUTPUT_DIR / f"{year}_{tipo}.csv"
+
+
+def manifest_path_for(output_format: str) -> Path:
+    """Manifiesto de conversión, junto al directorio de salida del formato."""
+    return BASE_DATA_DIR / f"{output_format}_manifest.json"
+
+
+def _convert_task(task: ConversionTask, verbose: bool = False) -> ConversionResult:
+    """Convierte un archivo (ejecutable en un proceso del pool)."""
+    # Firma de la fuente tomada antes de convertir: si cambia durante la
+    # conversión, la siguiente corrida la detectará como desactualizada.
+    stat = task.source.stat()
     try:
-        df = pd.read_excel(xlsx_path, engine="openpyxl")
-        df.to_csv(csv_path, index=False, encoding="utf-8")
-        if verbose:
-            print(f"  Convertido: {xlsx_path.name} → {csv_path.name}")
-        return True
+        with span("archivo", detached=True, archivo=task.manifest_key) as medida:
+            rows, metadata = _convert(
+                task.source, task.output, task.output_format, task.chunk_size, verbose
+            )
+            medida.add_rows(rows)
     except Exception as e:
-        print(f"  Error al convertir {xlsx_path.name}: {e}")
+        print(f"  Error al convertir {task.source.name}: {e}")
+        return ConversionResult(task=task, ok=False, span=medida.to_dict())
+    if verbose:
+        print(f"  Convertido: {task.source.name} → {task.output.name}")
+    sha256 = task.source_sha256 or file_sha256(task.source)
+    return ConversionResult(
+        task=task,
+        ok=True,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=sha256,
+        rows=rows,
+        seconds=medida.segundos,
+        metadata=metadata,
+        span=medida.to_dict(),
+    )
+
+
+def _load_manifest(path: Path) -> Dict:
+    manifest = read_json(path, default=None)
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def _is_up_to_date(task: ConversionTask, entry: Optional[Dict]) -> bool:
+    """
+    Decide si la salida de ``task`` sigue vigente según el manifiesto.
+
+    Primero compara tamaño y mtime (sin leer el archivo); solo si el tamaño
+    coincide pero el mtime no, recalcula el hash de contenido. El hash
+    calculado se guarda en la tarea para no recalcularlo tras convertir.
+    """
+    if entry is None or not task.output.exists():
+        return False
+    if entry.get("output") != _output_key(task.output):
+        return False
+    stat = task.source.stat()
+    if entry.get("size") != stat.st_size:
         return False
+    if entry.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if task.source_sha256 is None:
+        task.source_sha256 = file_sha256(task.source)
+    if task.source_sha256 == entry.get("sha256"):
+        # Mismo contenido con mtime distinto (p. ej. tras un checkout): solo
+        # se refresca la firma en el manifiesto.
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def _output_key(output: Path) -> str:
+    return output.relative_to(BASE_DATA_DIR).as_posix()
+
+
+def _record_result(manifest: Dict, result: ConversionResult) -> None:
+    manifest["files"][result.task.manifest_key] = {
+        "output": _output_key(result.task.output),
+        "size": result.size,
+        "mtime_ns": result.mtime_ns,
+        "sha256": result.sha256,
+        "rows": result.rows,
+        "seconds": round(result.seconds, 3),
+    }
+
+
+def _record_metadata(
+    catalogs: Dict[str, MetadataCatalog],
+    task: ConversionTask,
+    sha256: str,
+    metadata: Optional[Dict],
+) -> None:
+    """
+    Guarda los metadatos del .sav de ``task`` en el catálogo de su tipo y año.
+
+    Si la conversión se saltó (sin cambios) y el catálogo no tiene el año o
+    corresponde a otro contenido, los metadatos se leen del encabezado del
+    archivo (sin leer filas).
+    """
+    if task.source.suffix.lower() != ".sav":
+        return
+    catalog = catalogs.setdefault(task.tipo, MetadataCatalog(task.tipo, METADATA_DIR))
+    if metadata is None:
+        if catalog.source_sha256(task.year) == sha256:
+            return
+        metadata = read_sav_metadata(task.source)
+    if catalog.record_year(task.year, metadata, sha256):
+        catalog.save()
+
+
+def _print_report(results: List[ConversionResult]) -> None:
+    """Reporte de conversión con rendimiento (filas/s) por archivo."""
+    print(f"\n{'-'*60}")
+    print("Reporte de conversión")
+    print(f"{'-'*60}")
+    for result in sorted(results, key=lambda r: r.task.manifest_key):
+        print(
+            f"  {result.task.manifest_key:40s} {result.rows:>10,} filas "
+            f"{result.seconds:>7.2f}s {result.rows_per_second:>12,.0f} filas/s"
+        )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Convertir archivos .sav y .xlsx a .csv de forma recursiva",
+        description="Convertir archivos .sav y .xlsx a .csv (o Parquet) de forma recursiva",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Ejemplo:
     python convertir_sav_xlsx_a_csv.py --verbose
     python convertir_sav_xlsx_a_csv.py --dry-run
+    python convertir_sav_xlsx_a_csv.py --jobs 8
+    python convertir_sav_xlsx_a_csv.py --force
+    python convertir_sav_xlsx_a_csv.py --format parquet
         """,
     )
     parser.add_argument("--dry-run", action="store_true", help="Mostrar acciones sin ejecutar")
     parser.add_argument("--verbose", action="store_true", help="Mostrar información detallada")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Procesos en paralelo para la conversión (0 = todos los núcleos)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_DIRS),
+        default="csv",
+        help="Formato de salida: csv (texto) o parquet (columnar, tipos nativos)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Filas por bloque al leer .sav/.xlsx (0 = leer el archivo completo en memoria)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reconvertir todo aunque el manifiesto indique que no hubo cambios",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada archivo con tracemalloc (más lento)",
+    )
     args = parser.parse_args()
+    start(trace_memory=args.trace_memory)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    output_dir = OUTPUT_DIRS[args.format]
+    manifest_path = manifest_path_for(args.format)
 
     # Validar directorios
     if not SAV_SOURCE_DIR.exists():
@@ -62,16 +473,23 @@ Ejemplo:
 
     # Crear directorio de salida si no existe
     if not args.dry_run:
-        CSV_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        print(f"Directorio de salida: {CSV_OUTPUT_DIR}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Directorio de salida: {output_dir}")
+        removed = cleanup_stale_temporaries(output_dir)
+        if removed:
+            print(f"Temporales huérfanos eliminados: {removed}")
 
-    # Buscar todos los archivos .sav y .xlsx
-    sav_files = list(SAV_SOURCE_DIR.rglob("*.sav"))
-    xlsx_files = list(SAV_SOURCE_DIR.rglob("*.xlsx"))
-    
-    # Excluir archivos de caché
-    sav_files = [f for f in sav_files if "_cache_downloads" not in str(f)]
-    xlsx_files = [f for f in xlsx_files if "_cache_downloads" not in str(f)]
+    # Las fuentes se resuelven a través del índice direccionado por contenido
+    # de data/sav: cada contenido se convierte una sola vez aunque exista
+    # también como descarga en _cache_downloads, y el hash ya indexado se
+    # reutiliza en el manifiesto.
+    cache = DownloadCache(SAV_SOURCE_DIR)
+    cache.sync()
+    sources = cache.sources()
+    if not args.dry_run:
+        cache.save()
+    sav_files = [s for s in sources if s.path.suffix.lower() == ".sav"]
+    xlsx_files = [s for s in sources if s.path.suffix.lower() == ".xlsx"]
 
     total_files = len(sav_files) + len(xlsx_files)
     if total_files == 0:
@@ -79,7 +497,7 @@ Ejemplo:
         return
 
     print(f"\n{'='*60}")
-    print(f"Conversión de archivos a CSV")
+    print(f"Conversión de archivos a {args.format.upper()}")
     print(f"{'='*60}")
     print(f"Archivos .sav encontrados: {len(sav_files)}")
     print(f"Archivos .xlsx encontrados: {len(xlsx_files)}")
@@ -88,51 +506,102 @@ Ejemplo:
     if args.dry_run:
         print(f"\n[DRY RUN] Se mostrarán las acciones sin ejecutar")
 
-    # Convertir archivos .sav
-    if sav_files:
-        print(f"\n{'-'*60}")
-        print("Procesando archivos .SAV")
-        print(f"{'-'*60}")
-        success_sav = 0
-        for sav_path in sorted(sav_files):
-            csv_path = CSV_OUTPUT_DIR / f"{sav_path.stem}.csv"
-            
-            if args.dry_run:
-                print(f"[DRY-RUN] {sav_path.relative_to(SAV_SOURCE_DIR)} → {csv_path.name}")
-            else:
-                if convert_sav_to_csv(sav_path, csv_path, verbose=args.verbose):
-                    success_sav += 1
+    # Detectar archivos sin cambios desde la última corrida
+    manifest = _load_manifest(manifest_path)
+    catalogs: Dict[str, MetadataCatalog] = {}
+    pending: List[ConversionTask] = []
+    skipped = 0
+    for source in sav_files + xlsx_files:
+        task = ConversionTask(
+            source=source.path,
+            output=output_path_for(source.year, source.tipo, args.format),
+            manifest_key=source.path.relative_to(SAV_SOURCE_DIR).as_posix(),
+            year=source.year,
+            tipo=source.tipo,
+            output_format=args.format,
+            chunk_size=args.chunk_size,
+            source_sha256=source.sha256,
+        )
+        if not args.force and _is_up_to_date(task, manifest["files"].get(task.manifest_key)):
+            skipped += 1
+            if not args.dry_run:
+                _record_metadata(catalogs, task, source.sha256, None)
+            if args.verbose:
+                print(f"  Sin cambios (saltado): {task.manifest_key}")
+            continue
+        pending.append(task)
+
+    if not args.dry_run:
+        write_json_atomic(manifest, manifest_path)
 
-        if not args.dry_run:
-            print(f"\nArchivos .sav convertidos: {success_sav}/{len(sav_files)}")
+    print(f"Sin cambios (saltados): {skipped}")
+    print(f"Pendientes de conversión: {len(pending)}")
 
-    # Convertir archivos .xlsx
-    if xlsx_files:
+    if args.dry_run:
+        for task in pending:
+            print(f"[DRY-RUN] {task.manifest_key} → {_output_key(task.output)}")
+    elif pending:
         print(f"\n{'-'*60}")
-        print("Procesando archivos .XLSX")
+        print(f"Procesando archivos (jobs={jobs})")
         print(f"{'-'*60}")
-        success_xlsx = 0
-        for xlsx_path in sorted(xlsx_files):
-            csv_path = CSV_OUTPUT_DIR / f"{xlsx_path.stem}.csv"
-            
-            if args.dry_run:
-                print(f"[DRY-RUN] {xlsx_path.relative_to(SAV_SOURCE_DIR)} → {csv_path.name}")
+        success: Dict[str, int] = {".sav": 0, ".xlsx": 0}
+        failed = 0
+        completed: List[ConversionResult] = []
+
+        def _collect(result: ConversionResult) -> None:
+            nonlocal failed
+            record(result.span)
+            if not result.ok:
+                failed += 1
+                return
+            success[result.task.source.suffix.lower()] += 1
+            completed.append(result)
+            # El manifiesto se persiste tras cada archivo para poder
+            # reanudar una corrida interrumpida sin repetir trabajo.
+            _record_result(manifest, result)
+            write_json_atomic(manifest, manifest_path)
+            _record_metadata(catalogs, result.task, result.sha256, result.metadata)
+
+        with span("convertir", formato=args.format) as etapa:
+            if jobs == 1 or len(pending) == 1:
+                for task in pending:
+                    _collect(_convert_task(task, args.verbose))
             else:
-                if convert_xlsx_to_csv(xlsx_path, csv_path, verbose=args.verbose):
-                    success_xlsx += 1
+                with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                    futures = [pool.submit(_convert_task, task, args.verbose) for task in pending]
+                    for future in as_completed(futures):
+                        _collect(future.result())
+            etapa.add_rows(sum(result.rows for result in completed))
+
+        if completed:
+            _print_report(completed)
 
-        if not args.dry_run:
-            print(f"\nArchivos .xlsx convertidos: {success_xlsx}/{len(xlsx_files)}")
+        print(f"\nArchivos .sav convertidos: {success['.sav']}")
+        print(f"Archivos .xlsx convertidos: {success['.xlsx']}")
+        if failed:
+            print(f"Archivos con error: {failed}")
 
     # Resumen
     print(f"\n{'='*60}")
     if not args.dry_run:
-        csv_files = list(CSV_OUTPUT_DIR.glob("*.csv"))
+        pattern = "*.csv" if args.format == "csv" else "**/*.parquet"
+        output_files = list(output_dir.glob(pattern))
         print(f"  PROCESO COMPLETADO")
-        print(f"Archivos CSV generados: {len(csv_files)}")
-        print(f"Ubicación: {CSV_OUTPUT_DIR}")
+        print(f"Archivos {args.format.upper()} generados: {len(output_files)}")
+        print(f"Ubicación: {output_dir}")
+        print(f"Manifiesto: {manifest_path}")
+        run_report = write_report(
+            report_path(output_dir, "conversion"),
+            "convertir_sav_xlsx_a_csv",
+            formato=args.format,
+            jobs=jobs,
+            pendientes=len(pending),
+            saltados=skipped,
+        )
+        print(f"Informe de ejecución: {run_report}")
+        print(f"Catálogo de metadatos: {METADATA_DIR}")
     else:
-        print(f"[DRY-RUN] Se procesarían {total_files} archivos")
+        print(f"[DRY-RUN] Se procesarían {len(pending)} de {total_files} archivos")
     print(f"{'='*60}\n")
 
 
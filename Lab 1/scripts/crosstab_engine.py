@@ -0,0 +1,288 @@
+"""
+Tablas de contingencia de Q4 en una sola pasada.
+
+Q4 compara, para cada variable compartida por nacimientos y defunciones
+con pocas categorías, la tasa de mortalidad infantil de cada categoría.
+``CategoryCounter`` cuenta todas las columnas candidatas a la vez, bloque a
+bloque (CSV leído por partes) o sobre un DataFrame completo:
+
+1. un ``DistinctSketch`` (HyperLogLog) por columna estima su cardinalidad
+   a partir de hashes, sin construir tablas de valores; las columnas que
+   claramente superan ``max_categories`` (identificadores, texto libre) se
+   descartan antes de factorizarlas;
+2. cada columna restante se factoriza una vez por bloque y sus conteos, y
+   los de cada par de columnas (``pairs=True``), salen de ``np.bincount``
+   sobre los códigos;
+3. el tipo de las categorías se deduce de los valores distintos, como lo
+   haría ``read_csv`` sobre el archivo completo.
+
+``demographic_rate_table`` produce la tabla ``q4_tasas_demograficas.csv``
+y ``pair_rate_table`` los cruces de dos variables (p. ej. areag × sexo).
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.mortality_cube import demographic_table
+from scripts.rate_panel import RATE_COLUMN, rate_panel
+
+
+_INT_TEXT = r"[+-]?\d+"
+SKETCH_PRECISION = 10  # 2**10 registros (1 KB por columna)
+# Una columna se descarta si el sketch estima más de este múltiplo de
+# ``max_categories``: el margen cubre el error del estimador y las grafías
+# distintas de un mismo número ("1" y "1.0"), así que una columna que
+# cabe en Q4 nunca se descarta por el sketch.
+SCREEN_FACTOR = 2
+MIN_CATEGORIES = 2
+MAX_CATEGORIES = 15
+
+Pair = Tuple[str, str]
+
+
+class DistinctSketch:
+    """
+    Estimador HyperLogLog de valores distintos.
+
+    Ocupa ``2**precision`` bytes sin importar cuántos valores vea; dos
+    sketches se combinan con ``merge`` (máximo por registro). Con pocos
+    valores usa conteo lineal, prácticamente exacto por debajo de unas
+    decenas de valores.
+    """
+
+    def __init__(self, precision: int = SKETCH_PRECISION) -> None:
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: np.ndarray) -> None:
+        """Agrega valores (cualquier dtype; los nulos ya deben venir filtrados)."""
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values), categorize=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Rango = posición del primer bit 1 en los 32 bits siguientes al índice
+        rest = ((hashes >> np.uint64(32 - self.precision)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        _, bit_length = np.frexp(rest)
+        rank = (33 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "DistinctSketch") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = float(len(self.registers))
+        empty = int(np.count_nonzero(self.registers == 0))
+        raw = (0.7213 / (1 + 1.079 / m)) * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        if raw <= 2.5 * m and empty:
+            return m * np.log(m / empty)
+        return raw
+
+
+class CategoryCounter:
+    """
+    Conteos por categoría de varias columnas (y de sus pares), acumulados
+    por bloques.
+
+    Las categorías se tipan al final como lo haría ``read_csv`` sobre el
+    archivo completo: enteras si todos los valores son enteros y no hay
+    nulos, decimales si son numéricas, texto en otro caso. Con
+    ``max_categories`` se deja de contar una columna en cuanto supera ese
+    número de categorías distintas (ya no puede entrar en Q4); el sketch la
+    descarta incluso antes de factorizarla.
+    """
+
+    def __init__(
+        self, columns: Iterable[str], max_categories: Optional[int] = None, pairs: bool = False
+    ) -> None:
+        self.max_categories = max_categories
+        self._counts: Dict[str, Dict[object, int]] = {col: {} for col in columns}
+        self._pairs: Dict[Pair, Dict[Tuple[object, object], int]] = (
+            {pair: {} for pair in combinations(self._counts, 2)} if pairs else {}
+        )
+        self._sketches = (
+            {col: DistinctSketch() for col in self._counts} if max_categories is not None else {}
+        )
+        self._has_null: Dict[str, bool] = {col: False for col in self._counts}
+        self._has_text: Dict[str, bool] = {col: False for col in self._counts}
+        self._non_integer: Dict[str, bool] = {col: False for col in self._counts}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._counts)
+
+    @property
+    def pairs(self) -> List[Pair]:
+        return list(self._pairs)
+
+    def restrict(self, columns: Iterable[str]) -> None:
+        """Deja de contar las columnas que no estén en ``columns``."""
+        keep = set(columns)
+        for col in [c for c in self._counts if c not in keep]:
+            self._drop(col)
+
+    def _drop(self, col: str) -> None:
+        del self._counts[col]
+        self._sketches.pop(col, None)
+        for pair in [p for p in self._pairs if col in p]:
+            del self._pairs[pair]
+
+    def update(self, chunk: pd.DataFrame, mask: Optional[np.ndarray] = None) -> None:
+        """
+        Suma un bloque. El tipo de cada columna se deduce de todas sus
+        filas; solo las filas de ``mask`` se cuentan.
+        """
+        codes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for col in [c for c in self._counts if c in chunk.columns]:
+            series = chunk[col]
+            sketch = self._sketches.get(col)
+            if sketch is not None:
+                sketch.update(series.dropna().to_numpy())
+                if sketch.estimate() > SCREEN_FACTOR * self.max_categories:
+                    self._drop(col)
+                    continue
+            col_codes, uniques = pd.factorize(series)
+            uniques = np.asarray(uniques, dtype=object)
+            self._observe(col, col_codes, uniques)
+            if mask is not None:
+                col_codes = np.where(mask, col_codes, -1)
+            counts = self._counts[col]
+            tally = np.bincount(col_codes[col_codes >= 0], minlength=len(uniques))
+            for i in np.flatnonzero(tally):
+                counts[uniques[i]] = counts.get(uniques[i], 0) + int(tally[i])
+            if self.max_categories is not None and self.nunique(col) > self.max_categories:
+                self._drop(col)
+                continue
+            codes[col] = (col_codes, uniques)
+
+        for a, b in [p for p in self._pairs if p[0] in codes and p[1] in codes]:
+            codes_a, uniques_a = codes[a]
+            codes_b, uniques_b = codes[b]
+            both = (codes_a >= 0) & (codes_b >= 0)
+            combined = np.bincount(
+                codes_a[both] * len(uniques_b) + codes_b[both], minlength=len(uniques_a) * len(uniques_b)
+            )
+            counts = self._pairs[(a, b)]
+            for i in np.flatnonzero(combined):
+                key = (uniques_a[i // len(uniques_b)], uniques_b[i % len(uniques_b)])
+                counts[key] = counts.get(key, 0) + int(combined[i])
+
+    def _observe(self, col: str, codes: np.ndarray, uniques: np.ndarray) -> None:
+        """Actualiza el tipo de la columna a partir de sus valores distintos."""
+        self._has_null[col] |= bool((codes < 0).any())
+        if self._has_text[col] or len(uniques) == 0:
+            return
+        values = pd.Series(uniques)
+        if pd.to_numeric(values, errors="coerce").isna().any():
+            self._has_text[col] = True
+        elif not self._non_integer[col]:
+            is_integer = values.astype(str).str.strip().str.fullmatch(_INT_TEXT)
+            self._non_integer[col] = not bool(is_integer.all())
+
+    def kind(self, col: str) -> str:
+        if self._has_text[col]:
+            return "text"
+        return "float" if self._has_null[col] or self._non_integer[col] else "int"
+
+    def nunique(self, col: str) -> int:
+        """Categorías distintas (``"1"`` y ``"1.0"`` son la misma si la columna es numérica)."""
+        return len(self.counts(col))
+
+    def _typed(self, col: str, keys: Sequence[object]) -> np.ndarray:
+        kind = self.kind(col)
+        if kind == "text" or len(keys) == 0:
+            return np.asarray(keys, dtype=object)
+        values = pd.to_numeric(pd.Series(keys, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        return values.astype(np.int64) if kind == "int" else values
+
+    def counts(self, col: str) -> pd.Series:
+        """Conteo por categoría, con el dtype que tendría la columna completa."""
+        counts = self._counts[col]
+        values = pd.Series(list(counts.values()), index=list(counts.keys()), dtype=np.int64)
+        if self.kind(col) == "text" or values.empty:
+            return values
+        return values.groupby(self._typed(col, list(counts))).sum()
+
+    def pair_counts(self, a: str, b: str) -> pd.DataFrame:
+        """Conteo por combinación de categorías de ``a`` y ``b`` (columnas ``a``, ``b``, ``filas``)."""
+        counts = self._pairs[(a, b)]
+        keys = list(counts)
+        frame = pd.DataFrame({
+            a: self._typed(a, [key[0] for key in keys]),
+            b: self._typed(b, [key[1] for key in keys]),
+            "filas": np.fromiter(counts.values(), dtype=np.int64, count=len(counts)),
+        })
+        return frame.groupby([a, b], as_index=False, sort=True)["filas"].sum()
+
+
+def _count_frame(counts: pd.Series, col: str) -> pd.DataFrame:
+    return pd.DataFrame({col: counts.index.to_numpy(), "filas": counts.to_numpy()})
+
+
+def demographic_rate_table(
+    nacimientos: CategoryCounter,
+    defunciones: CategoryCounter,
+    candidates: Sequence[str],
+    min_categories: int = MIN_CATEGORIES,
+    max_categories: int = MAX_CATEGORIES,
+) -> Optional[pd.DataFrame]:
+    """
+    Q4: tasas por categoría de las variables con ``min_categories`` a
+    ``max_categories`` categorías en nacimientos (``None`` si no hay).
+    """
+    tables = []
+    for col in candidates:
+        if col not in nacimientos.columns:
+            continue
+        if not min_categories <= nacimientos.nunique(col) <= max_categories:
+            continue
+        counts = rate_panel(
+            _count_frame(defunciones.counts(col), col),
+            _count_frame(nacimientos.counts(col), col),
+            [col],
+            weight="filas",
+            how="outer",
+        )
+        tables.append(demographic_table(counts, col))
+    return pd.concat(tables, ignore_index=True) if tables else None
+
+
+def pair_rate_table(
+    nacimientos: CategoryCounter,
+    defunciones: CategoryCounter,
+    variables: Sequence[str],
+) -> Optional[pd.DataFrame]:
+    """
+    Tasas por combinación de categorías de cada par de ``variables``
+    (p. ej. las que entraron en Q4), en formato largo:
+    ``variable_1, categoria_1, variable_2, categoria_2`` + conteos y tasa.
+    """
+    wanted = set(variables)
+    tables = []
+    for a, b in nacimientos.pairs:
+        if a not in wanted or b not in wanted or (a, b) not in defunciones.pairs:
+            continue
+        counts = rate_panel(
+            defunciones.pair_counts(a, b),
+            nacimientos.pair_counts(a, b),
+            [a, b],
+            weight="filas",
+            how="outer",
+        )
+        table = pd.DataFrame({
+            "variable_1": a,
+            "categoria_1": counts[a].astype(str).replace({"": "Sin dato"}),
+            "variable_2": b,
+            "categoria_2": counts[b].astype(str).replace({"": "Sin dato"}),
+            "nacimientos": counts["nacimientos"],
+            "defunciones_infantiles": counts["defunciones_infantiles"],
+        })
+        table[RATE_COLUMN] = np.where(
+            table["nacimientos"] > 0, (table["defunciones_infantiles"] / table["nacimientos"]) * 1000, np.nan
+        )
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True) if tables else None
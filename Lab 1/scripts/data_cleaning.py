@@ -1,19 +1,55 @@
 
 
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+
 import pandas as pd
 from pathlib import Path
-from typing import Tuple, Dict, List, Optional
+from typing import Callable, Tuple, Dict, List, Optional, Union
+
+from scripts.columnar import partition_path
+from scripts.instrumentation import record, span
+from scripts.metadata_catalog import METADATA_DIR, MetadataCatalog
+from scripts.partitioned_dataset import (
+    Partition,
+    PartitionedDataset,
+    frame_partitions,
+    load_partition,
+    write_partitions,
+)
+from scripts.schema_registry import align_categories, schema_drift, schema_for
+from scripts.streaming_validation import DEFAULT_CHUNK_SIZE, StreamingValidator, iter_source_chunks
 
 
 def cargar_tipo_normalizado(
     tipo_nombre: str,
     años_rango: Tuple[int, int] = (2009, 2023),
     csv_dir: Optional[Path] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    columnas: Optional[List[str]] = None,
+    parquet_dir: Optional[Path] = None,
+    decodificar: Optional[List[str]] = None,
+    metadata_dir: Optional[Path] = None,
+    esquema: bool = True,
+    filtro: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+    trabajadores: Optional[int] = None,
+    procesos: bool = False
 ) -> Tuple[pd.DataFrame, Dict]:
     """
     Carga y normaliza un tipo de dato (defunciones, nacimientos, etc.)
     
+    Con ``esquema=True`` cada año se lee con los dtypes compactos del
+    registro de esquemas (``scripts/schema_registry.py``): enteros con nulos
+    de 8/16 bits para los códigos y ``category`` para códigos de texto. La
+    deriva del esquema entre años queda en ``df.attrs['deriva_esquema']``.
+    
+    Los años se leen en paralelo (hilos por defecto) y se concatenan en
+    orden de año a medida que llegan; ``columnas`` y ``filtro`` se aplican
+    a cada año antes de concatenar, de modo que solo se retiene lo pedido.
+    
     Parametros:
     -----------
     tipo_nombre : str
@@ -24,56 +60,197 @@ def cargar_tipo_normalizado(
         Directorio raíz donde están los CSVs
     verbose : bool
         Si True, imprime progreso de carga
+    columnas : Optional[list]
+        Columnas a leer (lowercase). Si None, se leen todas
+    parquet_dir : Optional[Path]
+        Raíz de las particiones Parquet generadas con
+        ``convertir_sav_xlsx_a_csv.py --format parquet``. Si se indica, se lee
+        Parquet (tipos nativos, sin re-inferir desde texto) en lugar de CSV
+    decodificar : Optional[list]
+        Columnas codificadas a convertir en categóricas con las etiquetas del
+        catálogo de metadatos (ver ``decodificar_columnas``)
+    metadata_dir : Optional[Path]
+        Directorio del catálogo de metadatos. Por defecto ``data/metadata``
+    esquema : bool
+        Si True, aplica el esquema tipado del tipo al leer cada año. Si False,
+        se conservan los dtypes que infiere pandas
+    filtro : Optional[callable]
+        Predicado ``df -> máscara booleana`` aplicado a cada año (ya con
+        columnas en lowercase y la columna ``año``). Las columnas que use
+        deben estar incluidas en ``columnas``. Con ``procesos=True`` debe
+        poder serializarse (una función de módulo, no una lambda)
+    trabajadores : Optional[int]
+        Años leídos a la vez. Por defecto, el mínimo entre el número de años
+        y los núcleos disponibles; 1 lee en serie
+    procesos : bool
+        Si True usa un pool de procesos en lugar de hilos
     
     Retorna:
     --------
     df_consolidado : pd.DataFrame
         DataFrame con todos los años concatenados (columnas normalizadas a lowercase)
     metadata : dict
-        Diccionario con información de carga {año: num_columnas_original}
+        Información de carga por año::
+        
+            {año: {'columnas': num_columnas_original, 'filas': filas,
+                   'segundos': tiempo_de_carga, 'bytes_archivo': tamaño,
+                   'bytes_memoria': memoria_del_año}}
     """
-    if csv_dir is None:
+    if csv_dir is None and parquet_dir is None:
         raise ValueError("csv_dir no puede ser None. Especifica el directorio de los CSVs.")
     
     lista_dfs = []
     metadata = {}
     
+    registro = schema_for(tipo_nombre) if esquema else {}
+    columnas_por_año = {}
+    no_conformes_por_año = {}
+    
+    particiones = []
     for año in range(*años_rango):
-        archivo = csv_dir / f"{año}_{tipo_nombre}.csv"
-        
-        if not archivo.exists():
-            continue
+        if parquet_dir is not None:
+            archivo = partition_path(parquet_dir, tipo_nombre, año)
+        else:
+            assert csv_dir is not None
+            archivo = csv_dir / f"{año}_{tipo_nombre}.csv"
+        if archivo.exists():
+            formato = 'parquet' if parquet_dir is not None else 'csv'
+            particiones.append(Partition(tipo_nombre, año, archivo, formato))
+    
+    cargar = partial(_cargar_año, columnas=columnas, esquema=esquema, filtro=filtro)
+    if trabajadores is None:
+        trabajadores = min(len(particiones), os.cpu_count() or 1)
+    
+    with span("cargar", tipo=tipo_nombre) as etapa, ExitStack() as stack:
+        if trabajadores > 1:
+            pool_cls = ProcessPoolExecutor if procesos else ThreadPoolExecutor
+            pool = stack.enter_context(pool_cls(max_workers=trabajadores))
+            resultados = pool.map(cargar, particiones)
+        else:
+            resultados = map(cargar, particiones)
         
-        try:
-            df = pd.read_csv(archivo, low_memory=False)
-            cols_originales = df.columns.tolist()
-            
-            # Normalizar columnas a lowercase
-            df.columns = df.columns.str.lower()
-            
-            # Agregar año
-            df['año'] = año
+        # ``map`` entrega los resultados en orden de año
+        for año, resultado in zip([p.year for p in particiones], resultados):
+            record(resultado.get('span'))
+            if 'error' in resultado:
+                if verbose:
+                    print(f"ERROR {año}: {resultado['error']}")
+                continue
             
+            df = resultado['df']
             lista_dfs.append(df)
-            metadata[año] = len(cols_originales)
+            etapa.add_rows(len(df))
+            metadata[año] = resultado['metadata']
+            if esquema:
+                columnas_por_año[año] = resultado['columnas']
+                no_conformes_por_año[año] = resultado['no_conformes']
             
             if verbose:
-                print(f"  {año}: {df.shape[0]:,} filas, {df.shape[1]} columnas")
-        
-        except Exception as e:
-            if verbose:
-                print(f"ERROR {año}: {str(e)}")
-            continue
+                print(f"  {año}: {df.shape[0]:,} filas, {df.shape[1]} columnas "
+                      f"({metadata[año]['segundos']:.2f} s)")
     
     if not lista_dfs:
         raise ValueError(f"No se encontraron archivos para {tipo_nombre}")
     
-    # Concatenar verticalmente
+    # Concatenar verticalmente (con categorías unificadas entre años)
+    if esquema:
+        align_categories(lista_dfs)
     df_consolidado = pd.concat(lista_dfs, ignore_index=True)
     
+    if esquema:
+        df_consolidado.attrs['deriva_esquema'] = schema_drift(
+            columnas_por_año, no_conformes_por_año, registro
+        )
+    
+    if decodificar:
+        df_consolidado = decodificar_columnas(
+            df_consolidado, tipo_nombre, decodificar, metadata_dir=metadata_dir
+        )
+    
     return df_consolidado, metadata
 
 
+def _cargar_año(
+    particion: Partition,
+    columnas: Optional[List[str]],
+    esquema: bool,
+    filtro: Optional[Callable[[pd.DataFrame], pd.Series]]
+) -> Dict:
+    """
+    Lee y normaliza un año (se ejecuta en el pool de ``cargar_tipo_normalizado``)
+    
+    Retorna un dict con ``df``, ``metadata``, ``span`` (la medición del año,
+    que agrega el hilo principal) y, con esquema, ``columnas`` y
+    ``no_conformes``; si la lectura falla, solo ``error`` y ``span``.
+    """
+    try:
+        with span("año", detached=True, año=particion.year) as medida:
+            leida = load_partition(
+                particion,
+                columns=columnas,
+                schema=esquema,
+                predicates=(filtro,) if filtro is not None else ()
+            )
+            medida.add_rows(len(leida.frame))
+    except Exception as e:
+        return {'error': str(e), 'span': medida.to_dict()}
+    
+    df = leida.frame
+    resultado = {'df': df, 'span': medida.to_dict()}
+    if esquema:
+        resultado['columnas'] = [c for c in df.columns if c != 'año']
+        resultado['no_conformes'] = leida.nonconforming
+    resultado['metadata'] = {
+        'columnas': len(leida.original_columns),
+        'filas': len(df),
+        'segundos': leida.seconds,
+        'bytes_archivo': particion.file_bytes,
+        'bytes_memoria': int(df.memory_usage(deep=True).sum()),
+    }
+    return resultado
+
+
+def decodificar_columnas(
+    df: pd.DataFrame,
+    tipo_nombre: str,
+    columnas: List[str],
+    metadata_dir: Optional[Path] = None,
+    plantilla: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Convierte columnas codificadas en categóricas con sus etiquetas del INE
+    
+    Las etiquetas se toman del catálogo que genera el conversor a partir de
+    los metadatos de los .sav; el mapeo es vectorizado (sin ``.apply`` por
+    fila). Las columnas sin etiquetas en el catálogo se dejan sin cambios.
+    
+    Parametros:
+    -----------
+    df : pd.DataFrame
+        Dataset con columnas en lowercase
+    tipo_nombre : str
+        Tipo de dato cuyo catálogo se usa
+    columnas : list
+        Columnas a decodificar
+    metadata_dir : Optional[Path]
+        Directorio del catálogo. Por defecto ``data/metadata``
+    plantilla : Optional[str]
+        Formato de la etiqueta, p. ej. ``"{codigo:02d} - {etiqueta}"``
+    
+    Retorna:
+    --------
+    df : pd.DataFrame
+        Copia del dataset con las columnas decodificadas
+    """
+    catalogo = MetadataCatalog(tipo_nombre, metadata_dir or METADATA_DIR)
+    df = df.copy()
+    for col in columnas:
+        col = col.strip().lower()
+        if col in df.columns and catalogo.value_labels(col):
+            df[col] = catalogo.decode(df[col], col, template=plantilla)
+    return df
+
+
 def resumen_carga(
     df: pd.DataFrame,
     tipo_nombre: str,
@@ -90,7 +267,7 @@ def resumen_carga(
     tipo_nombre : str
         Nombre del tipo de dato (para encabezado)
     metadata : dict
-        Metadata con información por año
+        Metadata por año devuelta por ``cargar_tipo_normalizado``
     mostrar_columnas : bool
         Si True, muestra lista de todas las columnas
     """
@@ -102,9 +279,22 @@ def resumen_carga(
     print(f"Rango años: {df['año'].min()} - {df['año'].max()}")
     print(f"Memoria: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
     
-    print(f"\nColumnas originales por año:")
+    print(f"\nCarga por año (columnas originales, filas, tiempo, archivo):")
     for año in sorted(metadata.keys()):
-        print(f"  {año}: {metadata[año]} columnas")
+        info = metadata[año]
+        print(f"  {año}: {info['columnas']:>3} columnas, {info['filas']:>10,} filas, "
+              f"{info['segundos']:6.2f} s, {info['bytes_archivo'] / 1024**2:8.2f} MB")
+    if metadata:
+        total = sum(info['segundos'] for info in metadata.values())
+        lento = max(metadata, key=lambda a: metadata[a]['segundos'])
+        print(f"  Tiempo de lectura acumulado: {total:.2f} s (año más lento: {lento})")
+    
+    deriva = df.attrs.get('deriva_esquema')
+    if deriva:
+        print(f"\nDeriva de esquema entre años ({len(deriva)} eventos):")
+        for evento in deriva:
+            detalle = f" ({evento['detalle']})" if evento['detalle'] else ""
+            print(f"  {evento['año']}: {evento['columna']:15s} {evento['evento']}{detalle}")
     
     if mostrar_columnas:
         print(f"\nColumnas del dataset consolidado:")
@@ -122,10 +312,21 @@ def consolidar_todos_tipos(
     tipos_lista: List[str],
     años_rango: Tuple[int, int] = (2009, 2023),
     csv_dir: Optional[Path] = None,
-    verbose: bool = True
-) -> Tuple[Dict, pd.DataFrame]:
+    verbose: bool = True,
+    parquet_dir: Optional[Path] = None,
+    materializar: bool = False
+) -> Tuple[Dict, PartitionedDataset]:
     """
-    Carga todos los tipos de datos y los consolida en un master dataset
+    Describe el master dataset particionado y, si se pide, carga cada tipo
+    
+    El master no se concatena: se devuelve un ``PartitionedDataset``
+    perezoso (particiones tipo/año) que filtra, proyecta, cuenta y hace
+    map/reduce por partición sin construir la unión dispersa de columnas.
+    Por defecto no se lee ninguna fila de datos: la metadata por año sale de
+    los encabezados y del conteo de filas de cada partición, y cada
+    consumidor lee lo que necesita (``master.filter(tipos=[...]).materialize()``).
+    Con ``materializar=True`` además se carga cada tipo completo con
+    ``cargar_tipo_normalizado``.
     
     Parametros:
     -----------
@@ -137,6 +338,10 @@ def consolidar_todos_tipos(
         Directorio raíz de los CSVs
     verbose : bool
         Si True, imprime progreso detallado
+    parquet_dir : Optional[Path]
+        Raíz de las particiones Parquet; si se indica se usa en lugar de CSV
+    materializar : bool
+        Si True, carga el DataFrame de cada tipo (``'df'`` en el resultado)
     
     Retorna:
     --------
@@ -144,94 +349,159 @@ def consolidar_todos_tipos(
         Diccionario con estructura:
         {
             'defunciones': {
-                'df': DataFrame,
-                'metadata': {año: num_cols, ...}
+                'metadata': {año: {'columnas', 'filas', 'bytes_archivo', ...}, ...},
+                'df': DataFrame  # solo con materializar=True
             },
             ...
         }
-    master : pd.DataFrame
-        Master dataset consolidado con columna 'tipo' identificando la fuente
+        Sin ``materializar`` la metadata por año no incluye ``segundos`` ni
+        ``bytes_memoria`` (no hubo carga).
+    master : PartitionedDataset
+        Master dataset perezoso sobre los tipos presentes
     """
-    if csv_dir is None:
+    if csv_dir is None and parquet_dir is None:
         raise ValueError("csv_dir no puede ser None. Especifica el directorio de los CSVs.")
     
     dfs_por_tipo = {}
     
     print("="*70)
-    print("CARGANDO Y NORMALIZANDO TODOS LOS TIPOS")
+    print("CARGANDO Y NORMALIZANDO TODOS LOS TIPOS" if materializar
+          else "DESCRIBIENDO TODOS LOS TIPOS (sin cargar filas)")
     print("="*70)
     
-    for tipo in tipos_lista:
-        try:
-            df, metadata = cargar_tipo_normalizado(
-                tipo,
-                años_rango=años_rango,
-                csv_dir=csv_dir,
-                verbose=verbose
-            )
+    with span("consolidar"):
+        master = PartitionedDataset.discover(
+            tipos_lista,
+            años_rango,
+            csv_dir=csv_dir,
+            parquet_dir=parquet_dir
+        )
+        
+        for tipo in tipos_lista:
+            if tipo not in master.tipos:
+                print(f"\nADVERTENCIA: No se encontraron archivos para {tipo}\n")
+                continue
+            if not materializar:
+                dfs_por_tipo[tipo] = {'metadata': _metadata_particiones(master, tipo)}
+                if verbose:
+                    for año, info in dfs_por_tipo[tipo]['metadata'].items():
+                        print(f"  {tipo} {año}: {info['filas']:,} filas, {info['columnas']} columnas")
+                continue
+            try:
+                df, metadata = cargar_tipo_normalizado(
+                    tipo,
+                    años_rango=años_rango,
+                    csv_dir=csv_dir,
+                    verbose=verbose,
+                    parquet_dir=parquet_dir
+                )
             
-            # Agregar columna identificadora de tipo
-            df['tipo'] = tipo
+                # Agregar columna identificadora de tipo
+                df['tipo'] = tipo
             
-            dfs_por_tipo[tipo] = {
-                'df': df,
-                'metadata': metadata
-            }
+                dfs_por_tipo[tipo] = {
+                    'df': df,
+                    'metadata': metadata
+                }
             
-            resumen_carga(df, tipo, metadata, mostrar_columnas=False)
+                resumen_carga(df, tipo, metadata, mostrar_columnas=False)
         
-        except Exception as e:
-            print(f"\nADVERTENCIA: No se pudo cargar {tipo}: {str(e)}\n")
-            continue
+            except Exception as e:
+                print(f"\nADVERTENCIA: No se pudo cargar {tipo}: {str(e)}\n")
+                continue
     
-    # Consolidar en master dataset
+    # Master dataset particionado (sin concatenar)
     print(f"\n{'='*70}")
-    print("CONSOLIDANDO MASTER DATASET")
+    print("MASTER DATASET PARTICIONADO (tipo/año)")
     print(f"{'='*70}")
     
-    master = pd.concat(
-        [dfs_por_tipo[tipo]['df'] for tipo in dfs_por_tipo.keys()],
-        ignore_index=True
-    )
+    filas_por_tipo = {
+        tipo: sum(info['filas'] for info in datos['metadata'].values())
+        for tipo, datos in dfs_por_tipo.items()
+    }
+    total = sum(filas_por_tipo.values())
     
     print(f"\nMaster dataset:")
-    print(f"  Filas totales: {master.shape[0]:,}")
-    print(f"  Columnas totales: {master.shape[1]}")
-    print(f"  Tipos presentes: {sorted(master['tipo'].unique())}")
+    print(f"  Particiones: {len(master)}")
+    print(f"  Filas totales: {total:,}")
+    print(f"  Tipos presentes: {master.tipos}")
     print(f"  Distribución:")
-    for tipo in sorted(master['tipo'].unique()):
-        count = (master['tipo'] == tipo).sum()
-        porcentaje = (count / len(master)) * 100
-        print(f"    {tipo:25s}: {count:>10,} ({porcentaje:5.1f}%)")
+    for tipo in sorted(filas_por_tipo):
+        porcentaje = (filas_por_tipo[tipo] / total) * 100 if total else 0.0
+        print(f"    {tipo:25s}: {filas_por_tipo[tipo]:>10,} ({porcentaje:5.1f}%)")
     
     return dfs_por_tipo, master
 
 
-def validar_dataset(df: pd.DataFrame, nombre: str = "Dataset") -> Dict:
+def _metadata_particiones(master: PartitionedDataset, tipo: str) -> Dict[int, Dict]:
+    """Metadata por año de un tipo leyendo solo encabezados y conteos de filas"""
+    return {
+        particion.year: {
+            'columnas': len(particion.column_names()),
+            'filas': particion.num_rows(),
+            'bytes_archivo': particion.file_bytes,
+        }
+        for particion in master.partitions
+        if particion.tipo == tipo
+    }
+
+
+def validar_dataset(
+    df: Union[pd.DataFrame, Path, PartitionedDataset],
+    nombre: str = "Dataset",
+    tamaño_bloque: int = DEFAULT_CHUNK_SIZE,
+    spill_dir: Optional[Path] = None,
+    max_memory_keys: Optional[int] = None
+) -> Dict:
     """
-    Realiza validaciones básicas de calidad de datos
+    Realiza validaciones básicas de calidad de datos en una sola pasada
+    
+    El dataset se recorre por bloques (``scripts/streaming_validation.py``):
+    nulos, dtypes, conformidad con el esquema del tipo, mínimos y máximos,
+    duplicados exactos por huella de fila y cobertura por año. La memoria
+    queda acotada por el bloque y el conjunto de huellas, no por el tamaño
+    del dataset, por lo que puede validarse directamente desde disco.
     
     Parametros:
     -----------
-    df : pd.DataFrame
-        DataFrame a validar
+    df : pd.DataFrame, Path o PartitionedDataset
+        Dataset a validar: un DataFrame en memoria, la ruta de un CSV/Parquet
+        (p. ej. ``master_dataset.csv``) o un dataset particionado (se lee una
+        partición a la vez)
     nombre : str
         Nombre del dataset (para reportes)
+    tamaño_bloque : int
+        Filas por bloque
+    spill_dir : Optional[Path]
+        Directorio para derramar las huellas de duplicados a disco
+    max_memory_keys : Optional[int]
+        Huellas distintas en memoria antes de derramar (requiere ``spill_dir``)
     
     Retorna:
     --------
     reporte : dict
-        Diccionario con estadísticas de validación
+        Diccionario con estadísticas de validación: ``filas``, ``columnas``,
+        ``columnas_lista``, ``duplicados_totales``, ``nulos_por_columna``,
+        ``tipos_datos``, ``min_max``, ``no_conformes_por_columna``,
+        ``cobertura_por_año`` y ``completitud_por_año``
     """
-    reporte = {
-        'nombre': nombre,
-        'filas': len(df),
-        'columnas': df.shape[1],
-        'columnas_lista': df.columns.tolist(),
-        'duplicados_totales': df.duplicated().sum(),
-        'nulos_por_columna': df.isnull().sum().to_dict(),
-        'tipos_datos': df.dtypes.to_dict(),
-    }
+    validador = StreamingValidator(
+        text_input=isinstance(df, Path) and df.suffix.lower() != ".parquet",
+        spill_dir=spill_dir,
+        max_memory_keys=max_memory_keys
+    )
+    if isinstance(df, pd.DataFrame):
+        bloques = _bloques(df, tamaño_bloque)
+    elif isinstance(df, PartitionedDataset):
+        bloques = (
+            bloque
+            for particion, frame in df.iter_frames()
+            for bloque in _bloques(frame.assign(tipo=particion.tipo), tamaño_bloque)
+        )
+    else:
+        bloques = iter_source_chunks(Path(df), tamaño_bloque)
+    validador.update_many(bloques)
+    reporte = validador.report(nombre)
     
     print(f"\n{'='*70}")
     print(f"VALIDACIÓN: {nombre}")
@@ -243,31 +513,92 @@ def validar_dataset(df: pd.DataFrame, nombre: str = "Dataset") -> Dict:
     nulos = {k: v for k, v in reporte['nulos_por_columna'].items() if v > 0}
     if nulos:
         for col, count in sorted(nulos.items(), key=lambda x: x[1], reverse=True)[:5]:
-            porcentaje = (count / len(df)) * 100
+            porcentaje = (count / reporte['filas']) * 100
             print(f"  {col:25s}: {count:>10,} ({porcentaje:5.1f}%)")
     else:
         print("  Ninguna columna con valores nulos")
     
+    no_conformes = reporte['no_conformes_por_columna']
+    if no_conformes:
+        print(f"\nValores fuera del dtype declarado:")
+        for col, count in sorted(no_conformes.items(), key=lambda x: x[1], reverse=True)[:5]:
+            print(f"  {col:25s}: {count:>10,}")
+    
+    if reporte['cobertura_por_año']:
+        print(f"\nCobertura por año:")
+        for año, filas in reporte['cobertura_por_año'].items():
+            print(f"  {año}: {filas:>10,} filas")
+    
     return reporte
 
 
-def guardar_dataset(df: pd.DataFrame, ruta_salida: Path, nombre: str = "") -> None:
+def _bloques(df: pd.DataFrame, tamaño_bloque: int):
+    """Vistas consecutivas de ``tamaño_bloque`` filas (al menos una, aunque esté vacía)"""
+    for inicio in range(0, max(len(df), 1), tamaño_bloque):
+        yield df.iloc[inicio:inicio + tamaño_bloque]
+
+
+def guardar_dataset(
+    df: Union[pd.DataFrame, PartitionedDataset],
+    ruta_salida: Path,
+    nombre: str = "",
+    particionado: bool = False,
+    formato: str = 'parquet',
+    trabajadores: Optional[int] = None,
+    tipo: Optional[str] = None,
+) -> Optional[Dict]:
     """
-    Guarda dataset en CSV con confirmación
+    Guarda dataset en CSV, o en particiones tipo/año (Parquet por defecto)
+    con ``particionado=True``, con confirmación
     
     Parametros:
     -----------
-    df : pd.DataFrame
-        DataFrame a guardar
+    df : pd.DataFrame o PartitionedDataset
+        DataFrame a guardar (un PartitionedDataset requiere particionado=True
+        y se escribe partición por partición, sin materializarlo)
     ruta_salida : Path
-        Ruta donde guardar el archivo
+        Ruta donde guardar el archivo (directorio si particionado=True)
     nombre : str
         Nombre descriptivo (para mensajes)
+    particionado : bool
+        Si True, escribe una partición comprimida por tipo/año
+        (tipo=<t>/anio=<a>/) en paralelo, más un manifest.json con filas y
+        nulos/min/max por columna para poder descartar particiones sin
+        abrirlas (ver PartitionedDataset.from_manifest)
+    formato : str
+        'parquet' (zstd) o 'csv' (gzip), solo con particionado=True
+    trabajadores : int, opcional
+        Hilos de escritura (por defecto, según los núcleos disponibles)
+    tipo : str, opcional
+        Tipo de todas las filas si el DataFrame no tiene columna 'tipo'
+    
+    Retorna:
+    --------
+    Dict o None
+        Manifiesto de la escritura particionada
     """
+    inicio = time.perf_counter()
+    if particionado:
+        if isinstance(df, PartitionedDataset):
+            manifiesto = df.write(ruta_salida, fmt=formato, workers=trabajadores)
+        else:
+            manifiesto = write_partitions(
+                frame_partitions(df, tipo=tipo), ruta_salida, fmt=formato, workers=trabajadores
+            )
+        tamaño_mb = manifiesto['bytes'] / (1024**2)
+        print(f"\n  {nombre} guardado en: {ruta_salida}/ "
+              f"({len(manifiesto['particiones'])} particiones {formato}, "
+              f"{manifiesto['filas']:,} filas)")
+        print(f"  Tamaño: {tamaño_mb:.2f} MB  ({time.perf_counter() - inicio:.2f}s)")
+        return manifiesto
+
+    if isinstance(df, PartitionedDataset):
+        raise ValueError("Un PartitionedDataset se guarda con particionado=True")
     ruta_salida.parent.mkdir(parents=True, exist_ok=True)
     
     df.to_csv(ruta_salida, index=False)
     tamaño_mb = ruta_salida.stat().st_size / (1024**2)
     
     print(f"\n  {nombre} guardado en: {ruta_salida}")
-    print(f"  Tamaño: {tamaño_mb:.2f} MB")
+    print(f"  Tamaño: {tamaño_mb:.2f} MB  ({time.perf_counter() - inicio:.2f}s)")
+    return None
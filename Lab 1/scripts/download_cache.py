@@ -0,0 +1,301 @@
+"""
+Índice direccionado por contenido para los archivos fuente del INE.
+
+``data/sav/_cache_downloads`` guarda descargas con nombres ``file_<hash>``
+que duplican los archivos de las carpetas por año. Este módulo mantiene un
+índice persistente (``_cache_downloads/index.json``) con dos tablas:
+
+- ``objects``: SHA-256 del contenido → año, tipo, origen, copia en caché,
+  tamaño y último acceso.
+- ``paths``: ruta relativa → firma (tamaño, mtime, inodo) y SHA-256, para no
+  volver a leer un archivo cuyo stat no cambió.
+
+Las búsquedas verifican el contenido (stat y, si cambió, hash completo), los
+duplicados se reemplazan por hardlinks y la caché admite expulsión LRU con
+un tope de tamaño.
+
+Uso:
+    python download_cache.py                 # sincronizar índice y reportar
+    python download_cache.py --dedup         # reemplazar copias por hardlinks
+    python download_cache.py --max-mb 50     # expulsar (LRU) hasta 50 MB
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.columnar import parse_source_stem  # noqa: E402
+from scripts.io_utils import atomic_output, file_sha256, read_json, write_json_atomic  # noqa: E402
+
+
+SAV_ROOT = PROJECT_ROOT / "data" / "sav"
+CACHE_DIRNAME = "_cache_downloads"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+SOURCE_SUFFIXES = (".sav", ".xlsx")
+
+
+@dataclass
+class CachedSource:
+    sha256: str
+    year: int
+    tipo: str
+    path: Path
+
+
+class DownloadCache:
+    """Índice persistente hash → (año, tipo, origen) sobre ``data/sav``."""
+
+    def __init__(self, sav_root: Path = SAV_ROOT) -> None:
+        self.sav_root = sav_root
+        self.cache_dir = sav_root / CACHE_DIRNAME
+        self.index_path = self.cache_dir / INDEX_FILENAME
+        index = read_json(self.index_path, default=None)
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            index = {"version": INDEX_VERSION, "objects": {}, "paths": {}}
+        self.objects: Dict[str, Dict] = index["objects"]
+        self.paths: Dict[str, Dict] = index["paths"]
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(
+            {"version": INDEX_VERSION, "objects": self.objects, "paths": self.paths},
+            self.index_path,
+        )
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.sav_root).as_posix()
+
+    # ------------------------------------------------------------------
+    # Hash con memoización por stat
+    # ------------------------------------------------------------------
+    def content_hash(self, path: Path) -> str:
+        """SHA-256 de ``path``; solo se recalcula si su stat cambió."""
+        stat = path.stat()
+        signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "ino": stat.st_ino}
+        rel = self._rel(path)
+        known = self.paths.get(rel)
+        if known is not None and all(known.get(k) == v for k, v in signature.items()):
+            return known["sha256"]
+        sha256 = file_sha256(path)
+        self.paths[rel] = {**signature, "sha256": sha256}
+        return sha256
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def _year_folder_files(self) -> List[Path]:
+        files = []
+        for suffix in SOURCE_SUFFIXES:
+            files.extend(
+                p for p in self.sav_root.glob(f"*/*{suffix}") if p.parent.name != CACHE_DIRNAME
+            )
+        return sorted(files)
+
+    def _cache_files(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return sorted(p for p in self.cache_dir.iterdir() if p.suffix.lower() in SOURCE_SUFFIXES)
+
+    def register(self, path: Path, year: Optional[int], tipo: Optional[str], source: str) -> str:
+        """Registra un archivo fuente y devuelve su hash de contenido."""
+        sha256 = self.content_hash(path)
+        entry = self.objects.setdefault(
+            sha256,
+            {"year": year, "tipo": tipo, "source": source, "size": path.stat().st_size,
+             "suffix": path.suffix.lower(), "path": None, "cache_file": None,
+             "last_access": time.time()},
+        )
+        if year is not None:
+            entry.update(year=year, tipo=tipo, source=source)
+        if path.parent == self.cache_dir:
+            entry["cache_file"] = path.name
+        else:
+            entry["path"] = self._rel(path)
+        return sha256
+
+    def sync(self) -> None:
+        """
+        Reconcilia el índice con el disco.
+
+        Registra los archivos de las carpetas por año (año y tipo tomados del
+        nombre) y adopta las descargas de ``_cache_downloads``: si su
+        contenido coincide con un archivo ya registrado quedan como su copia
+        en caché; si no, se indexan como huérfanas (sin año/tipo).
+        """
+        for path in self._year_folder_files():
+            try:
+                year, tipo = parse_source_stem(path.stem)
+            except ValueError:
+                continue
+            self.register(path, year, tipo, source=self._rel(path))
+        for path in self._cache_files():
+            self.register(path, None, None, source=self._rel(path))
+        # Rutas que ya no existen
+        for rel in [rel for rel in self.paths if not (self.sav_root / rel).exists()]:
+            del self.paths[rel]
+        for sha256, entry in list(self.objects.items()):
+            if entry.get("path") and not (self.sav_root / entry["path"]).exists():
+                entry["path"] = None
+            if entry.get("cache_file") and not (self.cache_dir / entry["cache_file"]).exists():
+                entry["cache_file"] = None
+            if entry.get("path") is None and entry.get("cache_file") is None:
+                del self.objects[sha256]
+
+    # ------------------------------------------------------------------
+    # Búsqueda verificada
+    # ------------------------------------------------------------------
+    def _candidates(self, entry: Dict) -> List[Path]:
+        paths = []
+        if entry.get("path"):
+            paths.append(self.sav_root / entry["path"])
+        if entry.get("cache_file"):
+            paths.append(self.cache_dir / entry["cache_file"])
+        return paths
+
+    def lookup(self, sha256: str) -> Optional[Path]:
+        """
+        Devuelve una ruta cuyo contenido tiene hash ``sha256``.
+
+        Cada candidata se verifica (stat contra el índice y, si difiere, hash
+        completo); las que no coinciden se descartan del índice.
+        """
+        entry = self.objects.get(sha256)
+        if entry is None:
+            return None
+        for path in self._candidates(entry):
+            if path.exists() and self.content_hash(path) == sha256:
+                entry["last_access"] = time.time()
+                return path
+            if path.parent == self.cache_dir:
+                entry["cache_file"] = None
+            else:
+                entry["path"] = None
+        return None
+
+    def resolve(self, year: int, tipo: str) -> Optional[CachedSource]:
+        """Archivo fuente verificado para un año y tipo (o None)."""
+        for sha256, entry in sorted(self.objects.items()):
+            if entry.get("year") == year and entry.get("tipo") == tipo:
+                path = self.lookup(sha256)
+                if path is not None:
+                    return CachedSource(sha256=sha256, year=year, tipo=tipo, path=path)
+        return None
+
+    def sources(self) -> List[CachedSource]:
+        """Todas las fuentes con año/tipo conocidos, una por contenido."""
+        found = []
+        for sha256, entry in sorted(self.objects.items()):
+            if entry.get("year") is None:
+                continue
+            path = self.lookup(sha256)
+            if path is not None:
+                found.append(CachedSource(sha256, entry["year"], entry["tipo"], path))
+        return sorted(found, key=lambda s: (s.path.suffix, s.year, s.tipo))
+
+    # ------------------------------------------------------------------
+    # Deduplicación y expulsión
+    # ------------------------------------------------------------------
+    def dedup(self) -> int:
+        """
+        Reemplaza las copias en caché por hardlinks al archivo del año.
+
+        Devuelve los bytes liberados. Si el sistema de archivos no admite
+        hardlinks, la copia en caché se elimina y el índice conserva la
+        referencia al archivo del año.
+        """
+        freed = 0
+        for sha256, entry in self.objects.items():
+            if not entry.get("path") or not entry.get("cache_file"):
+                continue
+            original = self.sav_root / entry["path"]
+            cached = self.cache_dir / entry["cache_file"]
+            if os.path.samefile(original, cached):
+                continue
+            size = cached.stat().st_size
+            try:
+                with atomic_output(cached) as tmp_path:
+                    tmp_path.unlink()
+                    os.link(original, tmp_path)
+            except OSError:
+                cached.unlink()
+                entry["cache_file"] = None
+            self.paths.pop(self._rel(cached), None)
+            freed += size
+        return freed
+
+    def _exclusive_bytes(self, entry: Dict) -> int:
+        """Bytes que solo la caché retiene (no compartidos por hardlink)."""
+        if not entry.get("cache_file"):
+            return 0
+        cached = self.cache_dir / entry["cache_file"]
+        if not cached.exists():
+            return 0
+        stat = cached.stat()
+        return stat.st_size if stat.st_nlink == 1 else 0
+
+    def cache_bytes(self) -> int:
+        return sum(self._exclusive_bytes(entry) for entry in self.objects.values())
+
+    def evict(self, max_bytes: int) -> List[str]:
+        """Expulsa copias en caché (LRU) hasta que ocupen ``max_bytes`` o menos."""
+        evicted: List[str] = []
+        total = self.cache_bytes()
+        by_age = sorted(self.objects.items(), key=lambda item: item[1].get("last_access", 0.0))
+        for sha256, entry in by_age:
+            if total <= max_bytes:
+                break
+            held = self._exclusive_bytes(entry)
+            if held == 0:
+                continue
+            cached = self.cache_dir / entry["cache_file"]
+            cached.unlink()
+            self.paths.pop(self._rel(cached), None)
+            entry["cache_file"] = None
+            if not entry.get("path"):
+                del self.objects[sha256]
+            total -= held
+            evicted.append(sha256)
+        return evicted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Índice y deduplicación de data/sav/_cache_downloads")
+    parser.add_argument("--sav-root", type=Path, default=SAV_ROOT, help="Raíz de archivos .sav/.xlsx")
+    parser.add_argument("--dedup", action="store_true", help="Reemplazar copias duplicadas por hardlinks")
+    parser.add_argument("--max-mb", type=float, default=None, help="Tope de la caché (expulsión LRU)")
+    args = parser.parse_args()
+
+    cache = DownloadCache(args.sav_root)
+    cache.sync()
+    print(f"Objetos indexados: {len(cache.objects)}")
+    print(f"Fuentes con año/tipo: {len(cache.sources())}")
+    orphans = [e for e in cache.objects.values() if e.get("year") is None]
+    if orphans:
+        print(f"Descargas sin correspondencia (huérfanas): {len(orphans)}")
+    if args.dedup:
+        freed = cache.dedup()
+        print(f"Duplicados reemplazados por hardlinks: {freed / 1024**2:.2f} MB liberados")
+    if args.max_mb is not None:
+        evicted = cache.evict(int(args.max_mb * 1024**2))
+        print(f"Expulsados (LRU): {len(evicted)}")
+    print(f"Bytes exclusivos de la caché: {cache.cache_bytes() / 1024**2:.2f} MB")
+    cache.save()
+    print(f"Índice: {cache.index_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,64 @@
-"""Genera figuras con formato listo para informe usando los resultados de Q1-Q5."""
+"""
+Genera figuras con formato listo para informe usando los resultados de Q1-Q5.
+
+Cada figura es una unidad (``FigureUnit``) con sus entradas declaradas:
+tablas de ``output/tables``, catálogos de metadatos y, solo para las que lo
+necesitan, el panel departamental (que sale de los datasets clean vía el
+cubo de conteos). Una figura se omite si su PNG existe y no cambió la
+huella de sus entradas ni la del código (este módulo y los de ``scripts``
+que importa; ``manifest.json`` en ``report_ready/``). Las figuras
+pendientes se dibujan en un pool de procesos con el backend no interactivo
+Agg, y los datasets clean solo se leen si alguna figura pendiente los
+necesita.
+"""
 from __future__ import annotations
 
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
-import pandas as pd
-import seaborn as sns
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import matplotlib.ticker as mticker  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
 
 BASE_DIR = Path(__file__).resolve().parents[1]
-OUTPUT_TABLES = BASE_DIR / "output" / "tables"
-OUTPUT_FIGURES = BASE_DIR / "output" / "figures"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from config import DATA_PROCESSED_DIR, OUTPUT_FIGURES_DIR, OUTPUT_TABLES_DIR, RANDOM_STATE  # noqa: E402
+from scripts.instrumentation import record, report_path, span, start, write_report  # noqa: E402
+from scripts.io_utils import atomic_output, file_sha256, read_json, write_json_atomic  # noqa: E402
+from scripts.mortality_cube import TIPOS, clean_path, update_cube  # noqa: E402
+from scripts.pipeline import code_files  # noqa: E402
+from scripts.rate_bootstrap import CI_LOWER, CI_UPPER, bootstrap_rate_ci  # noqa: E402
+from scripts.report_labels import DEP_LABEL_TEMPLATE, catalog_paths, decode_report_codes  # noqa: E402
+
+PROCESSED_DIR = DATA_PROCESSED_DIR
+OUTPUT_TABLES = OUTPUT_TABLES_DIR
+OUTPUT_FIGURES = OUTPUT_FIGURES_DIR
 REPORT_FIG_DIR = OUTPUT_FIGURES / "report_ready"
 REPORT_FIG_DIR.mkdir(parents=True, exist_ok=True)
+FIGURES_MANIFEST = "manifest.json"
+FIGURE_DPI = 300
+THEME = {"style": "whitegrid", "context": "talk"}
 
-sns.set_theme(style="whitegrid", context="talk")
-
-DEPREG_TO_NOMBRE = {
-    1: "Guatemala",
-    2: "El Progreso",
-    3: "Sacatepéquez",
-    4: "Chimaltenango",
-    5: "Escuintla",
-    6: "Santa Rosa",
-    7: "Sololá",
-    8: "Totonicapán",
-    9: "Quetzaltenango",
-    10: "Suchitepéquez",
-    11: "Retalhuleu",
-    12: "San Marcos",
-    13: "Huehuetenango",
-    14: "Quiché",
-    15: "Baja Verapaz",
-    16: "Alta Verapaz",
-    17: "Petén",
-    18: "Izabal",
-    19: "Zacapa",
-    20: "Chiquimula",
-    21: "Jalapa",
-    22: "Jutiapa",
-}
-
-
-def format_dep_label(code: int) -> str:
-    return f"{int(code):02d} - {DEPREG_TO_NOMBRE.get(int(code), 'Desconocido')}"
-
-
-def preparar_panel_departamental(nac_df: pd.DataFrame, def_df: pd.DataFrame) -> pd.DataFrame:
-    """Replica el panel departamental usado en el notebook."""
-    nac = nac_df.copy()
-    defun = def_df.copy()
-
-    for column in ("año", "depreg"):
-        nac[column] = pd.to_numeric(nac[column], errors="coerce")
-        defun[column] = pd.to_numeric(defun[column], errors="coerce")
-    defun["edadif"] = pd.to_numeric(defun["edadif"], errors="coerce")
-
-    nac = nac.dropna(subset=["año", "depreg"])
-    defun = defun.dropna(subset=["año", "depreg", "edadif"])
-
-    nac[["año", "depreg"]] = nac[["año", "depreg"]].astype(int)
-    defun[["año", "depreg"]] = defun[["año", "depreg"]].astype(int)
-
-    panel_nac = nac.groupby(["año", "depreg"]).size().rename("nacimientos").reset_index()
-    panel_def = (
-        defun[defun["edadif"] < 1]
-        .groupby(["año", "depreg"]).size()
-        .rename("defunciones_infantiles")
-        .reset_index()
-    )
-
-    panel = panel_nac.merge(panel_def, on=["año", "depreg"], how="left")
-    panel["defunciones_infantiles"] = panel["defunciones_infantiles"].fillna(0).astype(int)
-    panel["tasa_mortalidad_infantil_x1000"] = (
-        panel["defunciones_infantiles"] / panel["nacimientos"]
-    ) * 1000
-    return panel
-
-
-def register_fig(fig: plt.Figure, filename: str) -> Path:
-    path = REPORT_FIG_DIR / filename
-    fig.savefig(path, dpi=300, bbox_inches="tight")
-    plt.close(fig)
-    return path
-
-
-def main() -> None:
-    nac_df = pd.read_csv(BASE_DIR / "data" / "processed" / "nacimientos_clean_2009_2022.csv")
-    def_df = pd.read_csv(BASE_DIR / "data" / "processed" / "defunciones_clean_2009_2022.csv")
+sns.set_theme(**THEME)
 
-    panel_departamental = preparar_panel_departamental(nac_df, def_df)
 
-    # Ilustración 1: Tendencia Q1
+# ----------------------------------------------------------------------
+# Figuras
+# ----------------------------------------------------------------------
+def fig01_q1_tendencia() -> plt.Figure:
     q1_df = pd.read_csv(OUTPUT_TABLES / "q1_mortalidad_infantil_anual_2009_2022.csv")
     x = q1_df["año"].astype(float).to_numpy()
     y = q1_df["tasa_mortalidad_infantil_x1000"].astype(float).to_numpy()
@@ -104,36 +70,57 @@ def main() -> None:
 
     fig, ax = plt.subplots(figsize=(11, 6))
     ax.plot(q1_df["año"], y, marker="o", linewidth=2.4, label="Tasa observada")
+    ax.errorbar(
+        q1_df["año"],
+        y,
+        yerr=[y - q1_df[CI_LOWER].to_numpy(dtype=float), q1_df[CI_UPPER].to_numpy(dtype=float) - y],
+        fmt="none",
+        ecolor="gray",
+        capsize=4,
+        linewidth=1.2,
+        label="IC 95% (bootstrap)",
+    )
     ax.plot(q1_df["año"], trend, linestyle="--", linewidth=2.2, label=f"Tendencia lineal (R²={r2:.3f})")
     ax.set_title("Tendencia de mortalidad infantil en Guatemala, 2009-2022")
     ax.set_xlabel("Año")
     ax.set_ylabel("Defunciones infantiles por cada 1,000 nacimientos")
     ax.legend()
     ax.grid(alpha=0.3)
-    register_fig(fig, "fig01_q1_tendencia.png")
+    return fig
 
-    # Ilustración 2: Barras departamentales Q2
-    dep_periodo = (
-        panel_departamental
-        .groupby("depreg", as_index=False)[["nacimientos", "defunciones_infantiles"]]
-        .sum()
+
+def fig02_q2_tasa_departamentos(panel_departamental: pd.DataFrame) -> plt.Figure:
+    # Tasa acumulada e IC 95%: réplicas bootstrap de cada celda año × depreg sumadas por departamento
+    dep_periodo = bootstrap_rate_ci(panel_departamental, ["depreg"], seed=RANDOM_STATE)
+    dep_periodo["tasa"] = dep_periodo["tasa_mortalidad_infantil_x1000"]
+    dep_periodo["dep_label"] = (
+        decode_report_codes(dep_periodo["depreg"], "depreg", template=DEP_LABEL_TEMPLATE).astype(str)
     )
-    dep_periodo["tasa"] = (dep_periodo["defunciones_infantiles"] / dep_periodo["nacimientos"]) * 1000
-    dep_periodo["dep_label"] = dep_periodo["depreg"].apply(format_dep_label)
     dep_sorted = dep_periodo.sort_values("tasa")
     fig, ax = plt.subplots(figsize=(12, 9))
     sns.barplot(data=dep_sorted, x="tasa", y="dep_label", palette="YlOrRd", ax=ax)
+    ax.errorbar(
+        dep_sorted["tasa"],
+        np.arange(len(dep_sorted)),
+        xerr=[dep_sorted["tasa"] - dep_sorted[CI_LOWER], dep_sorted[CI_UPPER] - dep_sorted["tasa"]],
+        fmt="none",
+        ecolor="black",
+        capsize=3,
+        linewidth=1,
+    )
     ax.set_title("Tasa acumulada de mortalidad infantil por departamento (2009-2022)")
     ax.set_xlabel("Defunciones infantiles por cada 1,000 nacimientos")
     ax.set_ylabel("Departamento")
     ax.xaxis.set_major_formatter(mticker.FormatStrFormatter("%.2f"))
-    register_fig(fig, "fig02_q2_tasa_departamentos.png")
+    return fig
 
-    # Ilustración 3: Heatmap departamental Q2
-    dep_order = [format_dep_label(dep) for dep in sorted(DEPREG_TO_NOMBRE.keys())]
+
+def fig03_q2_heatmap_departamentos(panel_departamental: pd.DataFrame) -> plt.Figure:
+    dep_labels = decode_report_codes(panel_departamental["depreg"], "depreg", template=DEP_LABEL_TEMPLATE)
+    dep_order = list(dep_labels.cat.categories)
     heat_data = (
         panel_departamental
-        .assign(dep_label=lambda d: d["depreg"].apply(format_dep_label))
+        .assign(dep_label=dep_labels.astype(str))
         .pivot_table(index="dep_label", columns="año", values="tasa_mortalidad_infantil_x1000", aggfunc="mean")
         .reindex(dep_order)
     )
@@ -142,9 +129,10 @@ def main() -> None:
     ax.set_title("Evolución anual de la tasa por departamento (2009-2022)")
     ax.set_xlabel("Año")
     ax.set_ylabel("Departamento")
-    register_fig(fig, "fig03_q2_heatmap_departamentos.png")
+    return fig
+
 
-    # Ilustración 4: Heatmap mensual Q3
+def fig04_q3_heatmap_mensual() -> plt.Figure:
     panel_mensual = pd.read_csv(OUTPUT_TABLES / "q3_mortalidad_infantil_mensual_2009_2022.csv")
     meses_order = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
     heat_month = (
@@ -157,9 +145,10 @@ def main() -> None:
     ax.set_title("Tasa mensual de mortalidad infantil (2009-2022)")
     ax.set_xlabel("Año")
     ax.set_ylabel("Mes")
-    register_fig(fig, "fig04_q3_heatmap_mensual.png")
+    return fig
 
-    # Ilustración 5: Perfil estacional Q3
+
+def fig05_q3_perfil_estacional() -> plt.Figure:
     resumen_meses = pd.read_csv(OUTPUT_TABLES / "q3_resumen_estacional.csv")
     fig, ax = plt.subplots(figsize=(12, 4))
     ax.plot(resumen_meses["mes_nombre"], resumen_meses["tasa_promedio"], marker="o", linewidth=2.4, color="#D32F2F")
@@ -173,32 +162,35 @@ def main() -> None:
     ax.set_title("Perfil estacional promedio de mortalidad infantil")
     ax.set_xlabel("Mes")
     ax.set_ylabel("Tasa por cada 1,000 nacimientos")
-    register_fig(fig, "fig05_q3_perfil_estacional.png")
+    return fig
+
 
-    # Ilustraciones 6 y 7: Variables demográficas Q4
+def fig06_q4_area_geografica() -> plt.Figure:
     q4_df = pd.read_csv(OUTPUT_TABLES / "q4_tasas_demograficas.csv")
     area_df = q4_df[q4_df["variable"] == "areag"].copy()
-    area_labels = {"1.0": "Área urbana", "2.0": "Área rural", "9.0": "Sin dato"}
-    area_df["categoria_label"] = area_df["categoria"].astype(str).map(area_labels).fillna(area_df["categoria"].astype(str))
+    area_df["categoria_label"] = decode_report_codes(area_df["categoria"], "areag").astype(str)
     area_df = area_df.sort_values("tasa_mortalidad_infantil_x1000", ascending=False)
     fig, ax = plt.subplots(figsize=(8, 5))
     sns.barplot(data=area_df, x="categoria_label", y="tasa_mortalidad_infantil_x1000", palette="viridis", ax=ax)
     ax.set_title("Tasa de mortalidad infantil por área geográfica")
     ax.set_xlabel("Categoría")
     ax.set_ylabel("Tasa por cada 1,000 nacimientos")
-    register_fig(fig, "fig06_q4_area_geografica.png")
+    return fig
+
 
+def fig07_q4_sexo() -> plt.Figure:
+    q4_df = pd.read_csv(OUTPUT_TABLES / "q4_tasas_demograficas.csv")
     sexo_df = q4_df[q4_df["variable"] == "sexo"].copy()
-    sexo_labels = {"1.0": "Niños", "2.0": "Niñas"}
-    sexo_df["categoria_label"] = sexo_df["categoria"].astype(str).map(sexo_labels).fillna(sexo_df["categoria"].astype(str))
+    sexo_df["categoria_label"] = decode_report_codes(sexo_df["categoria"], "sexo").astype(str)
     fig, ax = plt.subplots(figsize=(8, 5))
     sns.barplot(data=sexo_df, x="categoria_label", y="tasa_mortalidad_infantil_x1000", palette="magma", ax=ax)
     ax.set_title("Tasa de mortalidad infantil por sexo")
     ax.set_xlabel("Sexo")
     ax.set_ylabel("Tasa por cada 1,000 nacimientos")
-    register_fig(fig, "fig07_q4_sexo.png")
+    return fig
+
 
-    # Ilustraciones 8 y 9: Clustering Q5
+def fig08_q5_dispersion_clusters() -> plt.Figure:
     clusters_df = pd.read_csv(OUTPUT_TABLES / "q5_clusters_departamentos.csv")
     cluster_labels = pd.read_csv(OUTPUT_TABLES / "q5_cluster_summary.csv")
     label_map = dict(zip(cluster_labels["cluster"], cluster_labels["cluster_label"]))
@@ -221,8 +213,10 @@ def main() -> None:
     ax.set_xlabel("Tasa promedio por cada 1,000 (2009-2022)")
     ax.set_ylabel("Pendiente de la tendencia anual")
     ax.legend(title="Cluster")
-    register_fig(fig, "fig08_q5_dispersion_clusters.png")
+    return fig
 
+
+def fig09_q5_silueta() -> plt.Figure:
     sil_df = pd.read_csv(OUTPUT_TABLES / "q5_silhouette_scores.csv")
     fig, ax = plt.subplots(figsize=(7, 4))
     sns.barplot(data=sil_df, x="k", y="silhouette", palette="Blues_d", ax=ax)
@@ -230,10 +224,183 @@ def main() -> None:
     ax.set_xlabel("Número de clusters (k)")
     ax.set_ylabel("Coeficiente de silueta promedio")
     ax.set_ylim(0, 0.6)
-    register_fig(fig, "fig09_q5_silueta.png")
+    return fig
+
+
+# ----------------------------------------------------------------------
+# Unidades
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class FigureUnit:
+    """
+    Una figura del informe y lo que necesita para dibujarse.
+
+    ``tables`` son archivos de ``output/tables``; ``catalogs`` las
+    variables cuyas etiquetas se leen de ``report_labels`` (catálogos de
+    nacimientos y defunciones o etiquetas revisadas). Con
+    ``needs_panel`` la figura recibe el panel departamental, que depende de
+    los datasets clean.
+    """
+
+    filename: str
+    render: Callable[..., plt.Figure]
+    tables: Tuple[str, ...] = ()
+    catalogs: Tuple[str, ...] = ()
+    needs_panel: bool = False
+
+    def input_paths(self) -> List[Path]:
+        paths = [OUTPUT_TABLES / name for name in self.tables]
+        if self.catalogs:
+            paths += catalog_paths()
+        if self.needs_panel:
+            paths += [clean_path(PROCESSED_DIR, tipo) for tipo in TIPOS]
+        return paths
+
+
+FIGURE_UNITS: Tuple[FigureUnit, ...] = (
+    FigureUnit("fig01_q1_tendencia.png", fig01_q1_tendencia, tables=("q1_mortalidad_infantil_anual_2009_2022.csv",)),
+    FigureUnit("fig02_q2_tasa_departamentos.png", fig02_q2_tasa_departamentos, catalogs=("depreg",), needs_panel=True),
+    FigureUnit("fig03_q2_heatmap_departamentos.png", fig03_q2_heatmap_departamentos, catalogs=("depreg",), needs_panel=True),
+    FigureUnit("fig04_q3_heatmap_mensual.png", fig04_q3_heatmap_mensual, tables=("q3_mortalidad_infantil_mensual_2009_2022.csv",)),
+    FigureUnit("fig05_q3_perfil_estacional.png", fig05_q3_perfil_estacional, tables=("q3_resumen_estacional.csv",)),
+    FigureUnit("fig06_q4_area_geografica.png", fig06_q4_area_geografica, tables=("q4_tasas_demograficas.csv",), catalogs=("areag",)),
+    FigureUnit("fig07_q4_sexo.png", fig07_q4_sexo, tables=("q4_tasas_demograficas.csv",), catalogs=("sexo",)),
+    FigureUnit(
+        "fig08_q5_dispersion_clusters.png",
+        fig08_q5_dispersion_clusters,
+        tables=("q5_clusters_departamentos.csv", "q5_cluster_summary.csv"),
+    ),
+    FigureUnit("fig09_q5_silueta.png", fig09_q5_silueta, tables=("q5_silhouette_scores.csv",)),
+)
+_UNITS_BY_NAME = {unit.filename: unit for unit in FIGURE_UNITS}
+
+
+def _input_hash(path: Path, cache: Dict[str, Dict]) -> str:
+    """SHA-256 de un archivo, reutilizado mientras no cambien tamaño ni mtime."""
+    stat = path.stat()
+    cached = cache.get(str(path))
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+    digest = file_sha256(path)
+    cache[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def unit_key(unit: FigureUnit, cache: Dict[str, Dict]) -> str:
+    """
+    Huella de las entradas de la figura y de su código: este módulo completo
+    y los de ``scripts`` que importa (bootstrap, etiquetas, cubo...), como
+    la etapa ``figuras`` de ``pipeline.py``.
+    """
+    digest = hashlib.sha256()
+    for path in code_files(Path(__file__).stem):
+        digest.update(f"{path.name}\x1f{_input_hash(path, cache)}\x1e".encode("utf-8"))
+    digest.update(unit.filename.encode("utf-8"))
+    for path in unit.input_paths():
+        if not path.exists():
+            raise FileNotFoundError(
+                f"No existe {path}, entrada de {unit.filename}. "
+                "Ejecuta primero scripts/build_q1_q5_tables.py"
+            )
+        digest.update(f"{path.name}\x1f{_input_hash(path, cache)}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _save_figure(fig: plt.Figure, path: Path) -> None:
+    with atomic_output(path) as tmp_path:
+        fig.savefig(tmp_path, format="png", dpi=FIGURE_DPI, bbox_inches="tight")
+    plt.close(fig)
+
+
+def register_fig(fig: plt.Figure, filename: str) -> Path:
+    path = REPORT_FIG_DIR / filename
+    _save_figure(fig, path)
+    return path
+
+
+def render_unit(filename: str, panel_departamental: Optional[pd.DataFrame] = None) -> Tuple[str, Dict]:
+    """
+    Dibuja y guarda una figura (se ejecuta en un proceso del pool); devuelve
+    su nombre y la medición del dibujo.
+    """
+    unit = _UNITS_BY_NAME[filename]
+    with span("figura", detached=True, archivo=unit.filename) as medida:
+        fig = unit.render(panel_departamental) if unit.needs_panel else unit.render()
+        register_fig(fig, unit.filename)
+    return unit.filename, medida.to_dict()
+
+
+def export_figures(jobs: Optional[int] = None, force: bool = False, verbose: bool = True) -> List[str]:
+    """
+    Dibuja las figuras cuyas entradas o código cambiaron; devuelve sus nombres.
+
+    ``jobs`` procesos en paralelo (por defecto, uno por núcleo).
+    """
+    manifest_path = REPORT_FIG_DIR / FIGURES_MANIFEST
+    manifest = read_json(manifest_path, default=None)
+    if not isinstance(manifest, dict):
+        manifest = {}
+    cache: Dict[str, Dict] = manifest.setdefault("entradas", {})
+    figures: Dict[str, str] = manifest.setdefault("figuras", {})
+
+    keys = {unit.filename: unit_key(unit, cache) for unit in FIGURE_UNITS}
+    pending = [
+        unit for unit in FIGURE_UNITS
+        if force or figures.get(unit.filename) != keys[unit.filename]
+        or not (REPORT_FIG_DIR / unit.filename).exists()
+    ]
+    if verbose:
+        for unit in FIGURE_UNITS:
+            if unit not in pending:
+                print(f"[SKIP] {unit.filename}: entradas sin cambios")
+
+    # Los datasets clean solo se leen si alguna figura pendiente usa el panel
+    panel_departamental = None
+    if any(unit.needs_panel for unit in pending):
+        with span("panel"):
+            panel_departamental = update_cube(PROCESSED_DIR, verbose=verbose).department_panel()
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending) or 1))
+    tasks = [(unit.filename, panel_departamental if unit.needs_panel else None) for unit in pending]
+    with span("figuras"):
+        if jobs == 1:
+            rendered = [render_unit(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                rendered = list(pool.map(render_unit, *zip(*tasks)))
+        for _, medida in rendered:
+            record(medida)
+    done = [filename for filename, _ in rendered]
+
+    for filename in done:
+        figures[filename] = keys[filename]
+        if verbose:
+            print(f"[OUT] {REPORT_FIG_DIR / filename}")
+    write_json_atomic(manifest, manifest_path)
+    return done
 
-    summary = pd.DataFrame(sorted(REPORT_FIG_DIR.iterdir()))
-    print("Se generaron", len(summary), "figuras en", REPORT_FIG_DIR)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera las figuras del informe (Q1-Q5).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Procesos en paralelo (0 = todos los núcleos)",
+    )
+    parser.add_argument("--force", action="store_true", help="Redibujar todas las figuras")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada figura con tracemalloc (más lento)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
+    args = parser.parse_args()
+    start(trace_memory=args.trace_memory)
+    done = export_figures(jobs=args.jobs or None, force=args.force, verbose=not args.quiet)
+    write_report(report_path(REPORT_FIG_DIR, "figuras"), "export_report_figures", jobs=args.jobs, force=args.force)
+    total = len(list(REPORT_FIG_DIR.glob("*.png")))
+    print("Se generaron", len(done), "figuras en", REPORT_FIG_DIR, f"({total} en total)")
 
 
 if __name__ == "__main__":
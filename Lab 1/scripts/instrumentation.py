@@ -0,0 +1,330 @@
+"""
+Medición por etapa: tiempo, CPU, memoria y filas en spans anidados.
+
+Cada etapa de un script se envuelve en un span::
+
+    with span("limpiar", tipo="nacimientos") as etapa:
+        for year, path in files:
+            with span("año", año=year) as medida:
+                ...
+                medida.add_rows(filas)
+
+Un span registra tiempo de pared, tiempo de CPU (del proceso en el hilo
+principal, del hilo en los demás), filas procesadas y, si ``tracemalloc``
+está activo (``start(trace_memory=True)``, opción ``--trace-memory`` de los
+scripts), el pico de memoria trazada por encima de la que había al abrirlo.
+Sin ``tracemalloc`` el costo es el de dos relojes por span.
+
+Los spans abiertos dentro de otro quedan como sus hijos. Los que se miden
+en un proceso o hilo del pool se abren con ``detached=True`` y el proceso
+principal los agrega con ``record`` al recibir el resultado, de modo que el
+informe tiene la misma forma con o sin paralelismo.
+
+``write_report`` guarda el informe de la corrida (JSON, con la RSS máxima
+del proceso) junto a las salidas del script y conserva el anterior como
+``*.anterior.json``; ``python -m scripts.instrumentation <informe>`` compara
+ambos span por span (etapa, tipo, año) para ver qué se volvió más lento.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.io_utils import read_json, write_json_atomic  # noqa: E402
+
+
+REPORT_VERSION = 1
+REPORT_PREFIX = "informe_ejecucion"
+PREVIOUS_SUFFIX = ".anterior.json"
+_MB = 2**20
+
+
+@dataclass
+class Span:
+    """Medición de una etapa (ver docstring del módulo)."""
+
+    nombre: str
+    atributos: Dict[str, Any] = field(default_factory=dict)
+    segundos: float = 0.0
+    cpu_segundos: float = 0.0
+    memoria_pico_mb: Optional[float] = None
+    filas: Optional[int] = None
+    error: Optional[str] = None
+    hijos: List["Span"] = field(default_factory=list)
+    _base: int = field(default=0, repr=False)
+    _peak: int = field(default=0, repr=False)
+
+    def add_rows(self, rows: int) -> None:
+        self.filas = (self.filas or 0) + int(rows)
+
+    def to_dict(self) -> Dict:
+        data: Dict[str, Any] = {"nombre": self.nombre}
+        if self.atributos:
+            data["atributos"] = dict(self.atributos)
+        data["segundos"] = round(self.segundos, 4)
+        data["cpu_segundos"] = round(self.cpu_segundos, 4)
+        if self.memoria_pico_mb is not None:
+            data["memoria_pico_mb"] = round(self.memoria_pico_mb, 2)
+        if self.filas is not None:
+            data["filas"] = self.filas
+            if self.segundos > 0:
+                data["filas_por_segundo"] = round(self.filas / self.segundos, 1)
+        if self.error is not None:
+            data["error"] = self.error
+        if self.hijos:
+            data["hijos"] = [child.to_dict() for child in self.hijos]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Span":
+        return cls(
+            nombre=data["nombre"],
+            atributos=dict(data.get("atributos", {})),
+            segundos=data.get("segundos", 0.0),
+            cpu_segundos=data.get("cpu_segundos", 0.0),
+            memoria_pico_mb=data.get("memoria_pico_mb"),
+            filas=data.get("filas"),
+            error=data.get("error"),
+            hijos=[cls.from_dict(child) for child in data.get("hijos", [])],
+        )
+
+
+_roots: List[Span] = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _stack() -> List[Span]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def start(trace_memory: bool = False) -> None:
+    """Empieza una corrida: descarta los spans previos y activa ``tracemalloc`` si se pide."""
+    reset()
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def reset() -> None:
+    with _lock:
+        _roots.clear()
+
+
+@contextmanager
+def span(nombre: str, *, detached: bool = False, **atributos: Any) -> Iterator[Span]:
+    """
+    Mide el bloque ``with`` como un span ``nombre`` con ``atributos``
+    (tipo, año, archivo...).
+
+    Con ``detached=True`` el span no se agrega al árbol: quien lo abre lo
+    devuelve (p. ej. desde un proceso del pool) y el proceso principal lo
+    agrega con ``record``. Una excepción se anota en ``error`` y se propaga.
+    """
+    current = Span(nombre, dict(atributos))
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    main_thread = threading.current_thread() is threading.main_thread()
+    # Con hilos el pico de tracemalloc es del proceso: solo se mide en el principal
+    tracing = main_thread and tracemalloc.is_tracing()
+    if tracing:
+        size, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent._peak = max(parent._peak, peak)
+        tracemalloc.reset_peak()
+        current._base = current._peak = size
+    cpu_clock = time.process_time if main_thread else time.thread_time
+    stack.append(current)
+    wall, cpu = time.perf_counter(), cpu_clock()
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        current.segundos = time.perf_counter() - wall
+        current.cpu_segundos = cpu_clock() - cpu
+        stack.pop()
+        if tracing:
+            current._peak = max(current._peak, tracemalloc.get_traced_memory()[1])
+            current.memoria_pico_mb = (current._peak - current._base) / _MB
+            if parent is not None:
+                parent._peak = max(parent._peak, current._peak)
+        if not detached:
+            _attach(current, parent)
+
+
+def _attach(item: Span, parent: Optional[Span]) -> None:
+    if parent is not None:
+        parent.hijos.append(item)
+    else:
+        with _lock:
+            _roots.append(item)
+
+
+def record(item: Union[Span, Mapping, None]) -> None:
+    """Agrega un span medido aparte (``detached``) como hijo del span abierto."""
+    if item is None:
+        return
+    if not isinstance(item, Span):
+        item = Span.from_dict(item)
+    stack = _stack()
+    _attach(item, stack[-1] if stack else None)
+
+
+def spans() -> List[Span]:
+    """Spans raíz de la corrida actual."""
+    with _lock:
+        return list(_roots)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    RSS máxima del proceso en MB.
+
+    En Linux se lee ``VmHWM`` de ``/proc/self/status``, que vuelve a empezar
+    en cada ``exec``: ``ru_maxrss`` no sirve ahí porque un proceso hijo
+    arrastra como piso la RSS máxima del padre que lo lanzó. En otros
+    sistemas se usa ``ru_maxrss``.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) * 1024 / _MB, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss * scale / _MB, 1)
+
+
+def run_report(script: str, **contexto: Any) -> Dict:
+    """Informe de la corrida: contexto, plataforma, RSS máxima y árbol de spans."""
+    return {
+        "version": REPORT_VERSION,
+        "script": script,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "contexto": {key: str(value) if isinstance(value, Path) else value for key, value in contexto.items()},
+        "plataforma": {
+            "python": platform.python_version(),
+            "sistema": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "rss_max_mb": peak_rss_mb(),
+        "memoria_trazada": tracemalloc.is_tracing(),
+        "spans": [item.to_dict() for item in spans()],
+    }
+
+
+def report_path(directory: Path, etapa: str) -> Path:
+    return directory / f"{REPORT_PREFIX}_{etapa}.json"
+
+
+def previous_path(path: Path) -> Path:
+    return path.with_name(path.name[: -len(path.suffix)] + PREVIOUS_SUFFIX)
+
+
+def write_report(path: Path, script: str, **contexto: Any) -> Path:
+    """Escribe el informe en ``path``; el que existía pasa a ``*.anterior.json``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        os.replace(path, previous_path(path))
+    write_json_atomic(run_report(script, **contexto), path)
+    return path
+
+
+# ----------------------------------------------------------------------
+# Comparación de informes
+# ----------------------------------------------------------------------
+def flatten(report: Mapping) -> Dict[str, Dict]:
+    """
+    ``{ruta: métricas}`` de todos los spans del informe. La ruta une el
+    nombre y los atributos de cada nivel (``limpiar[tipo=nacimientos]/año[año=2015]``);
+    los spans con la misma ruta se suman.
+    """
+    flat: Dict[str, Dict] = {}
+
+    def visit(items: List[Mapping], prefix: str) -> None:
+        for item in items:
+            attrs = ",".join(f"{k}={v}" for k, v in item.get("atributos", {}).items())
+            path = f"{prefix}{item['nombre']}" + (f"[{attrs}]" if attrs else "")
+            entry = flat.setdefault(path, {"segundos": 0.0, "cpu_segundos": 0.0, "filas": 0})
+            entry["segundos"] += item.get("segundos", 0.0)
+            entry["cpu_segundos"] += item.get("cpu_segundos", 0.0)
+            entry["filas"] += item.get("filas") or 0
+            if item.get("memoria_pico_mb") is not None:
+                entry["memoria_pico_mb"] = max(entry.get("memoria_pico_mb", 0.0), item["memoria_pico_mb"])
+            visit(item.get("hijos", []), path + "/")
+
+    visit(report.get("spans", []), "")
+    return flat
+
+
+def compare_reports(before: Mapping, after: Mapping) -> List[Tuple[str, float, float, float]]:
+    """
+    ``(ruta, segundos antes, segundos ahora, diferencia)`` de los spans
+    presentes en ambos informes, de mayor a menor aumento.
+    """
+    old, new = flatten(before), flatten(after)
+    rows = [
+        (path, old[path]["segundos"], new[path]["segundos"], new[path]["segundos"] - old[path]["segundos"])
+        for path in new
+        if path in old
+    ]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compara un informe de ejecución con el anterior, span por span."
+    )
+    parser.add_argument("report", type=Path, help="Informe actual (informe_ejecucion_*.json)")
+    parser.add_argument(
+        "previous",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Informe contra el que comparar (por defecto: <informe>.anterior.json)",
+    )
+    parser.add_argument("--top", type=int, default=15, help="Spans a mostrar")
+    args = parser.parse_args()
+
+    previous = args.previous or previous_path(args.report)
+    after = read_json(args.report, default=None)
+    before = read_json(previous, default=None)
+    if after is None or before is None:
+        missing = args.report if after is None else previous
+        print(f"Error: no se pudo leer {missing}")
+        sys.exit(1)
+    rows = compare_reports(before, after)[: args.top]
+    width = max([len("span"), *(len(row[0]) for row in rows)])
+    print(f"{'span':<{width}} {'antes':>9} {'ahora':>9} {'cambio':>9}")
+    for path, old, new, delta in rows:
+        change = f"{delta / old:+.0%}" if old > 0 else "n/d"
+        print(f"{path:<{width}} {old:>8.2f}s {new:>8.2f}s {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Utilidades de E/S compartidas por los scripts del pipeline.
+
+Incluye hash de contenido de archivos, escritura atómica (archivo temporal +
+``os.replace``) y lectura/escritura de manifiestos JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+HASH_BLOCK_SIZE = 1 << 20  # 1 MiB
+
+
+def file_sha256(path: Path, block_size: int = HASH_BLOCK_SIZE) -> str:
+    """Calcula el SHA-256 del contenido de un archivo leyendo por bloques."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+@contextmanager
+def atomic_output(destination: Path) -> Iterator[Path]:
+    """
+    Entrega una ruta temporal en el mismo directorio que ``destination``.
+
+    Si el bloque termina sin excepción, el temporal reemplaza al destino con
+    ``os.replace`` (atómico en el mismo sistema de archivos). Si falla, el
+    temporal se elimina y el destino previo queda intacto, de modo que un
+    proceso interrumpido nunca deja un archivo a medio escribir.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{destination.name}.",
+        suffix=".tmp",
+        dir=destination.parent,
+    )
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    # mkstemp crea el archivo con permisos 0600; se aplican los permisos
+    # habituales (según umask) para que el destino quede como con open().
+    os.chmod(tmp_path, 0o666 & ~_current_umask())
+    try:
+        yield tmp_path
+        os.replace(tmp_path, destination)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def cleanup_stale_temporaries(directory: Path) -> int:
+    """Elimina temporales huérfanos de ``atomic_output`` (p. ej. tras un crash)."""
+    if not directory.exists():
+        return 0
+    removed = 0
+    for tmp_path in directory.rglob(".*.tmp"):
+        tmp_path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Lee un JSON; devuelve ``default`` si no existe o está corrupto."""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def write_json_atomic(data: Any, path: Path) -> None:
+    """Escribe ``data`` como JSON de forma atómica."""
+    with atomic_output(path) as tmp_path:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
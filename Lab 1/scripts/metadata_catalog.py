@@ -0,0 +1,258 @@
+"""
+Catálogo persistente de metadatos de las variables del INE.
+
+Cada lectura de un .sav con pyreadstat entrega ``meta`` (etiquetas de
+variable, etiquetas de valor y nivel de medida). El conversor lo guarda en
+un catálogo por tipo::
+
+    data/metadata/<tipo>.json
+
+con una entrada por año (ligada al SHA-256 del archivo fuente) y los
+conjuntos de etiquetas de valor desduplicados entre años: el de ``depreg``,
+por ejemplo, se repite idéntico en todos los archivos y se guarda una vez.
+
+Los consumidores decodifican códigos a ``category`` de forma vectorizada
+(``MetadataCatalog.decode``) sin volver a abrir los .sav.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from scripts.io_utils import read_json, write_json_atomic
+
+
+CATALOG_VERSION = 1
+METADATA_DIR = Path(__file__).resolve().parents[1] / "data" / "metadata"
+
+
+def code_key(value: Any) -> str:
+    """Representación canónica de un código (``1.0`` → ``"1"``)."""
+    if isinstance(value, float) and not math.isnan(value) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    return str(value)
+
+
+def metadata_entry(meta: Any) -> Dict[str, Dict]:
+    """
+    Extrae de ``meta`` (pyreadstat) las variables con nombre en minúsculas.
+
+    Retorna ``{variable: {"label", "measure", "value_labels"}}``, donde
+    ``value_labels`` es ``{código: etiqueta}`` con códigos canónicos.
+    """
+    labels = meta.column_names_to_labels or {}
+    measures = getattr(meta, "variable_measure", None) or {}
+    value_labels = meta.variable_value_labels or {}
+    variables: Dict[str, Dict] = {}
+    for name in meta.column_names:
+        variables[name.strip().lower()] = {
+            "label": labels.get(name),
+            "measure": measures.get(name),
+            "value_labels": {
+                code_key(code): label for code, label in (value_labels.get(name) or {}).items()
+            },
+        }
+    return variables
+
+
+def read_sav_metadata(path: Path) -> Dict[str, Dict]:
+    """Metadatos de un .sav sin leer sus filas."""
+    import pyreadstat
+
+    _, meta = pyreadstat.read_sav(str(path), metadataonly=True)
+    return metadata_entry(meta)
+
+
+def _label_set_id(labels: Dict[str, str]) -> str:
+    payload = json.dumps(labels, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _sort_codes(codes: Iterable[str]) -> List[str]:
+    def key(code: str):
+        try:
+            return (0, float(code), code)
+        except ValueError:
+            return (1, 0.0, code)
+
+    return sorted(codes, key=key)
+
+
+class MetadataCatalog:
+    """Catálogo versionado de un tipo de dato (un archivo JSON)."""
+
+    def __init__(self, tipo: str, root: Path = METADATA_DIR) -> None:
+        self.tipo = tipo
+        self.path = root / f"{tipo}.json"
+        data = read_json(self.path, default=None)
+        if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+            data = {"version": CATALOG_VERSION, "tipo": tipo, "revision": 0,
+                    "label_sets": {}, "years": {}}
+        self._data = data
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(int(y) for y in self._data["years"])
+
+    def source_sha256(self, year: int) -> Optional[str]:
+        entry = self._data["years"].get(str(year))
+        return entry.get("source_sha256") if entry else None
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def record_year(self, year: int, variables: Dict[str, Dict], source_sha256: str) -> bool:
+        """Registra los metadatos de un año; devuelve True si hubo cambios."""
+        label_sets = self._data["label_sets"]
+        compact: Dict[str, Dict] = {}
+        for name, info in variables.items():
+            item = {"label": info.get("label"), "measure": info.get("measure")}
+            if info.get("value_labels"):
+                set_id = _label_set_id(info["value_labels"])
+                label_sets.setdefault(set_id, info["value_labels"])
+                item["value_labels"] = set_id
+            compact[name] = item
+        entry = {"source_sha256": source_sha256, "variables": compact}
+        if self._data["years"].get(str(year)) == entry:
+            return False
+        self._data["years"][str(year)] = entry
+        # Conjuntos que ningún año referencia ya
+        used = {
+            v["value_labels"]
+            for y in self._data["years"].values()
+            for v in y["variables"].values()
+            if "value_labels" in v
+        }
+        self._data["label_sets"] = {k: v for k, v in label_sets.items() if k in used}
+        self._data["revision"] += 1
+        return True
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self._data, self.path)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def _year_entries(self, year: Optional[int]) -> List[Dict]:
+        years = self._data["years"]
+        if year is not None:
+            entry = years.get(str(year))
+            return [entry] if entry else []
+        return [years[str(y)] for y in self.years]
+
+    def has_variable(self, variable: str) -> bool:
+        return any(variable in e["variables"] for e in self._year_entries(None))
+
+    def variable_label(self, variable: str, year: Optional[int] = None) -> Optional[str]:
+        label = None
+        for entry in self._year_entries(year):
+            info = entry["variables"].get(variable)
+            if info and info.get("label"):
+                label = info["label"]
+        return label
+
+    def value_labels(self, variable: str, year: Optional[int] = None) -> Dict[str, str]:
+        """
+        ``{código: etiqueta}`` de una variable, ordenado por código.
+
+        Sin ``year`` se combinan todos los años; ante conflicto prevalece la
+        etiqueta del año más reciente.
+        """
+        merged: Dict[str, str] = {}
+        for entry in self._year_entries(year):
+            info = entry["variables"].get(variable)
+            if info and "value_labels" in info:
+                merged.update(self._data["label_sets"][info["value_labels"]])
+        return {code: merged[code] for code in _sort_codes(merged)}
+
+    def decode(
+        self,
+        values: pd.Series,
+        variable: str,
+        year: Optional[int] = None,
+        template: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Decodifica una serie de códigos a ``category`` con las etiquetas.
+
+        ``template`` da formato a cada etiqueta con ``codigo`` (int o texto) y
+        ``etiqueta``, p. ej. ``"{codigo:02d} - {etiqueta}"``. Las categorías
+        quedan en orden de código; los códigos sin etiqueta se conservan como
+        texto canónico y los nulos como NaN.
+        """
+        return decode_codes(values, self.value_labels(variable, year), template)
+
+
+def _template_code(code: str) -> Any:
+    try:
+        number = float(code)
+    except ValueError:
+        return code
+    return int(number) if number.is_integer() else number
+
+
+def decode_codes(
+    values: pd.Series,
+    labels: Dict[str, str],
+    template: Optional[str] = None,
+) -> pd.Series:
+    """Mapeo vectorizado código → etiqueta (ver ``MetadataCatalog.decode``)."""
+    codes = list(labels)
+    texts = [
+        template.format(codigo=_template_code(code), etiqueta=labels[code]) if template else labels[code]
+        for code in codes
+    ]
+    numeric_codes = pd.to_numeric(pd.Series(codes, dtype=object), errors="coerce")
+    if codes and numeric_codes.notna().all():
+        index = pd.Index(numeric_codes.astype(float))
+        lookup = pd.to_numeric(values, errors="coerce").astype(float)
+    else:
+        index = pd.Index(codes, dtype=object)
+        lookup = values.astype(object).where(values.notna())
+    positions = index.get_indexer(lookup)
+
+    # Códigos presentes pero sin etiqueta: categoría con su texto canónico
+    unlabelled = (positions == -1) & lookup.notna().to_numpy()
+    extra = pd.unique(lookup[unlabelled])
+    extra_keys = [code_key(v) for v in extra]
+    # Etiquetas repetidas (p. ej. "Ignorado" para 9 y 99) comparten categoría
+    text_positions, categories = pd.factorize(pd.Index(texts + extra_keys))
+    result = np.full(len(lookup), -1, dtype=np.int64)
+    labelled = positions >= 0
+    result[labelled] = text_positions[positions[labelled]]
+    if len(extra):
+        extra_positions = pd.Index(extra).get_indexer(lookup[unlabelled])
+        result[unlabelled] = text_positions[len(texts) + extra_positions]
+    categorical = pd.Categorical.from_codes(result, categories=categories)
+    return pd.Series(categorical, index=values.index, name=values.name)
+
+
+def load_catalog(tipo: str, root: Path = METADATA_DIR) -> MetadataCatalog:
+    return MetadataCatalog(tipo, root)
+
+
+def catalog_with_variable(
+    variable: str,
+    tipos: Iterable[str],
+    root: Path = METADATA_DIR,
+) -> Optional[MetadataCatalog]:
+    """Primer catálogo (en el orden de ``tipos``) que describe ``variable``."""
+    for tipo in tipos:
+        catalog = MetadataCatalog(tipo, root)
+        if catalog.has_variable(variable):
+            return catalog
+    return None
+
+
+def available_tipos(root: Path = METADATA_DIR) -> List[str]:
+    return sorted(p.stem for p in root.glob("*.json"))
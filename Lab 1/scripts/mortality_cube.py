@@ -0,0 +1,570 @@
+"""
+Cubo de conteos materializado para los análisis de mortalidad infantil.
+
+Q1 (anual), Q2 (año × depreg), Q3 (año × mes) y Q4 (variables
+demográficas) son conteos de nacimientos y de defunciones infantiles
+(``edadif < 1``) agrupados por distintas dimensiones. ``CountCube`` guarda
+una sola vez el número de filas clean de cada celda
+
+    (tipo, año, mes, depreg, mupreg, sexo, areag, infantil)
+
+y cada tabla se deriva sumando celdas con ``scripts/rate_panel.py``, con
+los mismos resultados que las operaciones de pandas que el notebook aplica
+a las filas pero sobre miles de celdas en lugar de millones de filas. Los
+nulos forman su propia celda: los totales no cambian.
+
+En disco el cubo vive en ``data/processed/_cube/`` con una partición
+Parquet por ``(tipo, año)`` y un manifiesto. ``update_cube`` solo vuelve a
+agregar los años nuevos o modificados: si los shards por año de
+``build_q1_q2_clean.py`` (modo incremental) corresponden al CSV clean, lee
+únicamente el shard de esos años; si no, reconstruye el tipo desde el CSV
+clean, y solo cuando este cambió.
+
+Limitación: las dimensiones se guardan como números, así que un valor no
+numérico en ``sexo``/``areag``/mes cuenta como nulo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.columnar import partition_path, read_partition, write_partition
+from scripts.instrumentation import report_path, span, start, write_report
+from scripts.io_utils import atomic_output, file_sha256, read_json, write_json_atomic
+from scripts.rate_panel import RATE_COLUMN, rate_panel
+
+
+TIPOS = ("nacimientos", "defunciones")
+# Dimensiones de cada celda además de tipo, año e infantil
+DIMENSIONS = ("mes", "depreg", "mupreg", "sexo", "areag")
+# Variables de Q4 que el cubo resuelve sin volver a las filas
+DEMOGRAPHIC_DIMENSIONS = ("sexo", "areag")
+MONTH_CANDIDATES = ("mesocu", "mes", "mesreg", "mesdef", "mesnac", "mesocur")
+MONTH_LABELS = {
+    1: "Ene", 2: "Feb", 3: "Mar", 4: "Abr", 5: "May", 6: "Jun",
+    7: "Jul", 8: "Ago", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dic",
+}
+INFANT_MAX_AGE = 1  # defunción infantil: edadif < 1
+CUBE_DIRNAME = "_cube"
+CUBE_MANIFEST = "manifest.json"
+CUBE_VERSION = 1
+SHARDS_DIRNAME = "_shards"  # ver build_q1_q2_clean.py
+DEFAULT_CHUNK_SIZE = 500_000
+_INT_TEXT = r"[+-]?\d+"
+
+
+def clean_path(processed_dir: Path, tipo: str) -> Path:
+    return processed_dir / f"{tipo}_clean_2009_2022.csv"
+
+
+def month_column(columns: Iterable[str]) -> Optional[str]:
+    """Primera columna de ``MONTH_CANDIDATES`` presente (como en el notebook)."""
+    present = set(columns)
+    for candidate in MONTH_CANDIDATES:
+        if candidate in present:
+            return candidate
+    return None
+
+
+def _value_kind(series: pd.Series) -> str:
+    """
+    ``"int"`` si ``read_csv`` leería la columna como entera, si no ``"float"``.
+
+    Determina cómo se formatean las categorías de Q4 (``"1"`` frente a
+    ``"1.0"``), que el notebook obtiene con ``astype(str)``.
+    """
+    if series.isna().any():
+        return "float"
+    if pd.api.types.is_numeric_dtype(series):
+        return "int" if pd.api.types.is_integer_dtype(series) else "float"
+    is_integer_text = series.astype(str).str.strip().str.fullmatch(_INT_TEXT)
+    return "int" if bool(is_integer_text.all()) else "float"
+
+
+def _merge_kinds(target: Dict[str, str], kinds: Mapping[str, str]) -> None:
+    for col, kind in kinds.items():
+        target[col] = "float" if "float" in (kind, target.get(col)) else kind
+
+
+def aggregate_rows(frame: pd.DataFrame, tipo: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Celdas de un bloque de filas clean (texto o tipos nativos).
+
+    Devuelve las celdas (``año``, ``DIMENSIONS``, ``infantil``, ``filas``)
+    y la clase de valor de cada dimensión presente (ver ``_value_kind``).
+    """
+    frame = frame.rename(columns=lambda c: str(c).strip().lower())
+    sources = {dim: dim for dim in DIMENSIONS}
+    sources["mes"] = month_column(frame.columns)
+
+    kinds: Dict[str, str] = {}
+    data = {"año": pd.to_numeric(frame["año"], errors="coerce").to_numpy(dtype=np.float64)}
+    for dim in DIMENSIONS:
+        source = sources[dim]
+        if source is None or source not in frame.columns:
+            data[dim] = np.full(len(frame), np.nan)
+            continue
+        kinds[dim] = _value_kind(frame[source])
+        data[dim] = pd.to_numeric(frame[source], errors="coerce").to_numpy(dtype=np.float64)
+    if tipo == "defunciones" and "edadif" in frame.columns:
+        edadif = pd.to_numeric(frame["edadif"], errors="coerce").to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            data["infantil"] = edadif < INFANT_MAX_AGE
+    else:
+        data["infantil"] = np.zeros(len(frame), dtype=bool)
+
+    keys = ["año", *DIMENSIONS, "infantil"]
+    cells = (
+        pd.DataFrame(data)
+        .groupby(keys, dropna=False, sort=True)
+        .size()
+        .rename("filas")
+        .reset_index()
+    )
+    return cells, kinds
+
+
+def _combine(parts: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Suma celdas de varios bloques del mismo tipo."""
+    if len(parts) == 1:
+        return parts[0]
+    keys = ["año", *DIMENSIONS, "infantil"]
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(keys, dropna=False, sort=True)["filas"]
+        .sum()
+        .reset_index()
+    )
+
+
+class CountCube:
+    """
+    Conteos por celda y tablas Q1-Q4 derivadas.
+
+    ``kinds[tipo][dim]`` guarda si la columna original era entera o
+    decimal, y ``month_columns[tipo]`` la columna de origen de ``mes``.
+    """
+
+    def __init__(
+        self,
+        cells: pd.DataFrame,
+        kinds: Mapping[str, Mapping[str, str]],
+        month_columns: Mapping[str, Optional[str]],
+    ) -> None:
+        self.cells = cells
+        self.kinds = {tipo: dict(k) for tipo, k in kinds.items()}
+        self.month_columns = dict(month_columns)
+
+    @classmethod
+    def empty(cls) -> "CountCube":
+        columns = {"tipo": pd.Series([], dtype=object), "año": pd.Series([], dtype=np.int64)}
+        columns.update({dim: pd.Series([], dtype=np.float64) for dim in DIMENSIONS})
+        columns["infantil"] = pd.Series([], dtype=bool)
+        columns["filas"] = pd.Series([], dtype=np.int64)
+        return cls(pd.DataFrame(columns), {}, {})
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame]) -> "CountCube":
+        """Cubo en memoria a partir de DataFrames clean por tipo."""
+        cube = cls.empty()
+        for tipo, frame in frames.items():
+            cube.append(tipo, frame)
+        return cube
+
+    @classmethod
+    def from_chunks(cls, chunks: Mapping[str, Iterable[pd.DataFrame]]) -> "CountCube":
+        """
+        Cubo en memoria a partir de bloques de filas clean por tipo.
+
+        Cada bloque se agrega y se descarta, así que la memoria queda
+        acotada por el tamaño del bloque y el número de celdas.
+        """
+        cube = cls.empty()
+        for tipo, tipo_chunks in chunks.items():
+            parts: List[pd.DataFrame] = []
+            kinds: Dict[str, str] = {}
+            month: Optional[str] = None
+            for chunk in tipo_chunks:
+                cells, chunk_kinds = aggregate_rows(chunk, tipo)
+                parts.append(cells)
+                _merge_kinds(kinds, chunk_kinds)
+                month = month or month_column(str(c).strip().lower() for c in chunk.columns)
+            if parts:
+                cube._replace(tipo, _combine(parts), kinds, month)
+        return cube
+
+    def append(self, tipo: str, frame: pd.DataFrame) -> None:
+        """Agrega filas de ``tipo``; reemplaza los años que ya estaban en el cubo."""
+        cells, kinds = aggregate_rows(frame, tipo)
+        month = month_column(str(c).strip().lower() for c in frame.columns)
+        self._replace(tipo, cells, kinds, month)
+
+    def _replace(
+        self, tipo: str, cells: pd.DataFrame, kinds: Mapping[str, str], month: Optional[str]
+    ) -> None:
+        cells = cells.assign(tipo=tipo, año=cells["año"].astype(np.int64))
+        stale = (self.cells["tipo"] == tipo) & self.cells["año"].isin(cells["año"].unique())
+        kept = self.cells[~stale.to_numpy()]
+        parts = [part for part in (kept, cells[self.cells.columns]) if len(part)]
+        self.cells = pd.concat(parts, ignore_index=True) if parts else self.cells
+        _merge_kinds(self.kinds.setdefault(tipo, {}), kinds)
+        if month is not None:
+            self.month_columns[tipo] = month
+        else:
+            self.month_columns.setdefault(tipo, None)
+
+    # ------------------------------------------------------------------
+    # Conteos
+    # ------------------------------------------------------------------
+    def _tipo_cells(self, tipo: str) -> pd.DataFrame:
+        return self.cells[(self.cells["tipo"] == tipo).to_numpy()]
+
+    def _require(self, tipo: str, dim: str) -> None:
+        if dim not in self.kinds.get(tipo, {}):
+            raise KeyError(f"La columna '{dim}' no está presente en {tipo}")
+
+    def nunique(self, variable: str, tipo: str = "nacimientos") -> int:
+        """Valores distintos no nulos de una dimensión (``Series.nunique``)."""
+        self._require(tipo, variable)
+        return int(self._tipo_cells(tipo)[variable].nunique(dropna=True))
+
+    def rates(
+        self,
+        keys: Sequence[str],
+        years: Optional[Tuple[int, int]] = None,
+        how: str = "left",
+        integer_keys: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Panel de nacimientos, defunciones infantiles y tasa por ``keys``.
+
+        Todas las tablas Q1-Q4 pasan por aquí (``rate_panel`` sobre las
+        celdas, con ``filas`` como peso). ``years`` es un rango inclusivo.
+        """
+        cells = self.cells
+        tipos = cells["tipo"].to_numpy()
+        births = tipos == "nacimientos"
+        deaths = (tipos == "defunciones") & cells["infantil"].to_numpy()
+        if years is not None:
+            in_range = cells["año"].between(*years).to_numpy()
+            births, deaths = births & in_range, deaths & in_range
+        return rate_panel(
+            cells, cells, keys,
+            numerator_filter=deaths,
+            denominator_filter=births,
+            weight="filas",
+            how=how,
+            integer_keys=integer_keys,
+        )
+
+    # ------------------------------------------------------------------
+    # Tablas Q1-Q4
+    # ------------------------------------------------------------------
+    def annual_rates(self) -> pd.DataFrame:
+        """Q1: nacimientos, defunciones infantiles y tasa por año."""
+        q1 = self.rates(["año"], how="outer")
+        q1["defunciones_infantiles"] = q1["defunciones_infantiles"].astype(int)
+        return q1.sort_values("año")
+
+    def department_panel(self, years: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """
+        Q2: panel año × depreg con tasa por 1,000 nacimientos.
+
+        ``years`` es un rango inclusivo ``(inicio, fin)``; sin él se usan
+        todos los años del cubo.
+        """
+        return self.rates(["año", "depreg"], years=years)
+
+    def municipal_panel(self, years: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Panel año × depreg × mupreg (municipio de registro)."""
+        return self.rates(["año", "depreg", "mupreg"], years=years)
+
+    def monthly_panel(self) -> pd.DataFrame:
+        """Q3: panel año × mes con tasa, participación y ranking del mes en el año."""
+        for tipo in TIPOS:
+            if self.month_columns.get(tipo) is None:
+                raise KeyError(
+                    f"No se identificó columna de mes en {tipo}; ajusta MONTH_CANDIDATES "
+                    "con base en el diccionario de datos."
+                )
+        panel = self.rates(["año", "mes"]).rename(columns={"mes": "mes_num"})
+        panel["mes_nombre"] = panel["mes_num"].map(MONTH_LABELS)
+        panel = panel.dropna(subset=["mes_nombre"]).sort_values(["año", "mes_num"]).reset_index(drop=True)
+
+        totales_anuales = panel.groupby("año")["defunciones_infantiles"].transform("sum")
+        panel["participacion_defunciones_pct"] = np.where(
+            totales_anuales > 0,
+            (panel["defunciones_infantiles"] / totales_anuales) * 100,
+            0,
+        )
+        panel["ranking_mes_en_año"] = panel.groupby("año")[RATE_COLUMN].rank(
+            method="dense", ascending=False
+        )
+        return panel
+
+    def demographic_rates(self, variable: str) -> pd.DataFrame:
+        """Q4: tasa, participación de nacimientos y de defunciones por categoría."""
+        for tipo in TIPOS:
+            self._require(tipo, variable)
+        # Las categorías se formatean como al agrupar las filas: enteras
+        # solo si la columna era entera en ambos tipos
+        integer = all(self.kinds[tipo][variable] == "int" for tipo in TIPOS)
+        return demographic_table(self.rates([variable], how="outer", integer_keys=integer), variable)
+
+
+def demographic_table(counts: pd.DataFrame, variable: str) -> pd.DataFrame:
+    """
+    Tabla Q4 de una variable a partir de su panel de ``rate_panel``
+    (``how="outer"``): categoría formateada, tasa y participaciones.
+    """
+    merged = counts.rename(columns={variable: "categoria"})[
+        ["categoria", "nacimientos", "defunciones_infantiles"]
+    ]
+    total_nac = merged["nacimientos"].sum()
+    total_def = merged["defunciones_infantiles"].sum()
+    merged["categoria"] = merged["categoria"].astype(str).replace({"": "Sin dato"})
+    merged["variable"] = variable
+    merged[RATE_COLUMN] = np.where(
+        merged["nacimientos"] > 0,
+        (merged["defunciones_infantiles"] / merged["nacimientos"]) * 1000,
+        np.nan,
+    )
+    merged["pct_nacimientos"] = np.where(total_nac > 0, (merged["nacimientos"] / total_nac) * 100, 0)
+    merged["pct_defunciones"] = np.where(
+        total_def > 0, (merged["defunciones_infantiles"] / total_def) * 100, 0
+    )
+    return merged
+
+
+# ----------------------------------------------------------------------
+# Persistencia incremental
+# ----------------------------------------------------------------------
+def _file_signature(path: Path) -> Dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def _source_is_fresh(entry: Optional[Dict], path: Path) -> bool:
+    """Tamaño y mtime primero; si solo cambió el mtime, el SHA-256."""
+    if not entry:
+        return False
+    stat = path.stat()
+    if entry.get("size") != stat.st_size:
+        return False
+    if entry.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if file_sha256(path) == entry.get("sha256"):
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def _shard_sources(processed_dir: Path, tipo: str, source: Path) -> Optional[Dict[int, Tuple[Path, List[str], str]]]:
+    """
+    Shards por año del limpiador, si corresponden exactamente al CSV clean.
+
+    El CSV clean es el encabezado seguido de los shards en orden de año,
+    así que la suma de tamaños confirma que no hay shards desactualizados
+    (p. ej. tras una corrida ``--no-incremental``). Devuelve
+    ``{año: (shard, columnas, clave)}``; la clave cambia si cambia la
+    entrada del año o la firma de limpieza.
+    """
+    shard_dir = processed_dir / SHARDS_DIRNAME / tipo
+    manifest = read_json(shard_dir / "manifest.json", default=None)
+    if not isinstance(manifest, dict) or not manifest.get("years"):
+        return None
+    columns = manifest["signature"]["columns"]
+    signature = json.dumps(manifest["signature"], sort_keys=True)
+    shards: Dict[int, Tuple[Path, List[str], str]] = {}
+    total = 0
+    for year_key, entry in manifest["years"].items():
+        shard = shard_dir / f"{year_key}.csv"
+        if not shard.exists():
+            return None
+        total += shard.stat().st_size
+        key = hashlib.sha256(f"{entry['sha256']}\x1f{signature}".encode("utf-8")).hexdigest()
+        shards[int(year_key)] = (shard, columns, key)
+    with source.open("rb") as f:
+        header_bytes = len(f.readline())
+    if header_bytes + total != source.stat().st_size:
+        return None
+    return shards
+
+
+def _read_text(path: Path, names: Optional[List[str]] = None, chunk_size: Optional[int] = None):
+    """Lee solo las columnas del cubo como texto (nulos como en ``read_csv``)."""
+    wanted = {"año", "edadif", *DIMENSIONS, *MONTH_CANDIDATES}
+    return pd.read_csv(
+        path,
+        header=None if names is not None else "infer",
+        names=names,
+        usecols=lambda c: str(c).strip().lower() in wanted,
+        dtype=str,
+        chunksize=chunk_size,
+    )
+
+
+def _write_slice(cube_dir: Path, tipo: str, year: int, cells: pd.DataFrame) -> None:
+    with atomic_output(partition_path(cube_dir, tipo, year)) as tmp_path:
+        write_partition(cells.drop(columns="año"), tmp_path)
+
+
+def _update_tipo(
+    processed_dir: Path,
+    cube_dir: Path,
+    tipo: str,
+    entry: Dict,
+    chunk_size: int,
+    verbose: bool,
+) -> None:
+    """Actualiza en disco las particiones de un tipo y su entrada del manifiesto."""
+    source = clean_path(processed_dir, tipo)
+    if not source.exists():
+        raise FileNotFoundError(
+            f"No existe {source}. Ejecuta primero scripts/build_q1_q2_clean.py"
+        )
+    years: Dict[str, Dict] = entry.setdefault("años", {})
+    if _source_is_fresh(entry.get("fuente"), source) and all(
+        partition_path(cube_dir, tipo, int(y)).exists() for y in years
+    ):
+        if verbose:
+            print(f"[CUBO] {tipo}: sin cambios ({len(years)} años)")
+        return
+
+    began = time.perf_counter()
+    entry["mes_columna"] = month_column(
+        str(c).strip().lower() for c in pd.read_csv(source, nrows=0).columns
+    )
+    shards = _shard_sources(processed_dir, tipo, source)
+    if shards is not None:
+        rebuilt = []
+        for year, (shard, columns, key) in sorted(shards.items()):
+            previous = years.get(str(year))
+            if previous and previous.get("origen") == key and partition_path(cube_dir, tipo, year).exists():
+                continue
+            with span("año", año=year) as medida:
+                frame = _read_text(shard, names=columns)
+                cells, kinds = aggregate_rows(frame, tipo)
+                cells = cells[cells["año"] == year]
+                _write_slice(cube_dir, tipo, year, cells)
+                medida.add_rows(len(frame))
+            years[str(year)] = {"origen": key, "filas": int(cells["filas"].sum()), "valores": kinds}
+            rebuilt.append(year)
+        current = {str(year) for year in shards}
+    else:
+        # Sin shards utilizables: una pasada por bloques sobre el CSV clean
+        parts: Dict[int, List[pd.DataFrame]] = {}
+        kinds_by_year: Dict[int, Dict[str, str]] = {}
+        with span("pasada") as medida:
+            for chunk in _read_text(source, chunk_size=chunk_size):
+                cells, kinds = aggregate_rows(chunk, tipo)
+                medida.add_rows(len(chunk))
+                for year, year_cells in cells.groupby("año", sort=False):
+                    parts.setdefault(int(year), []).append(year_cells)
+                    # Un año es decimal si lo es en cualquiera de sus bloques
+                    _merge_kinds(kinds_by_year.setdefault(int(year), {}), kinds)
+        rebuilt = sorted(parts)
+        for year in rebuilt:
+            cells = _combine(parts[year])
+            _write_slice(cube_dir, tipo, year, cells)
+            years[str(year)] = {"origen": None, "filas": int(cells["filas"].sum()), "valores": kinds_by_year[year]}
+        current = {str(year) for year in parts}
+
+    for year_key in [y for y in years if y not in current]:
+        del years[year_key]
+        partition_path(cube_dir, tipo, int(year_key)).unlink(missing_ok=True)
+    entry["fuente"] = _file_signature(source)
+    if verbose:
+        print(
+            f"[CUBO] {tipo}: agregados={rebuilt}, reutilizados={len(current) - len(rebuilt)} "
+            f"({time.perf_counter() - began:.2f}s)"
+        )
+
+
+def load_cube(cube_dir: Path) -> CountCube:
+    """Lee el cubo persistido por ``update_cube``."""
+    manifest = read_json(cube_dir / CUBE_MANIFEST, default=None)
+    if not isinstance(manifest, dict) or manifest.get("version") != CUBE_VERSION:
+        raise FileNotFoundError(f"No hay un cubo válido en {cube_dir}")
+    cube = CountCube.empty()
+    for tipo, entry in manifest["tipos"].items():
+        kinds: Dict[str, str] = {}
+        parts = []
+        for year_key, year_entry in sorted(entry["años"].items()):
+            cells = read_partition(partition_path(cube_dir, tipo, int(year_key)))
+            parts.append(cells.assign(año=int(year_key)))
+            _merge_kinds(kinds, year_entry["valores"])
+        if parts:
+            cube._replace(tipo, pd.concat(parts, ignore_index=True), kinds, entry.get("mes_columna"))
+    return cube
+
+
+def update_cube(
+    processed_dir: Path,
+    cube_dir: Optional[Path] = None,
+    tipos: Sequence[str] = TIPOS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verbose: bool = True,
+) -> CountCube:
+    """
+    Pone al día el cubo de ``processed_dir`` y lo devuelve en memoria.
+
+    Solo se agregan los años nuevos o modificados (ver docstring del
+    módulo); los años que ya no están en el CSV clean se eliminan.
+    """
+    cube_dir = cube_dir or processed_dir / CUBE_DIRNAME
+    manifest_path = cube_dir / CUBE_MANIFEST
+    manifest = read_json(manifest_path, default=None)
+    if not isinstance(manifest, dict) or manifest.get("version") != CUBE_VERSION:
+        manifest = {"version": CUBE_VERSION, "tipos": {}}
+    for tipo in tipos:
+        entry = manifest["tipos"].setdefault(tipo, {})
+        with span("cubo", tipo=tipo):
+            _update_tipo(processed_dir, cube_dir, tipo, entry, chunk_size, verbose)
+        write_json_atomic(manifest, manifest_path)
+    return load_cube(cube_dir)
+
+
+def main() -> None:
+    import argparse
+
+    from config import DATA_PROCESSED_DIR
+
+    parser = argparse.ArgumentParser(description="Pone al día el cubo de conteos de Q1-Q4.")
+    parser.add_argument(
+        "--processed-dir",
+        type=Path,
+        default=DATA_PROCESSED_DIR,
+        help="Directorio con los datasets clean (el cubo se guarda en <processed-dir>/_cube)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Filas por bloque al reconstruir un tipo desde el CSV clean",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada etapa con tracemalloc (más lento)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
+    args = parser.parse_args()
+    start(trace_memory=args.trace_memory)
+    update_cube(args.processed_dir, chunk_size=args.chunk_size, verbose=not args.quiet)
+    run_report = write_report(
+        report_path(args.processed_dir / CUBE_DIRNAME, "cubo"), "mortality_cube", chunk_size=args.chunk_size
+    )
+    if not args.quiet:
+        print(f"[OUT] {run_report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,559 @@
+"""
+Dataset perezoso particionado por tipo y año.
+
+En lugar de concatenar todos los tipos en un ``master`` con la unión de sus
+columnas (mayormente NaN), ``PartitionedDataset`` describe las particiones
+``(tipo, año)`` que existen en disco (CSV ``<año>_<tipo>.csv`` o Parquet
+``tipo=<t>/anio=<a>``) y difiere la lectura:
+
+    ds = PartitionedDataset.discover(TIPOS_DATOS, (2009, 2023), csv_dir=...)
+    ds.filter(tipos=["defunciones"], years=range(2015, 2023)).select(["depreg"])
+    ds.count()                         # filas sin cargar columnas de datos
+    ds.map_reduce(mapper, reducer)     # una partición en memoria a la vez
+    ds.materialize()                   # DataFrame solo cuando se pide
+
+Cada partición se lee con el esquema tipado de su tipo
+(``scripts/schema_registry.py``), la proyección y los predicados se aplican
+al leerla, y ninguna operación salvo ``materialize`` retiene más de una
+partición por trabajador.
+
+``write_partitions`` escribe el camino inverso: particiones comprimidas
+(Parquet zstd o CSV gzip) en paralelo y un ``manifest.json`` con filas y
+estadísticas por columna, que ``PartitionedDataset.from_manifest`` usa
+para descartar particiones (``prune``) sin abrirlas.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from scripts.columnar import (
+    PARQUET_COMPRESSION,
+    partition_path,
+    read_partition,
+    read_schema_names,
+    write_partition,
+)
+from scripts.io_utils import atomic_output, read_json, write_json_atomic
+from scripts.schema_registry import (
+    align_categories,
+    apply_schema,
+    canonical_column,
+    parse_dtypes,
+    schema_for,
+    with_aliases,
+)
+
+
+Predicate = Callable[[pd.DataFrame], Any]
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+CSV_PARTITION_FILENAME = "part-0.csv.gz"
+WRITE_FORMATS = ("parquet", "csv")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Archivo de un tipo y año (``fmt`` es ``"csv"`` o ``"parquet"``)."""
+
+    tipo: str
+    year: int
+    path: Path
+    fmt: str
+    # Filas y estadísticas por columna del manifiesto (si se conocen)
+    rows: Optional[int] = field(default=None, compare=False)
+    stats: Optional[Dict[str, Dict]] = field(default=None, compare=False, hash=False)
+
+    @property
+    def file_bytes(self) -> int:
+        return self.path.stat().st_size
+
+    def column_names(self) -> List[str]:
+        """Columnas del archivo (``canonical_column``), sin leer filas."""
+        if self.stats is not None:
+            return [canonical_column(name) for name in self.stats]
+        if self.fmt == "parquet":
+            names = read_schema_names(self.path)
+        else:
+            names = pd.read_csv(self.path, nrows=0).columns.tolist()
+        return [canonical_column(name) for name in names]
+
+    def num_rows(self) -> int:
+        """Filas del archivo (manifiesto, metadatos Parquet o una columna del CSV)."""
+        if self.rows is not None:
+            return self.rows
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetFile(self.path).metadata.num_rows
+        return len(pd.read_csv(self.path, usecols=[0]))
+
+
+@dataclass
+class LoadedPartition:
+    partition: Partition
+    frame: pd.DataFrame
+    original_columns: List[str]
+    nonconforming: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def read_csv_typed(
+    path: Path,
+    projection: Optional[set] = None,
+    schema: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Lee un CSV anual con proyección opcional y los dtypes del esquema.
+
+    Si algún valor no se puede leer con el dtype declarado (p. ej. texto en
+    una columna de códigos), el archivo se vuelve a leer con inferencia y
+    ``apply_schema`` deja esa columna como se leyó, reportándola como deriva.
+    """
+    usecols = None
+    if projection is not None:
+        usecols = lambda c: canonical_column(c) in projection  # noqa: E731
+    if schema:
+        header = pd.read_csv(path, nrows=0, usecols=usecols).columns
+        try:
+            return pd.read_csv(
+                path, low_memory=False, usecols=usecols, dtype=parse_dtypes(header, schema)
+            )
+        except (TypeError, ValueError):
+            pass
+    return pd.read_csv(path, low_memory=False, usecols=usecols)
+
+
+def load_partition(
+    partition: Partition,
+    columns: Optional[Sequence[str]] = None,
+    schema: bool = True,
+    predicates: Sequence[Predicate] = (),
+) -> LoadedPartition:
+    """
+    Lee una partición: proyección, esquema tipado, columna ``año`` y predicados.
+
+    Los predicados reciben el DataFrame con columnas en minúsculas (los
+    alias de ``canonical_column`` resueltos) y ``año``; un ``<NA>`` en la
+    máscara cuenta como False.
+    """
+    start = time.perf_counter()
+    registry = schema_for(partition.tipo) if schema else {}
+    if partition.fmt == "parquet":
+        df = read_partition(partition.path, columns=None if columns is None else with_aliases(columns))
+    else:
+        projection = None if columns is None else {canonical_column(c) for c in columns}
+        df = read_csv_typed(partition.path, projection, registry if schema else None)
+    original_columns = df.columns.tolist()
+    df.columns = [canonical_column(c) for c in df.columns]
+
+    nonconforming: Dict[str, str] = {}
+    if schema:
+        df, nonconforming = apply_schema(df, registry)
+        df["año"] = np.int16(partition.year)
+    else:
+        df["año"] = partition.year
+
+    for predicate in predicates:
+        mask = pd.Series(predicate(df), index=df.index).fillna(False).astype(bool)
+        df = df[mask.to_numpy()].reset_index(drop=True)
+    return LoadedPartition(
+        partition=partition,
+        frame=df,
+        original_columns=original_columns,
+        nonconforming=nonconforming,
+        seconds=time.perf_counter() - start,
+    )
+
+
+class PartitionedDataset:
+    """
+    Conjunto perezoso de particiones ``(tipo, año)``.
+
+    ``filter`` y ``select`` devuelven un dataset nuevo sin leer datos; las
+    operaciones de ejecución (``map``, ``map_reduce``, ``count``,
+    ``materialize``) recorren las particiones en orden de tipo y año.
+    """
+
+    def __init__(
+        self,
+        partitions: Sequence[Partition],
+        columns: Optional[Sequence[str]] = None,
+        predicates: Sequence[Predicate] = (),
+        schema: bool = True,
+    ) -> None:
+        self._partitions = sorted(partitions, key=lambda p: (p.tipo, p.year))
+        self._columns = None if columns is None else [canonical_column(c) for c in columns]
+        self._predicates = tuple(predicates)
+        self._schema = schema
+
+    @classmethod
+    def discover(
+        cls,
+        tipos: Iterable[str],
+        years: Tuple[int, int] = (2009, 2023),
+        csv_dir: Optional[Path] = None,
+        parquet_dir: Optional[Path] = None,
+        schema: bool = True,
+    ) -> "PartitionedDataset":
+        """
+        Particiones existentes de ``tipos`` en el rango ``years`` (fin excluido).
+
+        Con ``parquet_dir`` se usan las particiones Parquet; si no, los CSV de
+        ``csv_dir``. Los archivos vacíos se omiten.
+        """
+        if csv_dir is None and parquet_dir is None:
+            raise ValueError("Se requiere csv_dir o parquet_dir")
+        partitions = []
+        for tipo in tipos:
+            for year in range(*years):
+                if parquet_dir is not None:
+                    path, fmt = partition_path(parquet_dir, tipo, year), "parquet"
+                else:
+                    assert csv_dir is not None
+                    path, fmt = csv_dir / f"{year}_{tipo}.csv", "csv"
+                if path.exists() and path.stat().st_size > 1:
+                    partitions.append(Partition(tipo, year, path, fmt))
+        return cls(partitions, schema=schema)
+
+    @classmethod
+    def from_manifest(cls, root: Path, schema: bool = True) -> "PartitionedDataset":
+        """Particiones escritas por ``write_partitions`` (sin recorrer el directorio)."""
+        manifest = read_json(root / MANIFEST_FILENAME, default=None)
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            raise FileNotFoundError(f"No hay un manifiesto válido en {root}")
+        partitions = [
+            Partition(
+                entry["tipo"], entry["año"], root / entry["ruta"], manifest["formato"],
+                rows=entry["filas"], stats=entry["columnas"],
+            )
+            for entry in manifest["particiones"]
+        ]
+        return cls(partitions, schema=schema)
+
+    def _derive(self, **changes: Any) -> "PartitionedDataset":
+        state = {
+            "partitions": self._partitions,
+            "columns": self._columns,
+            "predicates": self._predicates,
+            "schema": self._schema,
+        }
+        state.update(changes)
+        return PartitionedDataset(**state)
+
+    # ------------------------------------------------------------------
+    # Transformaciones perezosas
+    # ------------------------------------------------------------------
+    def filter(
+        self,
+        tipos: Optional[Iterable[str]] = None,
+        years: Optional[Iterable[int]] = None,
+        predicate: Optional[Predicate] = None,
+    ) -> "PartitionedDataset":
+        """
+        Restringe particiones por tipo/año y, opcionalmente, filas por predicado.
+
+        Los filtros de tipo y año descartan particiones sin abrirlas; el
+        predicado se evalúa al leer cada partición y se combina (AND) con
+        los anteriores. Las columnas que use deben estar en la proyección.
+        """
+        partitions = self._partitions
+        if tipos is not None:
+            wanted_tipos = set(tipos)
+            partitions = [p for p in partitions if p.tipo in wanted_tipos]
+        if years is not None:
+            wanted_years = set(years)
+            partitions = [p for p in partitions if p.year in wanted_years]
+        predicates = self._predicates + ((predicate,) if predicate is not None else ())
+        return self._derive(partitions=partitions, predicates=predicates)
+
+    def prune(
+        self,
+        column: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> "PartitionedDataset":
+        """
+        Descarta las particiones cuyo rango de ``column`` no cruza ``[low, high]``.
+
+        Usa las estadísticas del manifiesto; las particiones sin estadísticas
+        o sin rango conocido para la columna se conservan. No filtra filas:
+        para eso se combina con un predicado en ``filter``.
+        """
+        column = canonical_column(column)
+
+        def may_match(partition: Partition) -> bool:
+            if partition.stats is None:
+                return True
+            info = next(
+                (v for k, v in partition.stats.items() if canonical_column(k) == column), None
+            )
+            if info is None:
+                # La columna no está en la partición: ningún valor puede cumplir
+                return False
+            if info.get("min") is None:
+                return info.get("nulos", 0) < (partition.rows or 1)
+            if low is not None and info["max"] < low:
+                return False
+            if high is not None and info["min"] > high:
+                return False
+            return True
+
+        return self._derive(partitions=[p for p in self._partitions if may_match(p)])
+
+    def select(self, columns: Sequence[str]) -> "PartitionedDataset":
+        """Proyección de columnas (``año`` siempre está disponible)."""
+        columns = [canonical_column(c) for c in columns]
+        if self._columns is not None:
+            columns = [c for c in columns if c in self._columns]
+        return self._derive(columns=columns)
+
+    # ------------------------------------------------------------------
+    # Descripción sin leer filas
+    # ------------------------------------------------------------------
+    @property
+    def partitions(self) -> List[Partition]:
+        return list(self._partitions)
+
+    @property
+    def tipos(self) -> List[str]:
+        return sorted({p.tipo for p in self._partitions})
+
+    @property
+    def years(self) -> List[int]:
+        return sorted({p.year for p in self._partitions})
+
+    def columns(self, tipo: Optional[str] = None) -> List[str]:
+        """Columnas (unión entre particiones) leyendo solo encabezados."""
+        seen: Dict[str, None] = {}
+        for partition in self._partitions:
+            if tipo is not None and partition.tipo != tipo:
+                continue
+            for name in partition.column_names():
+                if self._columns is None or name in self._columns:
+                    seen.setdefault(name, None)
+        seen.setdefault("año", None)
+        return list(seen)
+
+    def __len__(self) -> int:
+        return len(self._partitions)
+
+    def __repr__(self) -> str:
+        return (
+            f"PartitionedDataset(tipos={self.tipos}, particiones={len(self._partitions)}, "
+            f"columnas={'todas' if self._columns is None else self._columns}, "
+            f"predicados={len(self._predicates)})"
+        )
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+    def load(self, partition: Partition) -> LoadedPartition:
+        return load_partition(partition, self._columns, self._schema, self._predicates)
+
+    def iter_frames(self) -> Iterator[Tuple[Partition, pd.DataFrame]]:
+        """Particiones leídas de a una, en orden de tipo y año."""
+        for partition in self._partitions:
+            yield partition, self.load(partition).frame
+
+    def map(
+        self,
+        func: Callable[[Partition, pd.DataFrame], Any],
+        workers: int = 1,
+    ) -> List[Any]:
+        """
+        Aplica ``func(partición, df)`` a cada partición y devuelve los
+        resultados en orden; con ``workers > 1`` se leen en un pool de hilos.
+        """
+        def run(partition: Partition) -> Any:
+            return func(partition, self.load(partition).frame)
+
+        if workers > 1 and len(self._partitions) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(run, self._partitions))
+        return [run(partition) for partition in self._partitions]
+
+    def map_reduce(
+        self,
+        mapper: Callable[[Partition, pd.DataFrame], Any],
+        reducer: Callable[[Any, Any], Any],
+        initial: Any = None,
+        workers: int = 1,
+    ) -> Any:
+        """Reduce en orden los resultados de ``map``; ``initial`` es el acumulador inicial."""
+        result = initial
+        for value in self.map(mapper, workers=workers):
+            result = value if result is None else reducer(result, value)
+        return result
+
+    def count_by(self) -> pd.Series:
+        """Filas por ``(tipo, año)``; sin predicados no se leen columnas de datos."""
+        if self._predicates:
+            counts = self.map(lambda partition, df: len(df))
+        else:
+            counts = [partition.num_rows() for partition in self._partitions]
+        index = pd.MultiIndex.from_tuples(
+            [(p.tipo, p.year) for p in self._partitions], names=["tipo", "año"]
+        )
+        return pd.Series(counts, index=index, dtype="int64", name="filas")
+
+    def count(self) -> int:
+        return int(self.count_by().sum())
+
+    def materialize(self, by_tipo: bool = False) -> Any:
+        """
+        Lee todas las particiones y las concatena.
+
+        Con ``by_tipo=True`` devuelve ``{tipo: DataFrame}`` (cada uno solo con
+        sus columnas); si no, un DataFrame con la unión de columnas y la
+        columna ``tipo`` (category).
+        """
+        frames: Dict[str, List[pd.DataFrame]] = {}
+        for partition, df in self.iter_frames():
+            frames.setdefault(partition.tipo, []).append(df)
+        if by_tipo:
+            result = {}
+            for tipo, parts in frames.items():
+                align_categories(parts)
+                result[tipo] = pd.concat(parts, ignore_index=True)
+            return result
+        parts = []
+        for tipo, tipo_frames in frames.items():
+            for df in tipo_frames:
+                df["tipo"] = tipo
+                parts.append(df)
+        if not parts:
+            return pd.DataFrame(columns=self._columns or [])
+        align_categories(parts)
+        master = pd.concat(parts, ignore_index=True)
+        master["tipo"] = master["tipo"].astype("category")
+        return master
+
+    def write(self, root: Path, fmt: str = "parquet", workers: Optional[int] = None) -> Dict:
+        """Escribe las particiones (ver ``write_partitions``) sin materializar el dataset."""
+        return write_partitions(
+            ((p.tipo, p.year, df) for p, df in self.iter_frames()), root, fmt=fmt, workers=workers
+        )
+
+
+# ----------------------------------------------------------------------
+# Escritura particionada
+# ----------------------------------------------------------------------
+def _json_number(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def column_stats(df: pd.DataFrame) -> Dict[str, Dict]:
+    """``{columna: {"nulos", "min", "max"}}``; min/max solo para columnas numéricas."""
+    stats: Dict[str, Dict] = {}
+    for col in df.columns:
+        series = df[col]
+        info: Dict[str, Any] = {"nulos": int(series.isna().sum()), "min": None, "max": None}
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            info["min"] = _json_number(series.min())
+            info["max"] = _json_number(series.max())
+        stats[str(col)] = info
+    return stats
+
+
+def _partition_file(root: Path, tipo: str, year: int, fmt: str) -> Path:
+    if fmt == "parquet":
+        return partition_path(root, tipo, year)
+    return root / f"tipo={tipo}" / f"anio={year}" / CSV_PARTITION_FILENAME
+
+
+def _write_partition_file(root: Path, tipo: str, year: int, df: pd.DataFrame, fmt: str) -> Dict:
+    """Escribe una partición de forma atómica y devuelve su entrada del manifiesto."""
+    # Las claves de partición van en la ruta; las columnas vacías (en un
+    # master, las de otros tipos) no se escriben.
+    df = df.drop(columns=[c for c in ("tipo", "año") if c in df.columns])
+    df = df.loc[:, df.notna().any(axis=0).to_numpy()] if len(df) else df
+    path = _partition_file(root, tipo, year, fmt)
+    with atomic_output(path) as tmp_path:
+        if fmt == "parquet":
+            write_partition(df, tmp_path)
+        else:
+            df.to_csv(tmp_path, index=False, compression="gzip")
+    return {
+        "tipo": tipo,
+        "año": int(year),
+        "ruta": path.relative_to(root).as_posix(),
+        "filas": len(df),
+        "bytes": path.stat().st_size,
+        "columnas": column_stats(df),
+    }
+
+
+def write_partitions(
+    frames: Iterable[Tuple[str, int, pd.DataFrame]],
+    root: Path,
+    fmt: str = "parquet",
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Escribe particiones ``(tipo, año, df)`` comprimidas y en paralelo.
+
+    Cada partición va a ``root/tipo=<t>/anio=<a>/`` (``part-0.parquet`` con
+    zstd o ``part-0.csv.gz``), de modo que ``PartitionedDataset.discover`` y
+    ``cargar_tipo_normalizado(parquet_dir=root)`` la leen directamente. Como
+    máximo ``2 * workers`` particiones esperan escritura a la vez, así que
+    con un iterador perezoso la memoria no crece con el dataset. Al final se
+    escribe ``manifest.json`` (filas, bytes y nulos/min/max por columna) y
+    se eliminan particiones de escrituras anteriores que ya no aplican.
+    """
+    if fmt not in WRITE_FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (opciones: {WRITE_FORMATS})")
+    workers = workers or min(8, os.cpu_count() or 1)
+    root.mkdir(parents=True, exist_ok=True)
+    entries: List[Dict] = []
+    pending: List[Future] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for tipo, year, df in frames:
+            pending.append(pool.submit(_write_partition_file, root, tipo, year, df, fmt))
+            if len(pending) >= 2 * workers:
+                entries.append(pending.pop(0).result())
+        entries.extend(future.result() for future in pending)
+
+    entries.sort(key=lambda e: (e["tipo"], e["año"]))
+    written = {root / e["ruta"] for e in entries}
+    for stale in list(root.glob("tipo=*/anio=*/part-0.*")):
+        if stale not in written:
+            stale.unlink()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "formato": fmt,
+        "compresion": PARQUET_COMPRESSION if fmt == "parquet" else "gzip",
+        "filas": sum(e["filas"] for e in entries),
+        "bytes": sum(e["bytes"] for e in entries),
+        "particiones": entries,
+    }
+    write_json_atomic(manifest, root / MANIFEST_FILENAME)
+    return manifest
+
+
+def frame_partitions(df: pd.DataFrame, tipo: Optional[str] = None) -> Iterator[Tuple[str, int, pd.DataFrame]]:
+    """Particiones ``(tipo, año, df)`` de un DataFrame con columnas ``tipo``/``año``."""
+    if "año" not in df.columns:
+        raise ValueError("El DataFrame necesita la columna 'año' para particionar")
+    if "tipo" not in df.columns:
+        if tipo is None:
+            raise ValueError("El DataFrame no tiene columna 'tipo'; indica el tipo")
+        for year, part in df.groupby("año", sort=True):
+            yield tipo, int(year), part
+        return
+    for (part_tipo, year), part in df.groupby(["tipo", "año"], sort=True, observed=True):
+        yield str(part_tipo), int(year), part
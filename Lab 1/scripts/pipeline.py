@@ -0,0 +1,440 @@
+"""
+Pipeline completo como DAG de etapas con dependencias por hash de contenido.
+
+Etapas (entradas y salidas resueltas con ``config.py``):
+
+    convertir ─► limpiar ─┬─► tablas ─┬─► figuras
+                          └─► cubo ───┘
+
+- convertir: data/sav → CSV crudos (``convertir_sav_xlsx_a_csv.py``)
+- limpiar: CSV crudos → datasets clean Q1-Q2 (``build_q1_q2_clean.py``)
+- tablas: datasets clean → output/tables Q1-Q5 (``build_q1_q5_tables.py``)
+- cubo: datasets clean → data/processed/_cube (``mortality_cube.py``)
+- figuras: tablas + cubo → output/figures/report_ready (``export_report_figures.py``)
+
+La huella de una etapa combina el SHA-256 de sus entradas, de su código
+(el módulo y los módulos de ``scripts`` que importa, más ``config.py``) y
+sus argumentos. Una etapa se ejecuta solo si su huella cambió o falta
+alguna salida; como las entradas de una etapa son las salidas de la
+anterior, una etapa que se vuelve a ejecutar con el mismo resultado no
+invalida a las siguientes. Los hashes se reutilizan mientras no cambien
+tamaño ni mtime, así que una corrida sin cambios solo hace ``stat``.
+
+Las etapas listas se lanzan en paralelo (``--jobs``), cada una en su propio
+proceso; de cada una se registra el tiempo de pared y la memoria máxima
+(RSS) en ``data/pipeline_manifest.json``, y su salida en ``output/logs/``.
+La RSS la reporta el propio proceso de la etapa al terminar (el módulo
+corre bajo ``pipeline.py --run-module``, ver ``run_module``).
+Cada etapa escribe además su informe de ejecución
+(``informe_ejecucion_<etapa>.json`` junto a sus salidas, ver
+``scripts/instrumentation.py``) con el detalle por tipo, año, archivo o
+figura; ``--trace-memory`` agrega a ese detalle el pico de memoria trazada.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import runpy
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import (  # noqa: E402
+    DATA_METADATA_DIR,
+    DATA_PROCESSED_DIR,
+    DATA_RAW_CSV_DIR,
+    DATA_SAV_DIR,
+    OUTPUT_FIGURES_DIR,
+    OUTPUT_TABLES_DIR,
+    PIPELINE_LOG_DIR,
+    PIPELINE_MANIFEST,
+    SCRIPTS_DIR,
+)
+from scripts.instrumentation import peak_rss_mb  # noqa: E402
+from scripts.io_utils import file_sha256, read_json, write_json_atomic  # noqa: E402
+
+
+MANIFEST_VERSION = 1
+CONFIG_FILE = PROJECT_ROOT / "config.py"
+_LOCAL_IMPORT = re.compile(r"^\s*(?:from|import)\s+scripts\.(\w+)", re.MULTILINE)
+# Uso interno: ``pipeline.py --run-module <módulo> [args...]`` ejecuta una etapa
+RUN_MODULE_FLAG = "--run-module"
+PEAK_RSS_PREFIX = "[PIPELINE] rss_max_mb="
+
+# Estados de una etapa en el informe de la corrida
+EXECUTED = "ejecutada"
+SKIPPED = "sin cambios"
+FAILED = "error"
+BLOCKED = "bloqueada"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    Una etapa del pipeline: un módulo de ``scripts`` ejecutado con
+    ``python -m`` desde ``Lab 1/`` (a través de ``run_module``).
+
+    ``inputs`` y ``outputs`` son patrones ``(directorio, glob)``; una salida
+    sin comodines es un archivo que debe existir tras la etapa.
+    """
+
+    name: str
+    module: str
+    args: Tuple[str, ...] = ()
+    inputs: Tuple[Tuple[Path, str], ...] = ()
+    outputs: Tuple[Tuple[Path, str], ...] = ()
+    deps: Tuple[str, ...] = ()
+
+    def command(self) -> List[str]:
+        return [sys.executable, "-m", "scripts.pipeline", RUN_MODULE_FLAG, self.module, *self.args]
+
+
+def _tables(*names: str) -> Tuple[Tuple[Path, str], ...]:
+    return tuple((OUTPUT_TABLES_DIR, name) for name in names)
+
+
+_CLEAN_OUTPUTS = (
+    (DATA_PROCESSED_DIR, "nacimientos_clean_2009_2022.csv"),
+    (DATA_PROCESSED_DIR, "defunciones_clean_2009_2022.csv"),
+)
+_TABLE_OUTPUTS = _tables(
+    "q1_mortalidad_infantil_anual_2009_2022.csv",
+    "q3_mortalidad_infantil_mensual_2009_2022.csv",
+    "q3_resumen_estacional.csv",
+    "q4_tasas_demograficas.csv",
+    "q4_tasas_cruzadas.csv",
+    "q5_silhouette_scores.csv",
+    "q5_clusters_departamentos.csv",
+    "q5_cluster_summary.csv",
+)
+
+STAGES: Tuple[Stage, ...] = (
+    Stage(
+        name="convertir",
+        module="convertir_sav_xlsx_a_csv",
+        inputs=((DATA_SAV_DIR, "**/*.sav"), (DATA_SAV_DIR, "**/*.xlsx")),
+        outputs=((DATA_RAW_CSV_DIR, "*.csv"),),
+    ),
+    Stage(
+        name="limpiar",
+        module="build_q1_q2_clean",
+        args=("--raw-dir", str(DATA_RAW_CSV_DIR), "--processed-dir", str(DATA_PROCESSED_DIR)),
+        inputs=((DATA_RAW_CSV_DIR, "*_nacimientos.csv"), (DATA_RAW_CSV_DIR, "*_defunciones.csv")),
+        outputs=(*_CLEAN_OUTPUTS, (DATA_PROCESSED_DIR, "q1q2_control_calidad_2009_2022.csv")),
+        deps=("convertir",),
+    ),
+    Stage(
+        name="tablas",
+        module="build_q1_q5_tables",
+        args=("--processed-dir", str(DATA_PROCESSED_DIR), "--tables-dir", str(OUTPUT_TABLES_DIR)),
+        inputs=_CLEAN_OUTPUTS,
+        outputs=_TABLE_OUTPUTS,
+        deps=("limpiar",),
+    ),
+    Stage(
+        name="cubo",
+        module="mortality_cube",
+        args=("--processed-dir", str(DATA_PROCESSED_DIR)),
+        inputs=_CLEAN_OUTPUTS,
+        outputs=((DATA_PROCESSED_DIR, "_cube/manifest.json"),),
+        deps=("limpiar",),
+    ),
+    Stage(
+        name="figuras",
+        module="export_report_figures",
+        inputs=(
+            *_TABLE_OUTPUTS,
+            (DATA_PROCESSED_DIR, "_cube/manifest.json"),
+            (DATA_METADATA_DIR, "*.json"),
+        ),
+        outputs=((OUTPUT_FIGURES_DIR / "report_ready", "*.png"),),
+        deps=("tablas", "cubo"),
+    ),
+)
+
+
+# ----------------------------------------------------------------------
+# Huellas
+# ----------------------------------------------------------------------
+def resolve(patterns: Iterable[Tuple[Path, str]]) -> List[Path]:
+    """Archivos que corresponden a los patrones, ordenados y sin repetir."""
+    paths = set()
+    for directory, pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            paths.update(p for p in directory.glob(pattern) if p.is_file())
+        else:
+            path = directory / pattern
+            if path.is_file():
+                paths.add(path)
+    return sorted(paths)
+
+
+def missing_outputs(stage: Stage) -> List[str]:
+    missing = []
+    for directory, pattern in stage.outputs:
+        if any(ch in pattern for ch in "*?["):
+            if not any(directory.glob(pattern)):
+                missing.append(str(directory / pattern))
+        elif not (directory / pattern).is_file():
+            missing.append(str(directory / pattern))
+    return missing
+
+
+def code_files(module: str) -> List[Path]:
+    """El módulo y los módulos de ``scripts`` que importa (transitivamente)."""
+    seen: Dict[str, Path] = {}
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        path = SCRIPTS_DIR / f"{name}.py"
+        if name in seen or not path.exists():
+            continue
+        seen[name] = path
+        pending.extend(_LOCAL_IMPORT.findall(path.read_text(encoding="utf-8")))
+    return [CONFIG_FILE, *sorted(seen.values())]
+
+
+class HashCache:
+    """SHA-256 por archivo, reutilizado mientras no cambien tamaño ni mtime."""
+
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None) -> None:
+        self.entries = entries if entries is not None else {}
+        # Las etapas corren en hilos: el manifiesto se serializa con el lock
+        self.lock = threading.Lock()
+
+    def sha256(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        digest = file_sha256(path)
+        with self.lock:
+            self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        return digest
+
+
+def stage_key(stage: Stage, cache: HashCache) -> str:
+    digest = hashlib.sha256()
+    digest.update("\x1f".join([stage.module, *stage.args]).encode("utf-8"))
+    for group in (code_files(stage.module), resolve(stage.inputs)):
+        digest.update(b"\x1d")
+        for path in group:
+            digest.update(f"{path}\x1f{cache.sha256(path)}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Ejecución
+# ----------------------------------------------------------------------
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    returncode: Optional[int] = None
+    key: Optional[str] = None
+    log: Optional[Path] = None
+    missing: List[str] = field(default_factory=list)
+
+
+def run_process(command: Sequence[str], log_path: Path) -> int:
+    """Ejecuta ``command`` con la salida en ``log_path``; devuelve el código de salida."""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("w", encoding="utf-8") as log:
+        return subprocess.run(command, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT).returncode
+
+
+def run_module(module: str, args: Sequence[str]) -> None:
+    """
+    Ejecuta ``scripts.<module>`` como ``__main__`` en este proceso y, al
+    terminar (también con error), imprime su RSS máxima como última línea.
+
+    La RSS se mide dentro del proceso de la etapa porque ``ru_maxrss`` del
+    hijo, visto desde el pipeline, arrastra la del proceso padre.
+    """
+    sys.argv = [module, *args]
+    try:
+        runpy.run_module(f"scripts.{module}", run_name="__main__", alter_sys=True)
+    finally:
+        print(PEAK_RSS_PREFIX + json.dumps(peak_rss_mb()), flush=True)
+
+
+def reported_peak_rss(log_path: Path) -> Optional[float]:
+    """RSS máxima que ``run_module`` dejó en el log de la etapa (None si no está)."""
+    lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
+    reported = [line for line in lines if line.startswith(PEAK_RSS_PREFIX)]
+    return json.loads(reported[-1][len(PEAK_RSS_PREFIX):]) if reported else None
+
+
+def run_stage(
+    stage: Stage, cache: HashCache, previous_key: Optional[str], force: bool, trace_memory: bool = False
+) -> StageResult:
+    key = stage_key(stage, cache)
+    if not force and key == previous_key and not missing_outputs(stage):
+        return StageResult(stage.name, SKIPPED, key=key)
+    log_path = PIPELINE_LOG_DIR / f"{stage.name}.log"
+    start = time.perf_counter()
+    # --trace-memory no cambia las salidas: no forma parte de la huella
+    command = stage.command() + (["--trace-memory"] if trace_memory else [])
+    returncode = run_process(command, log_path)
+    seconds = time.perf_counter() - start
+    peak = reported_peak_rss(log_path)
+    if returncode != 0:
+        return StageResult(stage.name, FAILED, seconds, peak, returncode, log=log_path)
+    # Las salidas de esta etapa son entradas de las siguientes: su hash se
+    # calcula ahora, con el contenido recién escrito
+    missing = missing_outputs(stage)
+    if missing:
+        return StageResult(stage.name, FAILED, seconds, peak, returncode, log=log_path, missing=missing)
+    return StageResult(stage.name, EXECUTED, seconds, peak, returncode, key=key, log=log_path)
+
+
+def run_pipeline(
+    stages: Sequence[Stage] = STAGES,
+    selected: Optional[Iterable[str]] = None,
+    jobs: int = 2,
+    force: bool = False,
+    verbose: bool = True,
+    trace_memory: bool = False,
+) -> List[StageResult]:
+    """
+    Ejecuta las etapas en orden topológico, en paralelo cuando son
+    independientes. Con ``selected`` solo se consideran esas etapas (sus
+    dependencias no seleccionadas se dan por hechas); con ``trace_memory``
+    cada etapa mide su memoria con tracemalloc en su informe de ejecución.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    names = list(by_name) if selected is None else [n for n in by_name if n in set(selected)]
+    unknown = set(selected or ()) - set(by_name)
+    if unknown:
+        raise ValueError(f"Etapas desconocidas: {sorted(unknown)} (disponibles: {list(by_name)})")
+
+    manifest = read_json(PIPELINE_MANIFEST, default=None)
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "hashes": {}, "etapas": {}}
+    cache = HashCache(manifest["hashes"])
+    keys: Dict[str, Optional[str]] = {
+        name: manifest["etapas"].get(name, {}).get("huella") for name in names
+    }
+
+    results: Dict[str, StageResult] = {}
+    waiting = {name: [d for d in by_name[name].deps if d in names] for name in names}
+    running: Dict[Future, str] = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while waiting or running:
+            for name in [n for n, deps in waiting.items() if all(d in results for d in deps)]:
+                deps = waiting.pop(name)
+                if any(results[d].status in (FAILED, BLOCKED) for d in deps):
+                    results[name] = StageResult(name, BLOCKED)
+                    continue
+                if verbose:
+                    print(f"[PIPELINE] {name}: iniciando")
+                running[pool.submit(run_stage, by_name[name], cache, keys[name], force, trace_memory)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                results[name] = result
+                if verbose:
+                    _print_result(result)
+                # Una etapa fallida pierde su huella: se vuelve a ejecutar
+                entry = manifest["etapas"].setdefault(name, {})
+                entry["huella"] = result.key
+                if result.status in (EXECUTED, FAILED):
+                    entry["estado"] = result.status
+                    entry["segundos"] = round(result.seconds, 3)
+                    entry["rss_max_mb"] = None if result.peak_rss_mb is None else round(result.peak_rss_mb, 1)
+                with cache.lock:
+                    write_json_atomic(manifest, PIPELINE_MANIFEST)
+
+    ordered = [results[name] for name in names]
+    if verbose:
+        print_report(ordered, time.perf_counter() - start)
+    return ordered
+
+
+def _print_result(result: StageResult) -> None:
+    line = f"[PIPELINE] {result.name}: {result.status}"
+    if result.status in (EXECUTED, FAILED):
+        line += f" ({result.seconds:.2f}s"
+        if result.peak_rss_mb is not None:
+            line += f", RSS máx {result.peak_rss_mb:.0f} MB"
+        line += ")"
+    print(line)
+    if result.status == FAILED:
+        if result.missing:
+            print(f"  Salidas faltantes: {result.missing}")
+        if result.log is not None and result.log.exists():
+            tail = result.log.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+            print("\n".join(f"  | {line}" for line in tail))
+            print(f"  Log completo: {result.log}")
+
+
+def print_report(results: Sequence[StageResult], total_seconds: float) -> None:
+    print("")
+    print(f"{'etapa':<12}{'estado':<14}{'tiempo (s)':>12}{'RSS máx (MB)':>14}")
+    for r in results:
+        seconds = f"{r.seconds:.2f}" if r.status in (EXECUTED, FAILED) else "-"
+        peak = f"{r.peak_rss_mb:.0f}" if r.peak_rss_mb is not None else "-"
+        print(f"{r.name:<12}{r.status:<14}{seconds:>12}{peak:>14}")
+    print(f"Total: {total_seconds:.2f}s")
+
+
+def main() -> None:
+    if len(sys.argv) > 2 and sys.argv[1] == RUN_MODULE_FLAG:
+        run_module(sys.argv[2], sys.argv[3:])
+        return
+    parser = argparse.ArgumentParser(
+        description="Ejecuta el pipeline (convertir → limpiar → tablas/cubo → figuras) "
+        "rehaciendo solo las etapas con entradas o código modificados."
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help=f"Etapas a considerar (por defecto todas: {', '.join(s.name for s in STAGES)})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="Etapas independientes en paralelo",
+    )
+    parser.add_argument("--force", action="store_true", help="Ejecutar las etapas aunque no hayan cambiado")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Medir con tracemalloc el pico de memoria por etapa y año (más lento)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Silenciar logs de progreso")
+    args = parser.parse_args()
+    results = run_pipeline(
+        selected=args.stages or None,
+        jobs=args.jobs,
+        force=args.force,
+        verbose=not args.quiet,
+        trace_memory=args.trace_memory,
+    )
+    if any(r.status in (FAILED, BLOCKED) for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Intervalos de confianza bootstrap para tasas a partir de conteos agregados.
+
+Remuestrear registros (millones de nacimientos) es innecesario: la tasa de
+una celda solo depende de sus conteos ``(defunciones, nacimientos)``, así
+que cada réplica se sortea directamente sobre los conteos de todas las
+celdas a la vez (una matriz réplicas × celdas):
+
+- ``binomial``: los nacimientos quedan fijos y las defunciones se sortean
+  como ``Binomial(nacimientos, tasa observada)``;
+- ``poisson``: ambos conteos se sortean como ``Poisson(conteo observado)``.
+
+Las réplicas de celdas finas (año × depreg) se pueden sumar por grupos
+(``groups``) antes de calcular la tasa, de modo que el intervalo de una
+tasa acumulada por departamento hereda la variabilidad de cada año. El
+intervalo es el de percentiles de las tasas replicadas. Con la semilla
+fija (``RANDOM_STATE``) el resultado es reproducible.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.rate_panel import RATE_COLUMN
+
+
+METHODS = ("binomial", "poisson")
+DEFAULT_REPLICATES = 2000
+DEFAULT_LEVEL = 0.95
+CI_LOWER = "ic_inferior"
+CI_UPPER = "ic_superior"
+
+
+def resample_counts(
+    deaths: np.ndarray,
+    births: np.ndarray,
+    replicates: int,
+    method: str = "binomial",
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Réplicas de los conteos de cada celda.
+
+    Retorna ``(defunciones, nacimientos)`` con forma ``(replicates, celdas)``;
+    con ``binomial`` los nacimientos son una sola fila (``(1, celdas)``) que
+    se difunde sobre las réplicas sin copiarse.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method debe ser uno de {METHODS}, no {method!r}")
+    rng = rng if rng is not None else np.random.default_rng()
+    deaths = np.nan_to_num(np.asarray(deaths, dtype=np.float64))
+    births = np.nan_to_num(np.asarray(births, dtype=np.float64))
+    size = (replicates, len(deaths))
+    if method == "poisson":
+        return rng.poisson(deaths, size=size), rng.poisson(births, size=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.clip(np.where(births > 0, deaths / births, 0.0), 0.0, 1.0)
+    return rng.binomial(births.astype(np.int64), p, size=size), births[np.newaxis, :]
+
+
+def bootstrap_rate_ci(
+    panel: pd.DataFrame,
+    groups: Optional[Sequence[str]] = None,
+    numerator: str = "defunciones_infantiles",
+    denominator: str = "nacimientos",
+    replicates: int = DEFAULT_REPLICATES,
+    level: float = DEFAULT_LEVEL,
+    method: str = "binomial",
+    seed: Optional[int] = None,
+    per: int = 1000,
+) -> pd.DataFrame:
+    """
+    Tasa e intervalo bootstrap por celda o por grupo de celdas.
+
+    Parametros:
+    -----------
+    panel : pd.DataFrame
+        Una fila por celda con los conteos (p. ej. ``department_panel``)
+    groups : Sequence[str], optional
+        Claves a las que se suman las réplicas de las celdas; sin ellas el
+        intervalo es por fila de ``panel``
+    numerator, denominator : str
+        Columnas de conteos (defunciones infantiles y nacimientos)
+    replicates : int
+        Número de réplicas
+    level : float
+        Nivel de confianza del intervalo de percentiles
+    method : str
+        ``"binomial"`` o ``"poisson"`` (ver docstring del módulo)
+    seed : int, optional
+        Semilla del generador
+    per : int
+        Escala de la tasa (por 1,000 nacimientos)
+
+    Retorna:
+    --------
+    pd.DataFrame
+        Sin ``groups``: una copia de ``panel`` con ``CI_LOWER`` y ``CI_UPPER``.
+        Con ``groups``: las claves, los conteos sumados, ``RATE_COLUMN`` y
+        el intervalo, una fila por grupo en el orden de ``groupby``.
+        Las celdas sin nacimientos dan intervalo NaN.
+    """
+    rng = np.random.default_rng(seed)
+    deaths = panel[numerator].to_numpy(dtype=np.float64, na_value=np.nan)
+    births = panel[denominator].to_numpy(dtype=np.float64, na_value=np.nan)
+    deaths_rep, births_rep = resample_counts(deaths, births, replicates, method, rng)
+
+    if groups is None:
+        result = panel.copy()
+        missing = np.isnan(deaths) | np.isnan(births)
+    else:
+        groups = list(groups)
+        codes = panel.groupby(groups, sort=True).ngroup().to_numpy()
+        keep = codes >= 0  # filas con alguna clave nula no cuentan
+        order = np.argsort(codes[keep], kind="stable")
+        cells = np.flatnonzero(keep)[order]
+        starts = np.flatnonzero(np.r_[True, np.diff(codes[cells]) != 0])
+        # Suma por grupo de las réplicas (columnas contiguas tras ordenar)
+        deaths_rep = np.add.reduceat(deaths_rep[:, cells], starts, axis=1)
+        births_rep = np.add.reduceat(
+            np.broadcast_to(births_rep, (births_rep.shape[0], len(births)))[:, cells], starts, axis=1
+        )
+        result = panel.iloc[cells[starts]][groups].reset_index(drop=True)
+        result[denominator] = np.add.reduceat(np.nan_to_num(births[cells]), starts)
+        result[numerator] = np.add.reduceat(np.nan_to_num(deaths[cells]), starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[RATE_COLUMN] = result[numerator] / result[denominator] * per
+        missing = np.zeros(len(result), dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(births_rep > 0, deaths_rep / births_rep * per, np.nan)
+    alpha = (1.0 - level) / 2.0
+    empty = missing | np.all(np.isnan(rates), axis=0)
+    lower = np.full(rates.shape[1], np.nan)
+    upper = np.full(rates.shape[1], np.nan)
+    if (~empty).any():
+        lower[~empty], upper[~empty] = np.nanquantile(rates[:, ~empty], [alpha, 1.0 - alpha], axis=0)
+    result[CI_LOWER] = lower
+    result[CI_UPPER] = upper
+    return result
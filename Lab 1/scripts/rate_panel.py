@@ -0,0 +1,210 @@
+"""
+Motor de paneles de tasas con códigos enteros densos.
+
+Un panel de tasas es, por grupo, ``numerador / denominador * escala``:
+defunciones infantiles sobre nacimientos por año y departamento, por mes,
+por municipio o por categoría demográfica. ``rate_panel`` lo calcula sin
+``groupby`` ni ``merge``:
+
+1. cada clave se factoriza (ordenada) una sola vez sobre ambos marcos, de
+   modo que numerador y denominador comparten códigos;
+2. los códigos se combinan en un índice denso (``np.ravel_multi_index``);
+3. los conteos salen de ``np.bincount``, con pesos si cada fila ya es un
+   conteo (p. ej. las celdas de ``mortality_cube``).
+
+Las filas con alguna clave nula no cuentan (como ``groupby`` con
+``dropna=True``). Los marcos no se copian: solo se leen sus columnas clave
+y la de pesos. El resultado tiene el mismo orden, columnas y dtypes que el
+``groupby().size()`` + ``merge``/``concat`` que reemplaza.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+Mask = Union[None, np.ndarray, pd.Series, Callable[[pd.DataFrame], Any]]
+
+RATE_COLUMN = "tasa_mortalidad_infantil_x1000"
+PANEL_JOINS = ("left", "outer")
+# Máximo de combinaciones de claves para contar sobre un arreglo denso; por
+# encima se compactan primero las combinaciones presentes.
+DENSE_LIMIT = 1 << 24
+
+
+def _mask(frame: pd.DataFrame, spec: Mask) -> Optional[np.ndarray]:
+    """Máscara booleana de filas (``<NA>`` cuenta como False)."""
+    if spec is None:
+        return None
+    values = spec(frame) if callable(spec) else spec
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(values, dtype=bool)
+
+
+def _key_values(frame: pd.DataFrame, key: str, integer: bool) -> np.ndarray:
+    series = frame[key]
+    if not integer:
+        return series.to_numpy()
+    # Igual que ``pd.to_numeric(errors="coerce")`` + ``astype(int)``
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+        return series.to_numpy(dtype=np.int64)
+    return np.trunc(series.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _encode(
+    frames: Sequence[pd.DataFrame], keys: Sequence[str], integer_keys: bool
+) -> Tuple[np.ndarray, np.ndarray, int, Callable[[np.ndarray], Dict[str, np.ndarray]]]:
+    """
+    Códigos de grupo de las filas de ``frames`` (concatenadas en orden).
+
+    Devuelve ``(ids, valid, size, decode)``: ``ids`` de las filas sin claves
+    nulas (``valid``), el número de grupos posibles y una función que
+    traduce ids de grupo a los valores de cada clave. Los ids respetan el
+    orden lexicográfico de las claves.
+    """
+    codes: List[np.ndarray] = []
+    levels: List[np.ndarray] = []
+    for key in keys:
+        parts = [_key_values(frame, key, integer_keys) for frame in frames]
+        values = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        key_codes, uniques = pd.factorize(values, sort=True)
+        codes.append(key_codes)
+        levels.append(np.asarray(uniques))
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    valid_codes = [c[valid] for c in codes]
+    shape = tuple(max(len(level), 1) for level in levels)
+
+    if float(np.prod(shape, dtype=np.float64)) <= DENSE_LIMIT:
+        ids = np.ravel_multi_index(valid_codes, shape).astype(np.int64, copy=False)
+
+        def decode(groups: np.ndarray) -> Dict[str, np.ndarray]:
+            positions = np.unravel_index(groups, shape)
+            return {key: level[pos] for key, level, pos in zip(keys, levels, positions)}
+
+        return ids, valid, int(np.prod(shape)), decode
+
+    # Demasiadas combinaciones posibles: se numeran solo las presentes
+    combos, inverse = np.unique(np.stack(valid_codes, axis=1), axis=0, return_inverse=True)
+
+    def decode(groups: np.ndarray) -> Dict[str, np.ndarray]:
+        return {key: level[combos[groups, i]] for i, (key, level) in enumerate(zip(keys, levels))}
+
+    return inverse.reshape(-1).astype(np.int64, copy=False), valid, len(combos), decode
+
+
+def _counts(
+    ids: np.ndarray, mask: Optional[np.ndarray], weights: Optional[np.ndarray], size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Conteo (o suma de pesos) y presencia por grupo."""
+    if mask is not None:
+        ids = ids[mask]
+        weights = None if weights is None else weights[mask]
+    rows = np.bincount(ids, minlength=size)
+    if weights is None:
+        return rows, rows > 0
+    totals = np.bincount(ids, weights=weights, minlength=size)
+    return np.rint(totals).astype(np.int64), rows > 0
+
+
+def rate_panel(
+    numerator: pd.DataFrame,
+    denominator: pd.DataFrame,
+    keys: Sequence[str],
+    numerator_filter: Mask = None,
+    denominator_filter: Mask = None,
+    weight: Optional[str] = None,
+    names: Tuple[str, str] = ("defunciones_infantiles", "nacimientos"),
+    rate: str = RATE_COLUMN,
+    per: float = 1000,
+    how: str = "left",
+    integer_keys: bool = False,
+) -> pd.DataFrame:
+    """
+    Panel ``keys + [denominador, numerador, tasa]`` ordenado por ``keys``.
+
+    Parametros:
+    -----------
+    numerator, denominator : pd.DataFrame
+        Filas de cada conteo; pueden ser el mismo marco con filtros
+        distintos (se codifica una sola vez)
+    keys : Sequence[str]
+        Columnas de agrupación
+    numerator_filter, denominator_filter : máscara o callable(df) -> máscara
+        Filas que cuentan en cada lado (p. ej. ``edadif < 1``)
+    weight : str, opcional
+        Columna con el conteo de cada fila (celdas preagregadas)
+    names : (str, str)
+        Nombres de las columnas de numerador y denominador
+    how : str
+        'left': grupos del denominador, numerador faltante = 0 (como
+        ``merge(how="left")`` + ``fillna(0).astype(int)``).
+        'outer': unión de grupos (como ``pd.concat([den, num], axis=1)
+        .fillna(0)``: los grupos solo del numerador van al final y un lado
+        con grupos faltantes queda como float)
+    integer_keys : bool
+        Claves numéricas truncadas a entero (``to_numeric`` + ``astype(int)``)
+
+    Retorna:
+    --------
+    pd.DataFrame
+        La tasa es ``(numerador / denominador) * per``, NaN si el
+        denominador es 0
+    """
+    if how not in PANEL_JOINS:
+        raise ValueError(f"how debe ser uno de {PANEL_JOINS} (recibido: {how})")
+    keys = list(keys)
+    shared = numerator is denominator
+    frames = [denominator] if shared else [denominator, numerator]
+    ids, valid, size, decode = _encode(frames, keys, integer_keys)
+
+    den_mask = _mask(denominator, denominator_filter)
+    num_mask = _mask(numerator, numerator_filter)
+    den_weights = None if weight is None else denominator[weight].to_numpy(dtype=np.float64)
+    num_weights = None if weight is None else numerator[weight].to_numpy(dtype=np.float64)
+
+    n_den = len(denominator)
+    den_valid, num_valid = (valid, valid) if shared else (valid[:n_den], valid[n_den:])
+    n_den_valid = int(den_valid.sum())
+    den_ids, num_ids = (ids, ids) if shared else (ids[:n_den_valid], ids[n_den_valid:])
+
+    def restrict(mask: Optional[np.ndarray], rows_valid: np.ndarray) -> Optional[np.ndarray]:
+        return None if mask is None else mask[rows_valid]
+
+    den_counts, den_present = _counts(
+        den_ids, restrict(den_mask, den_valid),
+        None if den_weights is None else den_weights[den_valid], size,
+    )
+    num_counts, num_present = _counts(
+        num_ids, restrict(num_mask, num_valid),
+        None if num_weights is None else num_weights[num_valid], size,
+    )
+
+    groups = np.flatnonzero(den_present)
+    den_values: np.ndarray = den_counts[groups]
+    num_values: np.ndarray = num_counts[groups]
+    if how == "outer":
+        extra = np.flatnonzero(num_present & ~den_present)
+        if len(extra):
+            groups = np.concatenate([groups, extra])
+            den_values = np.concatenate([den_values, np.zeros(len(extra), dtype=np.int64)]).astype(np.float64)
+            num_values = num_counts[groups]
+        if not num_present[groups].all():
+            num_values = num_values.astype(np.float64)
+
+    columns = decode(groups)
+    if integer_keys:
+        columns = {key: values.astype(np.int64) for key, values in columns.items()}
+    panel = pd.DataFrame(columns)
+    den_name, num_name = names[1], names[0]
+    panel[den_name] = den_values
+    panel[num_name] = num_values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = (num_values / den_values) * per
+    panel[rate] = np.where(den_values > 0, rates, np.nan)
+    return panel
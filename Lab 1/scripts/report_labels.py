@@ -0,0 +1,70 @@
+"""
+Etiquetas de los códigos que aparecen en las tablas y figuras del informe.
+
+El informe cruza nacimientos y defunciones, así que las etiquetas de
+``depreg``, ``areag`` y ``sexo`` se leen solo de los catálogos de metadatos
+de esos tipos (``data/metadata/<tipo>.json``, ver ``metadata_catalog.py``).
+Mientras sus .sav no se hayan convertido se usa el conjunto revisado de
+este módulo; nunca se toman las etiquetas del .sav de otra estadística
+(defunciones fetales, por ejemplo, escribe los departamentos sin tildes).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from scripts.metadata_catalog import METADATA_DIR, catalog_with_variable, decode_codes
+
+
+REPORT_TIPOS = ("nacimientos", "defunciones")
+DEP_LABEL_TEMPLATE = "{codigo:02d} - {etiqueta}"
+
+# Etiquetas revisadas del informe (las que usaba antes del catálogo)
+REVIEWED_LABELS: Dict[str, Dict[str, str]] = {
+    "depreg": {
+        "1": "Guatemala", "2": "El Progreso", "3": "Sacatepéquez", "4": "Chimaltenango",
+        "5": "Escuintla", "6": "Santa Rosa", "7": "Sololá", "8": "Totonicapán",
+        "9": "Quetzaltenango", "10": "Suchitepéquez", "11": "Retalhuleu", "12": "San Marcos",
+        "13": "Huehuetenango", "14": "Quiché", "15": "Baja Verapaz", "16": "Alta Verapaz",
+        "17": "Petén", "18": "Izabal", "19": "Zacapa", "20": "Chiquimula", "21": "Jalapa",
+        "22": "Jutiapa",
+    },
+    "areag": {"1": "Área urbana", "2": "Área rural", "9": "Sin dato"},
+    "sexo": {"1": "Niños", "2": "Niñas"},
+}
+
+
+def catalog_paths(root: Path = METADATA_DIR) -> List[Path]:
+    """Catálogos de los tipos del informe (los que existan)."""
+    return [path for path in (root / f"{tipo}.json" for tipo in REPORT_TIPOS) if path.exists()]
+
+
+def report_value_labels(variable: str, root: Path = METADATA_DIR) -> Dict[str, str]:
+    """
+    ``{código: etiqueta}`` de ``variable`` para el informe.
+
+    Prefiere el catálogo de nacimientos o defunciones; sin él, el conjunto
+    revisado. Falla si ninguno describe la variable.
+    """
+    catalog = catalog_with_variable(variable, REPORT_TIPOS, root)
+    if catalog is not None:
+        return catalog.value_labels(variable)
+    if variable in REVIEWED_LABELS:
+        return REVIEWED_LABELS[variable]
+    raise KeyError(
+        f"Sin etiquetas para '{variable}' en los catálogos de {', '.join(REPORT_TIPOS)} "
+        f"({root}) ni en las etiquetas revisadas del informe"
+    )
+
+
+def decode_report_codes(
+    values: pd.Series,
+    variable: str,
+    template: Optional[str] = None,
+    root: Path = METADATA_DIR,
+) -> pd.Series:
+    """Decodifica ``values`` a ``category`` con ``report_value_labels`` (ver ``decode_codes``)."""
+    return decode_codes(values, report_value_labels(variable, root), template)
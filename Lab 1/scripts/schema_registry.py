@@ -0,0 +1,366 @@
+"""
+Registro de esquemas tipados por tipo de dato del INE.
+
+Cada tipo declara el dtype compacto de sus columnas (nombres en minúsculas):
+enteros con nulos de 8/16 bits para códigos (departamento, municipio, mes,
+sexo, área...) y ``category`` para códigos de texto (CIE-10, ocupación).
+Los nombres se comparan con ``canonical_column``, que también unifica los
+años que escriben ``Anoreg``/``Anoocu`` sin eñe. El esquema se aplica al
+leer cada año, antes de concatenar:
+
+1. ``parse_dtypes``: dtypes para ``pd.read_csv`` a partir del encabezado.
+   Los enteros se leen como ``Int64`` y no directamente al ancho declarado,
+   porque el parser de pandas desborda en silencio (300 → 44 en ``Int8``).
+2. ``apply_schema``: reduce cada columna al dtype declarado verificando que
+   los valores sean enteros y quepan en el rango; si no caben se usa el
+   siguiente ancho y, si no son enteros, la columna se deja como se leyó.
+   Las columnas no declaradas se compactan por inferencia.
+3. ``schema_drift``: eventos de deriva entre años (columnas nuevas o
+   ausentes, no declaradas, fuera de rango o con dtype no conforme).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.metadata_catalog import code_key
+
+
+# Nombres de columna que algunos años escriben distinto (divorcios 2009-2014: Anoreg, Anoocu)
+COLUMN_ALIASES: Dict[str, str] = {
+    "anoreg": "añoreg",
+    "anoocu": "añoocu",
+}
+
+# Columnas de registro y ocurrencia comunes a todas las estadísticas vitales
+_SHARED_SCHEMA: Dict[str, str] = {
+    "depreg": "Int8",
+    "mupreg": "Int16",
+    "mesreg": "Int8",
+    "añoreg": "Int16",
+    "depocu": "Int8",
+    "mupocu": "Int16",
+    "diaocu": "Int8",
+    "mesocu": "Int8",
+    "añoocu": "Int16",
+    "areag": "Int8",
+}
+
+TIPO_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "nacimientos": {
+        **_SHARED_SCHEMA,
+        "sexo": "Int8",
+        "tipar": "Int8",
+        "viapar": "Int8",
+        "libras": "Int8",
+        "onzas": "Int8",
+        "semges": "Int16",
+        "edadp": "Int16",
+        "edadm": "Int16",
+        "escivp": "Int8",
+        "escivm": "Int8",
+        "escolap": "Int8",
+        "escolam": "Int8",
+        "pueblopp": "Int8",
+        "pueblopm": "Int8",
+        "asisrec": "Int8",
+        "sitioocu": "Int8",
+        "tohite": "Int16",
+        "tohinm": "Int16",
+        "tohivi": "Int16",
+        "ciuopad": "category",
+        "ciuomad": "category",
+    },
+    "defunciones": {
+        **_SHARED_SCHEMA,
+        "sexo": "Int8",
+        "edadif": "Int16",
+        "perdif": "Int8",
+        "puedif": "Int8",
+        "ecidif": "Int8",
+        "escodif": "Int8",
+        "asist": "Int8",
+        "ocur": "Int8",
+        "cerdef": "Int8",
+        "caudef": "category",
+        "ciuodif": "category",
+    },
+    "defunciones_fetales": {
+        **_SHARED_SCHEMA,
+        "sexo": "Int8",
+        "tipar": "Int8",
+        "clapar": "Int8",
+        "viapar": "Int8",
+        "semges": "Int16",
+        "edadm": "Int16",
+        "deprem": "Int16",
+        "muprem": "Int16",
+        "paisrem": "Int16",
+        "escivm": "Int8",
+        "escolam": "Int8",
+        "pueblopm": "Int8",
+        "nacionm": "Int16",
+        "asisrec": "Int8",
+        "sitioocu": "Int8",
+        "tohite": "Int16",
+        "tohinm": "Int16",
+        "tohivi": "Int16",
+        "caudef": "category",
+        "ciuomad": "category",
+    },
+    "matrimonios": {
+        **_SHARED_SCHEMA,
+        "edadhom": "Int16",
+        "edadmuj": "Int16",
+        "pperhom": "Int8",
+        "ppermuj": "Int8",
+        "nachom": "Int16",
+        "nacmuj": "Int16",
+        "eschom": "Int8",
+        "escmuj": "Int8",
+        "clauni": "Int8",
+        "ciuohom": "category",
+        "ciuomuj": "category",
+    },
+    "divorcios": {
+        **_SHARED_SCHEMA,
+        "edadhom": "Int16",
+        "edadmuj": "Int16",
+        "pperhom": "Int8",
+        "ppermuj": "Int8",
+        "nachom": "Int16",
+        "nacmuj": "Int16",
+        "eschom": "Int8",
+        "escmuj": "Int8",
+        "ciuohom": "category",
+        "ciuomuj": "category",
+    },
+}
+
+# Anchos enteros en orden creciente y su rango
+INTEGER_RANGES: Dict[str, Tuple[int, int]] = {
+    "Int8": (-(2**7), 2**7 - 1),
+    "Int16": (-(2**15), 2**15 - 1),
+    "Int32": (-(2**31), 2**31 - 1),
+    "Int64": (-(2**63), 2**63 - 1),
+}
+PARSE_INTEGER_DTYPE = "Int64"
+# Proporción máxima de valores distintos para convertir texto no declarado en category
+CATEGORY_MAX_RATIO = 0.5
+
+
+def canonical_column(name: str) -> str:
+    """Nombre de columna en minúsculas, con los alias de ``COLUMN_ALIASES`` resueltos."""
+    lowered = str(name).strip().lower()
+    return COLUMN_ALIASES.get(lowered, lowered)
+
+
+def with_aliases(columns: Sequence[str]) -> List[str]:
+    """``columns`` más los nombres alternativos con que los archivos pueden escribirlas."""
+    wanted = [canonical_column(c) for c in columns]
+    return wanted + [alias for alias, name in COLUMN_ALIASES.items() if name in wanted]
+
+
+def schema_for(tipo: str) -> Dict[str, str]:
+    """Esquema declarado de un tipo (vacío si el tipo no está registrado)."""
+    return dict(TIPO_SCHEMAS.get(tipo, {}))
+
+
+def parse_dtypes(header: Sequence[str], schema: Mapping[str, str]) -> Dict[str, str]:
+    """
+    Dtypes de lectura para ``pd.read_csv`` con los nombres originales del archivo.
+
+    Los enteros se leen en ``Int64``; ``apply_schema`` los reduce después
+    verificando el rango.
+    """
+    dtypes: Dict[str, str] = {}
+    for name in header:
+        declared = schema.get(canonical_column(name))
+        if declared is None:
+            continue
+        dtypes[name] = PARSE_INTEGER_DTYPE if declared in INTEGER_RANGES else declared
+    return dtypes
+
+
+def _smallest_integer(low: float, high: float, start: str = "Int8") -> Optional[str]:
+    widths = list(INTEGER_RANGES)
+    for dtype in widths[widths.index(start):]:
+        lo, hi = INTEGER_RANGES[dtype]
+        if lo <= low and high <= hi:
+            return dtype
+    return None
+
+
+def _integral_values(series: pd.Series) -> Optional[np.ndarray]:
+    """Valores no nulos como float si todos son enteros; None si alguno no lo es."""
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_numeric_dtype(series):
+        numeric = series
+    else:
+        numeric = pd.to_numeric(series, errors="coerce")
+        if numeric.isna().sum() != series.isna().sum():
+            return None
+    values = numeric.dropna().to_numpy(dtype=np.float64)
+    if not np.all(np.isfinite(values)) or not np.all(values == np.floor(values)):
+        return None
+    return values
+
+
+def _to_integer(series: pd.Series, dtype: str) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    if series.dtype.kind == "f":
+        # float → entero con nulos sin pasar por object
+        return series.round().astype(dtype)
+    return series.astype(dtype)
+
+
+def _canonical_code(value) -> str:
+    """Texto canónico de un código: ``"01"``, ``"1.0"`` y ``1.0`` → ``"1"``."""
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            number = float(text)
+        except ValueError:
+            return text
+        return code_key(number) if np.isfinite(number) else text
+    return code_key(value)
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    """
+    Convierte a ``category`` con categorías en texto canónico.
+
+    Los años del INE escriben el mismo código como ``1``, ``"01"`` o
+    ``1.0``; todas las variantes quedan en una sola categoría.
+    """
+    categorical = pd.Categorical(series)
+    canonical = [_canonical_code(v) for v in categorical.categories]
+    positions, categories = pd.factorize(pd.Index(canonical, dtype=object))
+    # El código -1 (nulo) apunta al último elemento, que también es -1
+    codes = np.append(positions, -1)[categorical.codes]
+    result = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def _compact_undeclared(series: pd.Series) -> pd.Series:
+    values = _integral_values(series) if pd.api.types.is_numeric_dtype(series) else None
+    if values is not None:
+        if len(values) == 0:
+            return series
+        dtype = _smallest_integer(values.min(), values.max())
+        return _to_integer(series, dtype) if dtype else series
+    if (
+        not isinstance(series.dtype, pd.CategoricalDtype)
+        and pd.api.types.infer_dtype(series, skipna=True) == "string"
+        and series.nunique() <= len(series) * CATEGORY_MAX_RATIO
+    ):
+        return series.astype("category")
+    return series
+
+
+def apply_schema(
+    df: pd.DataFrame,
+    schema: Mapping[str, str],
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Convierte las columnas (ya con ``canonical_column``) a los dtypes compactos.
+
+    Retorna el DataFrame y ``{columna: detalle}`` para las columnas
+    declaradas que no se ajustaron al esquema: ``"rango: Int16"`` si hubo que
+    ensanchar el entero o ``"dtype: <leído>"`` si se dejaron como se leyeron.
+    """
+    nonconforming: Dict[str, str] = {}
+    for col in df.columns:
+        series = df[col]
+        declared = schema.get(col)
+        if declared is None:
+            df[col] = _compact_undeclared(series)
+        elif declared == "category":
+            df[col] = _to_category(series)
+        elif declared in INTEGER_RANGES:
+            values = _integral_values(series)
+            if values is None:
+                nonconforming[col] = f"dtype: {series.dtype}"
+                continue
+            dtype = declared
+            if len(values):
+                dtype = _smallest_integer(values.min(), values.max(), start=declared) or "Float64"
+            if dtype != declared:
+                nonconforming[col] = f"rango: {dtype}"
+            df[col] = _to_integer(series, dtype) if dtype in INTEGER_RANGES else series
+        else:
+            df[col] = series.astype(declared)
+    return df, nonconforming
+
+
+def align_categories(frames: List[pd.DataFrame]) -> None:
+    """
+    Unifica las categorías de cada columna categórica entre años (in place).
+
+    ``pd.concat`` solo conserva ``category`` si todas las partes comparten
+    categorías; las partes de texto de la misma columna también se
+    convierten. Si alguna parte es numérica u otra cosa, la columna se deja
+    como está (la concatenación la convierte en object sin perder valores).
+    """
+    categorical = {
+        col for df in frames for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    for col in sorted(categorical):
+        parts = [df for df in frames if col in df.columns]
+        if not all(
+            isinstance(df[col].dtype, pd.CategoricalDtype)
+            or pd.api.types.infer_dtype(df[col], skipna=True) in ("string", "empty")
+            for df in parts
+        ):
+            continue
+        categories: set = set()
+        for df in parts:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                categories.update(df[col].cat.categories)
+            else:
+                categories.update(df[col].dropna().unique())
+        union = sorted(categories, key=str)
+        for df in parts:
+            df[col] = pd.Categorical(df[col], categories=union)
+
+
+def schema_drift(
+    columns_by_year: Mapping[int, Sequence[str]],
+    nonconforming_by_year: Mapping[int, Mapping[str, str]],
+    schema: Mapping[str, str],
+) -> List[Dict]:
+    """
+    Eventos de deriva del esquema entre años consecutivos cargados.
+
+    Cada evento es ``{"año", "columna", "evento", "detalle"}`` con ``evento``
+    en ``nueva`` / ``ausente`` (respecto del año anterior), ``no_declarada``
+    (primera aparición de una columna fuera del registro) y ``rango`` /
+    ``dtype`` (valores que no se ajustan al dtype declarado).
+    """
+    events: List[Dict] = []
+    previous: Optional[List[str]] = None
+    undeclared_seen: set = set()
+    for year in sorted(columns_by_year):
+        current = list(columns_by_year[year])
+        if previous is not None:
+            for col in current:
+                if col not in previous:
+                    events.append({"año": year, "columna": col, "evento": "nueva", "detalle": ""})
+            for col in previous:
+                if col not in current:
+                    events.append({"año": year, "columna": col, "evento": "ausente", "detalle": ""})
+        for col in current:
+            if col not in schema and col not in undeclared_seen:
+                undeclared_seen.add(col)
+                events.append({"año": year, "columna": col, "evento": "no_declarada", "detalle": ""})
+        for col, detail in sorted(nonconforming_by_year.get(year, {}).items()):
+            kind, _, text = detail.partition(": ")
+            events.append({"año": year, "columna": col, "evento": kind, "detalle": text})
+        previous = current
+    return events
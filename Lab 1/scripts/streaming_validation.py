@@ -0,0 +1,300 @@
+"""
+Validación y perfilado en una sola pasada, por bloques.
+
+``StreamingValidator`` acumula, bloque a bloque, lo que ``validar_dataset``
+calculaba sobre el DataFrame completo:
+
+- nulos por columna (con la semántica de la unión de columnas: una columna
+  ausente en un bloque cuenta como nula en sus filas),
+- dtype resultante por columna y valores no conformes con el esquema del
+  tipo (``scripts/schema_registry.py``),
+- mínimo y máximo de los valores numéricos,
+- duplicados exactos por huella de fila (``FingerprintSet``, con derrame
+  opcional a disco),
+- cobertura por año (filas y completitud por columna).
+
+La memoria queda acotada por el tamaño del bloque, el número de columnas y
+el conjunto de huellas (que puede derramarse a disco). Los CSV se leen como
+texto para que el dtype no dependa de cómo pandas infiera cada bloque; el
+dtype final se deduce de los valores vistos, como lo haría ``read_csv``
+sobre el archivo completo.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from scripts.dedup_engine import FingerprintSet, fingerprint_columns
+from scripts.schema_registry import INTEGER_RANGES, schema_for
+
+
+DEFAULT_CHUNK_SIZE = 100_000
+YEAR_COLUMN = "año"
+TIPO_COLUMN = "tipo"
+# dtype que pandas asigna a una columna de texto (``str`` en pandas 3, ``object`` antes)
+_TEXT_DTYPE = pd.Series(["a"]).dtype
+_INT_TEXT = r"[+-]?\d+"
+
+
+def iter_source_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Bloques de un CSV (como texto) o de un Parquet (tipos nativos)."""
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, dtype=str, chunksize=chunk_size)
+
+
+class _ColumnProfile:
+    """Acumuladores de una columna."""
+
+    __slots__ = ("nulls", "min", "max", "dtypes", "text_kinds", "nonconforming")
+
+    def __init__(self) -> None:
+        self.nulls = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.dtypes: Set = set()
+        # Clases de valores vistas en columnas leídas como texto
+        self.text_kinds: Set[str] = set()
+        self.nonconforming = 0
+
+    def update_range(self, numeric: np.ndarray) -> None:
+        values = numeric[~np.isnan(numeric)]
+        if values.size == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def resolved_dtype(self):
+        """dtype de la columna completa (el que tendría al leerla entera)."""
+        if self.text_kinds or not self.dtypes:
+            kinds = self.text_kinds
+            if not kinds or kinds == {"null"}:
+                return np.dtype("float64")
+            if "text" in kinds:
+                return _TEXT_DTYPE
+            if kinds <= {"int"}:
+                return np.dtype("int64")
+            return np.dtype("float64")
+        if len(self.dtypes) == 1:
+            return next(iter(self.dtypes))
+        if any(isinstance(d, pd.CategoricalDtype) for d in self.dtypes) and all(
+            isinstance(d, pd.CategoricalDtype) or d == _TEXT_DTYPE for d in self.dtypes
+        ):
+            # Las categorías se unifican al concatenar (ver ``align_categories``)
+            return pd.CategoricalDtype()
+        # El mismo dtype que daría ``pd.concat`` de las partes
+        return pd.concat([pd.Series([], dtype=d) for d in self.dtypes]).dtype
+
+
+def _numeric_view(series: pd.Series) -> np.ndarray:
+    """Valores como float64 (NaN para nulos y para texto no numérico)."""
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype("float64").to_numpy()
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(series.astype(object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _nonconforming_count(series: pd.Series, numeric: np.ndarray, declared: str) -> int:
+    """Valores no nulos que no caben en el dtype declarado."""
+    if declared not in INTEGER_RANGES:
+        return 0
+    present = series.notna().to_numpy()
+    low, high = INTEGER_RANGES[declared]
+    with np.errstate(invalid="ignore"):
+        valid = (~np.isnan(numeric)) & (numeric == np.floor(numeric)) & (numeric >= low) & (numeric <= high)
+    return int((present & ~valid).sum())
+
+
+class StreamingValidator:
+    """
+    Perfil acumulado de un dataset leído por bloques.
+
+    ``text_input=True`` indica que los bloques vienen como texto
+    (``iter_source_chunks`` sobre CSV) y que el dtype se deduce de los
+    valores. Con ``schema`` se mide la conformidad con ese esquema; si no se
+    indica y el bloque tiene columna ``tipo``, se usa el esquema de cada tipo.
+    """
+
+    def __init__(
+        self,
+        text_input: bool = False,
+        schema: Optional[Mapping[str, str]] = None,
+        dedup_bits: int = 128,
+        spill_dir: Optional[Path] = None,
+        max_memory_keys: Optional[int] = None,
+    ) -> None:
+        self.text_input = text_input
+        self.schema = schema
+        self.rows = 0
+        self._columns: Dict[str, _ColumnProfile] = {}
+        self._fingerprints = FingerprintSet(
+            bits=dedup_bits, spill_dir=spill_dir, max_memory_keys=max_memory_keys
+        )
+        self._dedup_bits = dedup_bits
+        self._year_rows: Dict[int, int] = {}
+        self._year_present: Dict[int, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Acumulación
+    # ------------------------------------------------------------------
+    def update(self, chunk: pd.DataFrame) -> None:
+        n_rows = len(chunk)
+        if n_rows == 0:
+            for col in chunk.columns:
+                self._column(col)
+            return
+        chunk = chunk.reset_index(drop=True)
+        # Columnas ya vistas que faltan en el bloque: nulas en todas sus filas
+        for col, profile in self._columns.items():
+            if col not in chunk.columns:
+                profile.nulls += n_rows
+
+        canonical: List[np.ndarray] = []
+        numerics: Dict[str, np.ndarray] = {}
+        for col in chunk.columns:
+            series = chunk[col]
+            profile = self._column(col)
+            isna = series.isna().to_numpy()
+            profile.nulls += int(isna.sum())
+            numeric = _numeric_view(series)
+            numerics[col] = numeric
+            profile.update_range(numeric)
+            if self.text_input:
+                profile.text_kinds |= self._text_kinds(series, isna, numeric)
+            else:
+                profile.dtypes.add(series.dtype)
+            canonical.append(self._canonical(series, isna, numeric))
+
+        self._count_nonconforming(chunk, numerics)
+        self._update_years(chunk, numerics)
+        self._fingerprints.add_array(fingerprint_columns(canonical, self._dedup_bits))
+        self.rows += n_rows
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "StreamingValidator":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def _column(self, col: str) -> _ColumnProfile:
+        profile = self._columns.get(col)
+        if profile is None:
+            # Columna nueva: nula en todas las filas anteriores
+            profile = self._columns[col] = _ColumnProfile()
+            profile.nulls = self.rows
+        return profile
+
+    @staticmethod
+    def _text_kinds(series: pd.Series, isna: np.ndarray, numeric: np.ndarray) -> Set[str]:
+        kinds: Set[str] = set()
+        if isna.any():
+            kinds.add("null")
+        present = ~isna
+        if not present.any():
+            return kinds
+        if np.isnan(numeric[present]).any():
+            kinds.add("text")
+            return kinds
+        integer_text = series[present].str.strip().str.fullmatch(_INT_TEXT)
+        kinds.add("int" if bool(integer_text.all()) else "float")
+        # Un entero con nulos se lee como float64
+        if "null" in kinds and "int" in kinds:
+            kinds.add("float")
+        return kinds
+
+    @staticmethod
+    def _canonical(series: pd.Series, isna: np.ndarray, numeric: np.ndarray) -> np.ndarray:
+        """
+        Valores comparables entre bloques para la huella de fila.
+
+        Los valores numéricos se representan por su float (``"1"``, ``"1.0"``
+        y ``1`` son iguales, como al leer la columna completa); el resto por
+        su texto, y todos los nulos por el mismo centinela.
+        """
+        values = series.to_numpy(dtype=object, na_value=None)
+        canonical = values.copy()
+        is_number = ~np.isnan(numeric)
+        canonical[is_number] = numeric[is_number]
+        canonical[isna] = None
+        return canonical
+
+    def _count_nonconforming(self, chunk: pd.DataFrame, numerics: Dict[str, np.ndarray]) -> None:
+        if self.schema is not None:
+            groups = [(self.schema, np.ones(len(chunk), dtype=bool))]
+        elif TIPO_COLUMN in chunk.columns:
+            tipos = chunk[TIPO_COLUMN].astype(object)
+            groups = [
+                (schema_for(str(tipo)), (tipos == tipo).to_numpy())
+                for tipo in pd.unique(tipos.dropna())
+            ]
+        else:
+            return
+        for schema, mask in groups:
+            for col, declared in schema.items():
+                if col not in chunk.columns:
+                    continue
+                series = chunk[col][mask]
+                count = _nonconforming_count(series, numerics[col][mask], declared)
+                self._columns[col].nonconforming += count
+
+    def _update_years(self, chunk: pd.DataFrame, numerics: Dict[str, np.ndarray]) -> None:
+        if YEAR_COLUMN not in chunk.columns:
+            return
+        years = numerics[YEAR_COLUMN]
+        valid = ~np.isnan(years)
+        if not valid.any():
+            return
+        year_index = pd.Index(years[valid].astype(np.int64), name=YEAR_COLUMN)
+        present = chunk[valid].notna()
+        present.index = year_index
+        per_year = present.groupby(level=0).sum()
+        counts = year_index.value_counts()
+        for year, row in per_year.iterrows():
+            year = int(year)
+            self._year_rows[year] = self._year_rows.get(year, 0) + int(counts[year])
+            accumulated = self._year_present.setdefault(year, {})
+            for col, value in row.items():
+                accumulated[col] = accumulated.get(col, 0) + int(value)
+
+    # ------------------------------------------------------------------
+    # Resultado
+    # ------------------------------------------------------------------
+    def report(self, nombre: str = "Dataset") -> Dict:
+        """Mismo ``reporte`` que ``validar_dataset`` más las métricas de perfil."""
+        columnas = list(self._columns)
+        duplicados = self._fingerprints.duplicates
+        self._fingerprints.close()
+        completitud = {
+            col: {
+                year: self._year_present[year].get(col, 0) / self._year_rows[year]
+                for year in sorted(self._year_rows)
+            }
+            for col in columnas
+        }
+        return {
+            'nombre': nombre,
+            'filas': self.rows,
+            'columnas': len(columnas),
+            'columnas_lista': columnas,
+            'duplicados_totales': duplicados,
+            'nulos_por_columna': {col: p.nulls for col, p in self._columns.items()},
+            'tipos_datos': {col: p.resolved_dtype() for col, p in self._columns.items()},
+            'min_max': {
+                col: (p.min, p.max) for col, p in self._columns.items() if p.min is not None
+            },
+            'no_conformes_por_columna': {
+                col: p.nonconforming for col, p in self._columns.items() if p.nonconforming
+            },
+            'cobertura_por_año': dict(sorted(self._year_rows.items())),
+            'completitud_por_año': completitud,
+        }
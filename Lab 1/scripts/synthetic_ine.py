@@ -0,0 +1,313 @@
+"""
+Datos sintéticos con el esquema del INE para pruebas de rendimiento.
+
+Un perfil describe un tipo (nacimientos, defunciones, divorcios...) sin
+guardar ningún registro:
+
+- por año: filas, encabezado original (nombres y mayúsculas como vienen) y
+  proporción de filas duplicadas exactas;
+- por año y columna: proporción de vacíos y frecuencia de cada valor, con
+  el texto exacto del CSV ("1.0", "0101"...), hasta ``MAX_PROFILE_VALUES``
+  valores (los más frecuentes; el resto de la masa se reparte entre ellos).
+
+``profile_from_csv`` lo mide sobre los CSV crudos reales. Si no hay CSV
+del tipo en el árbol (nacimientos y defunciones no se versionan),
+``fallback_profile`` lo arma con las columnas de ``schema_registry``, los
+códigos del catálogo de metadatos (uniformes) y rangos por columna.
+
+``generate_tipo`` escribe ``<año>_<tipo>.csv`` a ``scale`` veces las filas
+del perfil, por bloques (la memoria del CSV no crece con la escala), y
+opcionalmente el ``.sav`` equivalente para medir la conversión (este se
+arma con el año completo en memoria).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.metadata_catalog import METADATA_DIR, available_tipos, catalog_with_variable
+from scripts.schema_registry import TIPO_SCHEMAS
+
+
+PROFILE_VERSION = 1
+YEARS = (2009, 2022)  # inclusivo, como build_q1_q2_clean.py
+MAX_PROFILE_VALUES = 2000
+CHUNK_ROWS = 250_000
+# Sin CSV reales: filas por año y duplicados (en divorcios 2009-2022 los
+# duplicados exactos van de 0.2% a 2.6% por año)
+FALLBACK_ROWS = 10_000
+FALLBACK_DUPLICATE_RATE = 0.01
+FALLBACK_NULL_RATE = 0.02
+# Rangos de las columnas sin etiquetas en el catálogo (inclusivos)
+_FALLBACK_RANGES: Dict[str, Tuple[int, int]] = {
+    "diaocu": (1, 31),
+    "mesreg": (1, 12),
+    "mesocu": (1, 12),
+    "libras": (1, 12),
+    "onzas": (0, 15),
+    "semges": (20, 44),
+    "edadp": (14, 80),
+    "edadm": (12, 50),
+    "edadhom": (16, 90),
+    "edadmuj": (14, 90),
+    "tohite": (1, 15),
+    "tohinm": (0, 5),
+    "tohivi": (1, 15),
+}
+DEFAULT_RANGE = (1, 9)
+# Edad del difunto: proporción de defunciones infantiles (edadif = 0)
+INFANT_SHARE = 0.08
+
+
+def _value_stats(values: pd.Series) -> Dict:
+    present = values[values.str.strip() != ""]
+    counts = present.value_counts()
+    top = counts.head(MAX_PROFILE_VALUES)
+    return {
+        "null_rate": round(1 - len(present) / len(values), 6) if len(values) else 0.0,
+        "values": [str(v) for v in top.index],
+        "weights": (top / top.sum()).round(8).tolist() if len(top) else [],
+    }
+
+
+def profile_from_csv(
+    tipo: str, csv_dir: Path, years: Tuple[int, int] = YEARS
+) -> Optional[Dict]:
+    """
+    Perfil de un tipo medido sobre ``<año>_<tipo>.csv`` de ``csv_dir``.
+
+    Los archivos cuyo encabezado no comparte columnas con el esquema del tipo
+    (p. ej. páginas de aviso guardadas como CSV) se ignoran; sin archivos
+    válidos retorna ``None``.
+    """
+    declared = set(TIPO_SCHEMAS.get(tipo, {}))
+    frames: Dict[int, pd.DataFrame] = {}
+    for year in range(years[0], years[1] + 1):
+        path = csv_dir / f"{year}_{tipo}.csv"
+        if not path.exists():
+            continue
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+        if declared and not declared & {c.strip().lower() for c in frame.columns}:
+            continue
+        frames[year] = frame
+    if not frames:
+        return None
+
+    duplicated = sum(int(frame.duplicated().sum()) for frame in frames.values())
+    rows = sum(len(frame) for frame in frames.values())
+    return {
+        "version": PROFILE_VERSION,
+        "tipo": tipo,
+        "origen": "csv",
+        "years": {
+            str(year): {
+                "rows": len(frame),
+                "columns": list(frame.columns),
+                "duplicate_rate": round(float(frame.duplicated().mean()), 6) if len(frame) else 0.0,
+                "stats": {name.strip().lower(): _value_stats(frame[name]) for name in frame.columns},
+            }
+            for year, frame in frames.items()
+        },
+        "duplicate_rate": round(duplicated / rows, 6) if rows else 0.0,
+        "columns": {},
+    }
+
+
+def _fallback_values(tipo: str, column: str, metadata_dir: Path) -> Tuple[List[str], List[float]]:
+    if column == "edadif":
+        ages = [str(age) for age in range(0, 100)]
+        return ages, [INFANT_SHARE] + [(1 - INFANT_SHARE) / 99] * 99
+    # Las variables continuas solo tienen etiquetas para sus códigos
+    # especiales ("Ignorado"): se usa el rango de la columna
+    if column not in _FALLBACK_RANGES:
+        catalog = catalog_with_variable(column, [tipo, *available_tipos(metadata_dir)], metadata_dir)
+        labels = list(catalog.value_labels(column)) if catalog is not None else []
+        if labels:
+            return labels, [1 / len(labels)] * len(labels)
+    if TIPO_SCHEMAS.get(tipo, {}).get(column) == "category":
+        codes = [f"{letter}{n:02d}" for letter in "ABCDEFGHIJ" for n in range(100)]
+        return codes, [1 / len(codes)] * len(codes)
+    low, high = _FALLBACK_RANGES.get(column, DEFAULT_RANGE)
+    codes = [str(v) for v in range(low, high + 1)]
+    return codes, [1 / len(codes)] * len(codes)
+
+
+def fallback_profile(
+    tipo: str,
+    years: Tuple[int, int] = YEARS,
+    rows_per_year: int = FALLBACK_ROWS,
+    metadata_dir: Path = METADATA_DIR,
+) -> Dict:
+    """Perfil sin datos reales: esquema declarado + códigos del catálogo, igual para todos los años."""
+    schema = TIPO_SCHEMAS.get(tipo)
+    if not schema:
+        raise ValueError(f"Tipo sin esquema declarado: {tipo}")
+    columns: Dict[str, Dict] = {}
+    for name in schema:
+        if name in ("añoreg", "añoocu"):
+            continue  # dependen del año: se generan en generate_tipo
+        values, weights = _fallback_values(tipo, name, metadata_dir)
+        columns[name] = {"null_rate": FALLBACK_NULL_RATE, "values": values, "weights": weights}
+    return {
+        "version": PROFILE_VERSION,
+        "tipo": tipo,
+        "origen": "esquema",
+        "years": {
+            str(year): {"rows": rows_per_year, "columns": list(schema)}
+            for year in range(years[0], years[1] + 1)
+        },
+        "duplicate_rate": FALLBACK_DUPLICATE_RATE,
+        "columns": columns,
+    }
+
+
+def build_profile(tipo: str, csv_dir: Path, metadata_dir: Path = METADATA_DIR) -> Dict:
+    """Perfil medido si hay CSV reales del tipo; si no, el de respaldo."""
+    profile = profile_from_csv(tipo, csv_dir)
+    return profile if profile is not None else fallback_profile(tipo, metadata_dir=metadata_dir)
+
+
+def profile_digest(profile: Mapping) -> str:
+    return hashlib.sha256(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Generación
+# ----------------------------------------------------------------------
+def _column_sampler(stats: Mapping) -> Tuple[np.ndarray, np.ndarray, float]:
+    values = np.asarray(stats["values"] or [""], dtype=object)
+    weights = np.asarray(stats["weights"] or [1.0], dtype=np.float64)
+    return values, weights / weights.sum(), float(stats["null_rate"])
+
+
+def _sample_block(
+    header: Sequence[str],
+    samplers: Mapping[str, Tuple[np.ndarray, np.ndarray, float]],
+    year: int,
+    rows: int,
+    duplicate_rate: float,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    duplicates = int(round(rows * duplicate_rate))
+    unique = rows - duplicates
+    data: Dict[str, np.ndarray] = {}
+    for name in header:
+        key = name.strip().lower()
+        sampler = samplers.get(key)
+        if sampler is None:  # año de registro/ocurrencia sin perfil
+            column = np.full(unique, str(year), dtype=object)
+        else:
+            values, weights, null_rate = sampler
+            column = values[rng.choice(len(values), size=unique, p=weights)]
+            if null_rate > 0:
+                column[rng.random(unique) < null_rate] = ""
+        data[name] = column
+    block = pd.DataFrame(data, columns=list(header))
+    if duplicates and unique:
+        block = pd.concat([block, block.iloc[rng.integers(0, unique, duplicates)]], ignore_index=True)
+        block = block.iloc[rng.permutation(len(block))]
+    return block
+
+
+def generate_tipo(
+    profile: Mapping,
+    out_dir: Path,
+    scale: float = 1.0,
+    seed: int = 0,
+    sav_dir: Optional[Path] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Dict[int, int]:
+    """
+    Escribe ``<año>_<tipo>.csv`` con ``scale`` veces las filas del perfil.
+
+    Parametros:
+    -----------
+    profile : dict
+        Perfil de ``profile_from_csv``/``fallback_profile``
+    out_dir : Path
+        Directorio de los CSV generados
+    scale : float
+        Multiplicador de filas por año (1, 10, 100...)
+    seed : int
+        Semilla; la misma semilla y perfil generan los mismos archivos
+    sav_dir : Path, optional
+        Si se indica, escribe también ``<año>/<año>_<tipo>.sav`` (mismos
+        datos, columnas numéricas como float) para la etapa de conversión
+    chunk_rows : int
+        Filas por bloque de escritura
+
+    Retorna:
+    --------
+    dict
+        Filas escritas por año
+    """
+    tipo = profile["tipo"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shared = {name: _column_sampler(stats) for name, stats in profile["columns"].items()}
+    written: Dict[int, int] = {}
+    for year_text, info in sorted(profile["years"].items()):
+        year = int(year_text)
+        samplers = {name: _column_sampler(stats) for name, stats in info.get("stats", {}).items()} or shared
+        duplicate_rate = info.get("duplicate_rate", profile["duplicate_rate"])
+        rng = np.random.default_rng([seed, year])
+        total = int(round(info["rows"] * scale))
+        path = out_dir / f"{year}_{tipo}.csv"
+        blocks = []
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            for start in range(0, total, chunk_rows):
+                block = _sample_block(
+                    info["columns"], samplers, year, min(chunk_rows, total - start),
+                    duplicate_rate, rng,
+                )
+                block.to_csv(handle, header=start == 0, index=False)
+                if sav_dir is not None:
+                    blocks.append(block)
+            if total == 0:
+                pd.DataFrame(columns=info["columns"]).to_csv(handle, index=False)
+        if sav_dir is not None:
+            frame = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(columns=info["columns"])
+            _write_sav(frame, sav_dir / str(year) / f"{year}_{tipo}.sav")
+        written[year] = total
+    return written
+
+
+def _write_sav(frame: pd.DataFrame, path: Path) -> None:
+    import pyreadstat
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    typed = {}
+    for name in frame.columns:
+        numeric = pd.to_numeric(frame[name].replace("", np.nan), errors="coerce")
+        # Como en los .sav del INE: numérica si todos los valores lo son
+        is_numeric = numeric.notna().sum() == (frame[name] != "").sum()
+        typed[name] = numeric.astype(np.float64) if is_numeric else frame[name].astype(str)
+    pyreadstat.write_sav(pd.DataFrame(typed), str(path))
+
+
+def generate(
+    tipos: Iterable[str],
+    csv_dir: Path,
+    out_dir: Path,
+    scale: float = 1.0,
+    seed: int = 0,
+    sav_dir: Optional[Path] = None,
+    metadata_dir: Path = METADATA_DIR,
+) -> Dict[str, Dict]:
+    """Perfila (o usa el respaldo) y genera cada tipo; devuelve origen y filas por tipo."""
+    summary: Dict[str, Dict] = {}
+    for tipo in tipos:
+        profile = build_profile(tipo, csv_dir, metadata_dir)
+        rows = generate_tipo(profile, out_dir, scale, seed, sav_dir)
+        summary[tipo] = {
+            "origen": profile["origen"],
+            "perfil": profile_digest(profile),
+            "filas": sum(rows.values()),
+            "duplicados": profile["duplicate_rate"],
+        }
+    return summary
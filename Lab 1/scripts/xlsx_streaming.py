@@ -0,0 +1,273 @@
+"""
+Lectura en streaming de hojas XLSX (openpyxl en modo read-only).
+
+Produce bloques de DataFrame equivalentes a ``pd.read_excel(engine="openpyxl")``
+sin materializar la hoja completa. Como pandas decide el dtype de cada
+columna viendo todas sus filas, la lectura se hace en dos pasadas:
+
+1. ``profile_sheet``: recorre las filas una vez y acumula, por columna, qué
+   clases de valores aparecen (enteros, flotantes, texto, fechas, nulos).
+   La memoria es O(columnas).
+2. ``iter_chunks``: recorre de nuevo y emite bloques de ``chunk_size`` filas
+   con el dtype que pandas habría inferido para la columna completa.
+
+Se replican las reglas de ``pandas.io.excel._openpyxl``: celdas numéricas
+enteras como ``int``, recorte de celdas y filas vacías al final, encabezados
+vacíos como ``Unnamed: i`` y nombres duplicados como ``x.1``.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Códigos de error de Excel (pandas los lee como NaN)
+_EXCEL_ERRORS = frozenset({"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"})
+
+# Valores que read_excel interpreta como nulos (na_values por defecto)
+_NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+})
+
+
+@dataclass
+class ColumnProfile:
+    present: int = 0
+    ints: int = 0
+    floats: int = 0
+    datetimes: int = 0
+    others: int = 0  # texto no numérico, booleanos, horas, etc.
+    datetime_resolution: int = 0  # 0 = solo fechas, 1 = segundos, 2 = microsegundos
+
+    def kind(self, n_rows: int) -> str:
+        """dtype que pandas asignaría a la columna completa."""
+        if self.present == 0:
+            return "float"
+        if self.others == 0 and self.datetimes == 0:
+            if self.floats or self.present < n_rows:
+                return "float"
+            return "int"
+        if self.others == 0 and self.ints == 0 and self.floats == 0:
+            return "datetime"
+        return "object"
+
+    def csv_datetime_format(self) -> str:
+        """Formato que ``to_csv`` usaría para la columna de fechas completa."""
+        return ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f")[self.datetime_resolution]
+
+
+@dataclass
+class SheetProfile:
+    columns: List[str]
+    n_rows: int
+    profiles: List[ColumnProfile] = field(default_factory=list)
+
+    @property
+    def kinds(self) -> List[str]:
+        return [p.kind(self.n_rows) for p in self.profiles]
+
+
+def _normalize_cell(value: Any) -> Any:
+    """Equivalente a ``_convert_cell`` de pandas + na_values; ``None`` = nulo."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and (value in _EXCEL_ERRORS or value in _NA_STRINGS):
+        return None
+    return value
+
+
+def _parse_numeric_text(value: str) -> Optional[float | int]:
+    """Interpreta texto numérico como lo hace el parser de pandas."""
+    text = value.strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    if any(ch in text for ch in ".eEnN"):
+        return number
+    return int(text)
+
+
+def _trimmed_width(row: Tuple[Any, ...]) -> int:
+    width = len(row)
+    while width and (row[width - 1] is None or row[width - 1] == ""):
+        width -= 1
+    return width
+
+
+def _header_names(raw_header: Tuple[Any, ...], width: int) -> List[str]:
+    names: List[str] = []
+    for i in range(width):
+        value = raw_header[i] if i < len(raw_header) else None
+        if value is None or value == "":
+            names.append(f"Unnamed: {i}")
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        names.append(str(value))
+    # Mismo esquema de desduplicación que pandas ("x", "x.1", "x.2", ...)
+    counts: Dict[str, int] = defaultdict(int)
+    for i, name in enumerate(names):
+        count = counts[name]
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _open_sheet(path: Path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    sheet = workbook.worksheets[0]
+    # La dimensión declarada en el XML puede ser incorrecta; se recalcula
+    # igual que en pandas.
+    sheet.reset_dimensions()
+    return workbook, sheet
+
+
+def profile_sheet(path: Path) -> SheetProfile:
+    """Primera pasada: ancho, filas útiles y clases de valores por columna."""
+    workbook, sheet = _open_sheet(path)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        raw_header = next(rows, None)
+        if raw_header is None:
+            return SheetProfile(columns=[], n_rows=0)
+        width = _trimmed_width(raw_header)
+        profiles: List[ColumnProfile] = []
+        last_row_with_data = -1
+        for row_number, row in enumerate(rows):
+            row_width = _trimmed_width(row)
+            if row_width == 0:
+                continue
+            last_row_with_data = row_number
+            if row_width > width:
+                width = row_width
+            while len(profiles) < row_width:
+                profiles.append(ColumnProfile())
+            for col in range(row_width):
+                value = _normalize_cell(row[col])
+                if value is None:
+                    continue
+                profile = profiles[col]
+                profile.present += 1
+                if isinstance(value, str):
+                    value = _parse_numeric_text(value)
+                    if value is None:
+                        profile.others += 1
+                        continue
+                if isinstance(value, bool):
+                    profile.others += 1
+                elif isinstance(value, int):
+                    profile.ints += 1
+                elif isinstance(value, float):
+                    profile.floats += 1
+                elif isinstance(value, dt.datetime):
+                    profile.datetimes += 1
+                    if value.microsecond:
+                        profile.datetime_resolution = max(profile.datetime_resolution, 2)
+                    elif value.hour or value.minute or value.second:
+                        profile.datetime_resolution = max(profile.datetime_resolution, 1)
+                else:
+                    profile.others += 1
+        while len(profiles) < width:
+            profiles.append(ColumnProfile())
+        return SheetProfile(
+            columns=_header_names(raw_header, width),
+            n_rows=last_row_with_data + 1,
+            profiles=profiles,
+        )
+    finally:
+        workbook.close()
+
+
+def _typed_value(value: Any, kind: str) -> Any:
+    value = _normalize_cell(value)
+    if value is None:
+        return None
+    if kind in ("int", "float") and isinstance(value, str):
+        return _parse_numeric_text(value)
+    if kind == "object":
+        if isinstance(value, str):
+            return value
+        if isinstance(value, float):
+            return repr(value)
+        return str(value)
+    return value
+
+
+def _build_chunk(columns: List[str], kinds: List[str], buffers: List[List[Any]]) -> pd.DataFrame:
+    data: Dict[str, Any] = {}
+    for name, kind, values in zip(columns, kinds, buffers):
+        if kind == "int":
+            data[name] = np.asarray(values, dtype=np.int64)
+        elif kind == "float":
+            data[name] = np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif kind == "datetime":
+            data[name] = pd.to_datetime(pd.Series(values, dtype=object))
+        else:
+            data[name] = pd.Series(values, dtype=object)
+    return pd.DataFrame(data, columns=columns)
+
+
+def format_datetimes_for_csv(df: pd.DataFrame, profile: SheetProfile) -> pd.DataFrame:
+    """
+    Convierte las columnas de fecha a texto con el formato de la hoja completa.
+
+    ``to_csv`` elige el formato mirando solo el bloque que escribe; fijarlo
+    desde el perfil evita que bloques distintos usen formatos distintos.
+    """
+    for name, column_profile in zip(profile.columns, profile.profiles):
+        if column_profile.kind(profile.n_rows) == "datetime":
+            df[name] = df[name].dt.strftime(column_profile.csv_datetime_format())
+    return df
+
+
+def iter_chunks(path: Path, profile: SheetProfile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Segunda pasada: emite bloques tipados según ``profile``."""
+    columns = profile.columns
+    kinds = profile.kinds
+    width = len(columns)
+    if width == 0:
+        yield pd.DataFrame()
+        return
+    workbook, sheet = _open_sheet(path)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        next(rows, None)  # encabezado
+        buffers: List[List[Any]] = [[] for _ in range(width)]
+        pending = 0
+        emitted = False
+        for row_number, row in enumerate(rows):
+            if row_number >= profile.n_rows:
+                break
+            for col in range(width):
+                value = row[col] if col < len(row) else None
+                buffers[col].append(_typed_value(value, kinds[col]))
+            pending += 1
+            if pending >= chunk_size:
+                yield _build_chunk(columns, kinds, buffers)
+                emitted = True
+                buffers = [[] for _ in range(width)]
+                pending = 0
+        if pending or not emitted:
+            yield _build_chunk(columns, kinds, buffers)
+    finally:
+        workbook.close()